@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""离线重建 TTS 常用台词缓存。
+
+用途：
+1. 汇总各 persona 的兜底句、开场白与事件 `speak_lines`
+2. 按 TTS provider 逐句合成并写入服务端 TTS 磁盘缓存（`TTS_CACHE_DIR`）
+3. 更换音色或 GPT-SoVITS 参数后，可用 `--clear` 清空缓存重新生成
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _add_server_to_path(repo_root: Path) -> None:
+    server_path = repo_root / "server"
+    if str(server_path) not in sys.path:
+        sys.path.insert(0, str(server_path))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="离线重建 TTS 常用台词缓存")
+    parser.add_argument("--personas", default="", help="逗号分隔的 persona_id（默认全部）")
+    parser.add_argument("--providers", default="", help="逗号分隔的 TTS provider（默认 TTS_PROVIDER_PRIORITY）")
+    parser.add_argument("--qwen-voice-id", default="", help="指定千问音色（默认使用配置/登记表中的音色）")
+    parser.add_argument("--clear", action="store_true", help="合成前清空整个 TTS 缓存")
+    parser.add_argument("--dry-run", action="store_true", help="只列出待合成台词，不调用 TTS")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[2]
+    _add_server_to_path(repo_root)
+    from dotenv import load_dotenv
+
+    load_dotenv(repo_root / "server" / ".env")
+    from app.services.dialogue.phrase_bank import collect_phrase_bank, warm_phrase_bank
+    from app.services.tts.audio_cache import get_tts_audio_cache
+
+    persona_ids = [item.strip() for item in args.personas.split(",") if item.strip()] or None
+    providers = [item.strip() for item in args.providers.split(",") if item.strip()] or None
+
+    if args.dry_run:
+        print(json.dumps(collect_phrase_bank(persona_ids), ensure_ascii=False, indent=2))
+        return 0
+
+    cache = get_tts_audio_cache()
+    if cache is None:
+        print("[ERROR] TTS 缓存未启用，请设置 TTS_CACHE_ENABLED=true")
+        return 2
+    if args.clear:
+        cache.clear()
+
+    report = warm_phrase_bank(persona_ids, providers=providers, qwen_voice_id=args.qwen_voice_id)
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+    print(json.dumps(cache.stats(), ensure_ascii=False, indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
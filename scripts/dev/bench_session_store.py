@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""SessionStore 单轮对话读写延迟基准。
+
+用途：
+1. 向临时 SQLite 库逐级灌入消息（默认到 1000 万行），模拟多用户长期累积
+2. 每个规模下随机挑选会话，执行一轮完整的对话存储读写并统计 p50/p95
+3. `--drop-indexes` 可对照无索引时的退化情况
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+
+def _add_server_to_path(repo_root: Path) -> None:
+    server_path = repo_root / "server"
+    if str(server_path) not in sys.path:
+        sys.path.insert(0, str(server_path))
+
+
+def _parse_sizes(text: str) -> list[int]:
+    sizes = sorted({int(item.replace("_", "")) for item in text.split(",") if item.strip()})
+    if not sizes or sizes[0] <= 0:
+        raise ValueError("--sizes 必须是正整数列表")
+    return sizes
+
+
+def _fill_messages(store, start: int, stop: int, sessions: int, batch_size: int = 50_000) -> None:
+    """批量灌入历史消息，并在同一事务里按批累加 session_stats，与 SessionStore 的逐条写入结果一致。"""
+    conn = store._connect()
+    for batch_start in range(start, stop, batch_size):
+        batch_stop = min(batch_start + batch_size, stop)
+        rows = [
+            (
+                f"s-{index % sessions}",
+                "user" if index % 2 == 0 else "assistant",
+                f"历史消息 {index}",
+            )
+            for index in range(batch_start, batch_stop)
+        ]
+        turns: Counter[tuple[str, str]] = Counter((session_id, role) for session_id, role, _ in rows)
+        stats = {
+            session_id: (turns[(session_id, "user")], turns[(session_id, "assistant")])
+            for session_id, _ in turns
+        }
+        with conn:
+            conn.executemany("INSERT INTO messages(session_id, role, content) VALUES(?, ?, ?)", rows)
+            conn.executemany(
+                """
+                INSERT INTO session_stats(session_id, user_turns, assistant_turns, last_active_at)
+                VALUES(?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(session_id)
+                DO UPDATE SET
+                  user_turns = user_turns + excluded.user_turns,
+                  assistant_turns = assistant_turns + excluded.assistant_turns,
+                  last_active_at = excluded.last_active_at
+                """,
+                [(session_id, user, assistant) for session_id, (user, assistant) in stats.items()],
+            )
+
+
+def _run_turn(store, session_id: str, history_limit: int) -> float:
+    started = time.perf_counter()
+    store.add_message(session_id, "user", "今天也一起加油吧")
+    store.list_recent_messages(session_id, limit=history_limit)
+    store.get_relationship(session_id)
+    store.count_user_turns(session_id)
+    store.commit_turn(session_id, "好呀，我们出发。", [], {"trust": 1, "reliance": 0, "fatigue": 0})
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SessionStore 单轮读写延迟基准")
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000", help="逐级灌入的消息总行数")
+    parser.add_argument("--sessions", type=int, default=20_000, help="消息分布到的会话数量")
+    parser.add_argument("--turns", type=int, default=200, help="每个规模下采样的对话轮数")
+    parser.add_argument("--history-limit", type=int, default=12)
+    parser.add_argument("--db", default="", help="基准库路径（默认临时目录，结束后删除）")
+    parser.add_argument("--drop-indexes", action="store_true", help="删除会话索引，对照无索引表现")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parents[2]
+    _add_server_to_path(repo_root)
+    from app.repositories.session_store import SessionStore
+
+    try:
+        sizes = _parse_sizes(args.sizes)
+    except ValueError as exc:
+        print(f"[ERROR] {exc}")
+        return 2
+
+    with tempfile.TemporaryDirectory(prefix="bench_session_store_") as tmp_dir:
+        db_path = Path(args.db) if args.db else Path(tmp_dir) / "bench.db"
+        store = SessionStore(db_path)
+        if args.drop_indexes:
+            conn = store._connect()
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+            ).fetchall():
+                conn.execute(f"DROP INDEX {row['name']}")
+            conn.commit()
+
+        rng = random.Random(20260101)
+        filled = 0
+        print(f"{'rows':>12} {'fill_s':>8} {'p50_ms':>8} {'p95_ms':>8}")
+        for size in sizes:
+            fill_started = time.perf_counter()
+            _fill_messages(store, filled, size, max(args.sessions, 1))
+            fill_seconds = time.perf_counter() - fill_started
+            filled = size
+
+            samples = [
+                _run_turn(store, f"s-{rng.randrange(max(args.sessions, 1))}", args.history_limit)
+                for _ in range(max(args.turns, 1))
+            ]
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) >= 2 else samples[0]
+            print(f"{size:>12,} {fill_seconds:>8.1f} {statistics.median(samples):>8.3f} {p95:>8.3f}")
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -106,11 +106,12 @@ def main() -> int:
         _sanitize_assistant_text,
     )
     from app.services.dialogue.gptsapi_anthropic_client import (
-        _build_system_prompt,
+        _build_chat_payload,
+        _build_system_prompt_segments,
         _extract_text,
-        _is_kimi_25_model,
         _join_api_path,
         _normalize_messages,
+        _resolve_cache_control,
     )
     from app.services.dialogue.llm_output_parser import parse_labeled_response
 
@@ -131,22 +132,23 @@ def main() -> int:
     )
     history = _load_history(args.history_json, args.user_text)
     normalized_messages = _normalize_messages(history)
-    system_prompt = _build_system_prompt(
+    system_segments = _build_system_prompt_segments(
         args.persona_id,
         relationship,
         include_initial_injection=bool(args.include_initial_injection),
     )
+    system_prompt = "".join(segment.text for segment in system_segments)
 
     url = _join_api_path(base_url, "chat/completions")
-    payload_messages: list[dict[str, str]] = [{"role": "system", "content": system_prompt}]
-    payload_messages.extend(normalized_messages)
-    payload: dict[str, Any] = {
-        "model": model,
-        "max_completion_tokens": max_tokens,
-        "messages": payload_messages,
-    }
-    if _is_kimi_25_model(model):
-        payload["thinking"] = {"type": "disabled"}
+    payload = _build_chat_payload(
+        model=model,
+        max_tokens=max_tokens,
+        system_segments=system_segments,
+        messages=normalized_messages,
+        cache_control=_resolve_cache_control(settings.llm_prompt_cache_control, model),
+        state_at_tail=settings.llm_prompt_state_position == "tail",
+    )
+    payload_messages = payload["messages"]
 
     tag = _now_tag()
     save_dir = (repo_root / args.save_dir).resolve()
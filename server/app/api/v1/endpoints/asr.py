@@ -9,16 +9,17 @@ from typing import Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.core.settings import get_settings
-from app.services.asr.asr_service import probe_asr_providers
+from app.services.asr.asr_service import aprobe_asr_providers
 from app.services.asr.fun_asr_realtime_client import FunASRClientError, FunASRRealtimeSession
+from app.services.upstream_limits import UPSTREAM_ASR, run_on_upstream_executor
 
 router = APIRouter(prefix="/v1/asr", tags=["asr"])
 logger = logging.getLogger(__name__)
 
 
 @router.get("/providers")
-def get_asr_providers() -> dict[str, Any]:
-    return {"providers": probe_asr_providers()}
+async def get_asr_providers() -> dict[str, Any]:
+    return {"providers": await aprobe_asr_providers()}
 
 
 @router.websocket("/fun/realtime/ws")
@@ -28,12 +29,11 @@ async def fun_asr_realtime_ws(websocket: WebSocket) -> None:
     fmt = (websocket.query_params.get("format") or settings.fun_asr_format).strip().lower()
     sample_rate = _to_int(websocket.query_params.get("sample_rate"), settings.fun_asr_sample_rate)
 
-    session = FunASRRealtimeSession(audio_format=fmt, sample_rate=sample_rate)
+    session = FunASRRealtimeSession(audio_format=fmt, sample_rate=sample_rate, loop=asyncio.get_running_loop())
     forward_task: asyncio.Task[None] | None = None
-    stop_forward = asyncio.Event()
 
     try:
-        session.start()
+        await run_on_upstream_executor(UPSTREAM_ASR, session.start)
         await websocket.send_json(
             {
                 "type": "open",
@@ -42,7 +42,7 @@ async def fun_asr_realtime_ws(websocket: WebSocket) -> None:
                 "sample_rate": sample_rate,
             }
         )
-        forward_task = asyncio.create_task(_forward_asr_events(websocket, session, stop_forward))
+        forward_task = asyncio.create_task(_forward_asr_events(websocket, session))
 
         while True:
             message = await websocket.receive()
@@ -51,14 +51,15 @@ async def fun_asr_realtime_ws(websocket: WebSocket) -> None:
 
             binary = message.get("bytes")
             if isinstance(binary, (bytes, bytearray)):
-                session.send_audio_frame(bytes(binary))
+                # SDK 发送可能阻塞在网络写入上，放到 ASR 上游线程池中执行，避免卡住事件循环上的其他连接。
+                await run_on_upstream_executor(UPSTREAM_ASR, session.send_audio_frame, bytes(binary))
                 continue
 
             text = str(message.get("text", "") or "").strip().lower()
             if text in {"stop", "[done]", "end"}:
                 break
 
-        session.stop()
+        await run_on_upstream_executor(UPSTREAM_ASR, session.stop)
     except WebSocketDisconnect:
         logger.info("Fun-ASR WebSocket 客户端断开连接")
     except FunASRClientError as exc:
@@ -70,13 +71,13 @@ async def fun_asr_realtime_ws(websocket: WebSocket) -> None:
         except Exception:  # noqa: BLE001
             pass
     finally:
-        stop_forward.set()
+        # close 后事件流以 None 结束，转发任务推送完剩余事件即退出。
+        await run_on_upstream_executor(UPSTREAM_ASR, session.close)
         if forward_task is not None:
             try:
                 await asyncio.wait_for(forward_task, timeout=2.0)
             except asyncio.TimeoutError:
                 forward_task.cancel()
-        session.close()
         try:
             await websocket.close()
         except Exception:  # noqa: BLE001
@@ -111,15 +112,8 @@ def get_fun_asr_realtime_usage_guide() -> dict[str, Any]:
     }
 
 
-async def _forward_asr_events(
-    websocket: WebSocket,
-    session: FunASRRealtimeSession,
-    stop_event: asyncio.Event,
-) -> None:
-    while not stop_event.is_set():
-        event = await asyncio.to_thread(session.poll_event, 0.2)
-        if event is None:
-            continue
+async def _forward_asr_events(websocket: WebSocket, session: FunASRRealtimeSession) -> None:
+    while (event := await session.anext_event()) is not None:
         payload = {
             "type": event.type,
             "provider": "fun_asr_realtime",
@@ -130,8 +124,6 @@ async def _forward_asr_events(
             "error": event.error,
         }
         await websocket.send_json(payload)
-        if event.type in {"error", "complete", "close"} and stop_event.is_set():
-            return
 
 
 def _to_int(value: str | None, fallback: int) -> int:
@@ -2,31 +2,66 @@
 
 from __future__ import annotations
 
+import json
 import logging
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
 
-from app.dependencies import get_session_store
-from app.repositories.session_store import SessionStore
-from app.schemas.chat import ChatTextRequest, ChatTextResponse, ChatTextVoiceResponse, ChatVoiceResponse
-from app.services.asr.asr_service import ASRServiceError, ASRUnavailableError, transcribe_with_fallback
+from app.core.settings import get_settings
+from app.dependencies import get_async_session_store
+from app.repositories.session_store import AsyncSessionStore
+from app.schemas.chat import (
+    AudioMode,
+    ChatTextRequest,
+    ChatTextResponse,
+    ChatTextVoiceResponse,
+    ChatVoiceResponse,
+    OutputFormat,
+)
+from app.services.asr.asr_service import (
+    ASREmptyAudioError,
+    ASRResult,
+    ASRServiceError,
+    ASRUnavailableError,
+    atranscribe_stream_with_fallback,
+    atranscribe_with_fallback,
+)
+from app.services.asr.fun_asr_realtime_client import FunASRClientError
 from app.services.dialogue.chat_service import (
     ChatServiceError,
-    run_text_chat,
-    synthesize_assistant_audio_base64,
+    arun_text_chat,
+    astream_text_chat_with_voice,
+    asynthesize_assistant_audio,
+    asynthesize_assistant_audio_base64,
 )
+from app.services.dialogue.realtime_voice_chat import RealtimeVoiceChat
+from app.services.tts.audio_encoders import negotiate_output_format, output_media_type
+from app.services.tts.audio_jobs import get_tts_audio_jobs
 
 router = APIRouter(prefix="/v1/chat", tags=["chat"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/text", response_model=ChatTextResponse)
-def chat_text(
+async def chat_text(
     req: ChatTextRequest,
-    store: SessionStore = Depends(get_session_store),
+    store: AsyncSessionStore = Depends(get_async_session_store),
 ) -> ChatTextResponse:
     try:
-        result = run_text_chat(
+        result = await arun_text_chat(
             store=store,
             session_id=req.session_id,
             persona_id=req.persona_id,
@@ -38,12 +73,12 @@ def chat_text(
 
 
 @router.post("/text-with-voice", response_model=ChatTextVoiceResponse)
-def chat_text_with_voice(
+async def chat_text_with_voice(
     req: ChatTextRequest,
-    store: SessionStore = Depends(get_session_store),
+    store: AsyncSessionStore = Depends(get_async_session_store),
 ) -> ChatTextVoiceResponse:
     try:
-        result = run_text_chat(
+        result = await arun_text_chat(
             store=store,
             session_id=req.session_id,
             persona_id=req.persona_id,
@@ -52,21 +87,14 @@ def chat_text_with_voice(
     except ChatServiceError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
-    tts_media_type = "audio/wav"
-    tts_audio_base64 = ""
-    tts_provider: str | None = None
-    tts_error: str | None = None
-    try:
-        tts_media_type, tts_audio_base64, tts_provider = synthesize_assistant_audio_base64(
-            str(result["assistant_text"]),
-            force_tts_provider=req.tts_provider,
-            qwen_voice_id=req.qwen_voice_id,
-            qwen_target_model=req.qwen_target_model,
-        )
-    except ChatServiceError as exc:
-        tts_error = str(exc)
-        logger.warning("text-with-voice TTS 合成失败，降级为纯文本返回: %s", exc)
-
+    tts_fields = await _resolve_tts_fields(
+        str(result["assistant_text"]),
+        audio_mode=req.audio_mode,
+        force_tts_provider=req.tts_provider,
+        qwen_voice_id=req.qwen_voice_id,
+        qwen_target_model=req.qwen_target_model,
+        output_format=req.output_format,
+    )
     return ChatTextVoiceResponse(
         session_id=result["session_id"],
         assistant_text=result["assistant_text"],
@@ -74,11 +102,30 @@ def chat_text_with_voice(
         animation=result["animation"],
         relationship_delta=result["relationship_delta"],
         memory_writes=result["memory_writes"],
-        tts_media_type=tts_media_type,
-        tts_audio_base64=tts_audio_base64,
-        tts_error=tts_error,
-        tts_provider=tts_provider,
+        **tts_fields,
+    )
+
+
+@router.post("/text-with-voice/stream")
+async def chat_text_with_voice_stream(
+    req: ChatTextRequest,
+    store: AsyncSessionStore = Depends(get_async_session_store),
+) -> StreamingResponse:
+    events = astream_text_chat_with_voice(
+        store=store,
+        session_id=req.session_id,
+        persona_id=req.persona_id,
+        user_text=req.user_text,
+        force_tts_provider=req.tts_provider,
+        qwen_voice_id=req.qwen_voice_id,
+        qwen_target_model=req.qwen_target_model,
+        output_format=negotiate_output_format(req.output_format),
     )
+    try:
+        first_event = await _next_event(events)
+    except ChatServiceError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    return _build_sse_response([first_event], events)
 
 
 @router.post("/voice", response_model=ChatVoiceResponse)
@@ -90,19 +137,20 @@ async def chat_voice(
     requested_tts_provider: str = Form("qwen_clone_tts", alias="tts_provider"),
     qwen_voice_id: str = Form(""),
     qwen_target_model: str = Form(""),
-    store: SessionStore = Depends(get_session_store),
+    audio_mode: AudioMode = Form("base64"),
+    output_format: OutputFormat = Form("wav"),
+    store: AsyncSessionStore = Depends(get_async_session_store),
 ) -> ChatVoiceResponse:
     audio_bytes = await audio.read()
     if not audio_bytes:
         raise HTTPException(status_code=400, detail="audio 不能为空")
 
     try:
-        asr_result = transcribe_with_fallback(
+        asr_result = await atranscribe_with_fallback(
             audio_bytes=audio_bytes,
             filename=audio.filename or "voice.wav",
             lang=lang,
         )
-        transcript = asr_result.text
         logger.info("ASR provider selected: %s", asr_result.provider)
     except ASRUnavailableError as exc:
         logger.warning("ASR 全量不可用，建议切换文本输入: %s", exc)
@@ -111,40 +159,301 @@ async def chat_voice(
         logger.warning("ASR 转写失败: %s", exc)
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
+    return await _reply_to_transcript(
+        store,
+        asr_result,
+        session_id=session_id,
+        persona_id=persona_id,
+        audio_mode=audio_mode,
+        force_tts_provider=requested_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=output_format,
+    )
+
+
+@router.post("/voice/raw", response_model=ChatVoiceResponse)
+async def chat_voice_raw(
+    request: Request,
+    session_id: str = Query(...),
+    persona_id: str = Query(...),
+    lang: str | None = Query(None),
+    filename: str = Query("voice.wav", description="用于推断音频格式，如 voice.pcm / voice.wav"),
+    sample_rate: int | None = Query(None, description="PCM 采样率；WAV 未指定时从文件头读取"),
+    requested_tts_provider: str = Query("qwen_clone_tts", alias="tts_provider"),
+    qwen_voice_id: str = Query(""),
+    qwen_target_model: str = Query(""),
+    audio_mode: AudioMode = Query("base64"),
+    output_format: OutputFormat = Query("wav"),
+    store: AsyncSessionStore = Depends(get_async_session_store),
+) -> ChatVoiceResponse:
+    """请求体为原始音频（非 multipart），边上传边送入 Fun-ASR 流式识别，上传结束后很快即可拿到转写。"""
     try:
-        text_result = run_text_chat(
+        asr_result = await atranscribe_stream_with_fallback(
+            request.stream(),
+            filename=filename,
+            lang=lang,
+            sample_rate=sample_rate,
+        )
+        logger.info("ASR provider selected: %s", asr_result.provider)
+    except ASREmptyAudioError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ASRUnavailableError as exc:
+        logger.warning("ASR 全量不可用，建议切换文本输入: %s", exc)
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except ASRServiceError as exc:
+        logger.warning("ASR 转写失败: %s", exc)
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    return await _reply_to_transcript(
+        store,
+        asr_result,
+        session_id=session_id,
+        persona_id=persona_id,
+        audio_mode=audio_mode,
+        force_tts_provider=requested_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=output_format,
+    )
+
+
+@router.post("/voice/stream")
+async def chat_voice_stream(
+    audio: UploadFile = File(...),
+    session_id: str = Form(...),
+    persona_id: str = Form(...),
+    lang: str | None = Form(None),
+    requested_tts_provider: str = Form("qwen_clone_tts", alias="tts_provider"),
+    qwen_voice_id: str = Form(""),
+    qwen_target_model: str = Form(""),
+    output_format: OutputFormat = Form("wav"),
+    store: AsyncSessionStore = Depends(get_async_session_store),
+) -> StreamingResponse:
+    audio_bytes = await audio.read()
+    if not audio_bytes:
+        raise HTTPException(status_code=400, detail="audio 不能为空")
+
+    try:
+        asr_result = await atranscribe_with_fallback(
+            audio_bytes=audio_bytes,
+            filename=audio.filename or "voice.wav",
+            lang=lang,
+        )
+        logger.info("ASR provider selected: %s", asr_result.provider)
+    except ASRUnavailableError as exc:
+        logger.warning("ASR 全量不可用，建议切换文本输入: %s", exc)
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except ASRServiceError as exc:
+        logger.warning("ASR 转写失败: %s", exc)
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    _require_transcript(asr_result)
+    events = astream_text_chat_with_voice(
+        store=store,
+        session_id=session_id,
+        persona_id=persona_id,
+        user_text=asr_result.text,
+        force_tts_provider=requested_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=negotiate_output_format(output_format),
+    )
+    try:
+        first_event = await _next_event(events)
+    except ChatServiceError as exc:
+        logger.warning("LLM 对话失败: %s", exc)
+        raise HTTPException(status_code=502, detail=f"LLM 对话失败: {exc}") from exc
+    transcript_event = {
+        "type": "transcript",
+        "transcript_text": asr_result.text,
+        "asr_provider": asr_result.provider,
+    }
+    return _build_sse_response([transcript_event, first_event], events)
+
+
+@router.websocket("/realtime/ws")
+async def chat_realtime_ws(
+    websocket: WebSocket,
+    session_id: str = Query(...),
+    persona_id: str = Query(...),
+    audio_format: str = Query("", alias="format"),
+    sample_rate: int | None = Query(None),
+    requested_tts_provider: str = Query("qwen_clone_tts", alias="tts_provider"),
+    qwen_voice_id: str = Query(""),
+    qwen_target_model: str = Query(""),
+    output_format: OutputFormat = Query("wav"),
+    store: AsyncSessionStore = Depends(get_async_session_store),
+) -> None:
+    """全双工语音对话：binary 帧为麦克风音频，text ``stop`` 结束输入；识别、回复与语音均经同一连接推送。"""
+    await websocket.accept()
+    settings = get_settings()
+    chat = RealtimeVoiceChat(
+        store=store,
+        session_id=session_id,
+        persona_id=persona_id,
+        send=websocket.send_json,
+        audio_format=(audio_format or settings.fun_asr_format).strip().lower(),
+        sample_rate=sample_rate or settings.fun_asr_sample_rate,
+        force_tts_provider=requested_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=negotiate_output_format(output_format),
+    )
+    try:
+        await chat.run(_iter_websocket_audio(websocket))
+    except WebSocketDisconnect:
+        logger.info("实时语音对话客户端断开连接")
+    except FunASRClientError as exc:
+        await _send_ws_error(websocket, str(exc))
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("实时语音对话异常: %s", exc)
+        await _send_ws_error(websocket, str(exc))
+    finally:
+        try:
+            await websocket.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+async def _iter_websocket_audio(websocket: WebSocket) -> AsyncIterator[bytes]:
+    while True:
+        message = await websocket.receive()
+        if message.get("type") == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        binary = message.get("bytes")
+        if isinstance(binary, (bytes, bytearray)):
+            yield bytes(binary)
+            continue
+        text = str(message.get("text", "") or "").strip().lower()
+        if text in {"stop", "[done]", "end"}:
+            return
+
+
+async def _send_ws_error(websocket: WebSocket, message: str) -> None:
+    try:
+        await websocket.send_json({"type": "error", "message": message})
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _require_transcript(asr_result: ASRResult) -> None:
+    # VAD 判定整段静音（asr_provider=vad）或上游未识别出文字时不调用 LLM。
+    if not asr_result.text.strip():
+        raise HTTPException(status_code=422, detail=f"未识别到语音内容（asr_provider={asr_result.provider}）")
+
+
+async def _reply_to_transcript(
+    store: AsyncSessionStore,
+    asr_result: ASRResult,
+    *,
+    session_id: str,
+    persona_id: str,
+    audio_mode: AudioMode,
+    force_tts_provider: str,
+    qwen_voice_id: str,
+    qwen_target_model: str,
+    output_format: OutputFormat,
+) -> ChatVoiceResponse:
+    _require_transcript(asr_result)
+    try:
+        text_result = await arun_text_chat(
             store=store,
             session_id=session_id,
             persona_id=persona_id,
-            user_text=transcript,
+            user_text=asr_result.text,
         )
     except ChatServiceError as exc:
         logger.warning("LLM 对话失败: %s", exc)
         raise HTTPException(status_code=502, detail=f"LLM 对话失败: {exc}") from exc
 
-    tts_media_type = "audio/wav"
-    tts_audio_base64 = ""
-    resolved_tts_provider: str | None = None
-    tts_error: str | None = None
+    tts_fields = await _resolve_tts_fields(
+        str(text_result["assistant_text"]),
+        audio_mode=audio_mode,
+        force_tts_provider=force_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=output_format,
+    )
+    return ChatVoiceResponse(
+        transcript_text=asr_result.text,
+        asr_provider=asr_result.provider,
+        assistant_text=text_result["assistant_text"],
+        emotion=text_result["emotion"],
+        animation=text_result["animation"],
+        **tts_fields,
+    )
+
+
+async def _resolve_tts_fields(
+    assistant_text: str,
+    *,
+    audio_mode: AudioMode,
+    force_tts_provider: str,
+    qwen_voice_id: str,
+    qwen_target_model: str,
+    output_format: OutputFormat,
+) -> dict[str, Any]:
+    # 转码不可用（如未安装 ffmpeg）时回退 wav，实际类型见 tts_media_type。
+    output_format = negotiate_output_format(output_format)
+    if audio_mode == "stream":
+        # 合成转入后台，先返回元数据；provider 见取回响应头。
+        audio_id = get_tts_audio_jobs().submit(
+            asynthesize_assistant_audio(
+                assistant_text,
+                force_tts_provider=force_tts_provider,
+                qwen_voice_id=qwen_voice_id,
+                qwen_target_model=qwen_target_model,
+                output_format=output_format,
+            )
+        )
+        return {"tts_media_type": output_media_type(output_format), "tts_audio_url": f"/v1/tts/audio/{audio_id}"}
+
     try:
-        tts_media_type, tts_audio_base64, resolved_tts_provider = synthesize_assistant_audio_base64(
-            str(text_result["assistant_text"]),
-            force_tts_provider=requested_tts_provider,
+        media_type, audio_base64, provider = await asynthesize_assistant_audio_base64(
+            assistant_text,
+            force_tts_provider=force_tts_provider,
             qwen_voice_id=qwen_voice_id,
             qwen_target_model=qwen_target_model,
+            output_format=output_format,
         )
     except ChatServiceError as exc:
-        tts_error = str(exc)
         logger.warning("TTS 合成失败，降级为纯文本返回: %s", exc)
+        return {"tts_media_type": output_media_type(output_format), "tts_error": str(exc)}
+    return {"tts_media_type": media_type, "tts_audio_base64": audio_base64, "tts_provider": provider}
 
-    return ChatVoiceResponse(
-        transcript_text=transcript,
-        asr_provider=asr_result.provider,
-        assistant_text=text_result["assistant_text"],
-        tts_media_type=tts_media_type,
-        tts_audio_base64=tts_audio_base64,
-        tts_error=tts_error,
-        tts_provider=resolved_tts_provider,
-        emotion=text_result["emotion"],
-        animation=text_result["animation"],
+
+async def _next_event(events: AsyncIterator[dict[str, Any]]) -> dict[str, Any] | None:
+    # 预取首个事件，使 LLM 启动阶段的失败仍能以 HTTP 错误码返回。
+    return await anext(events, None)
+
+
+def _build_sse_response(
+    head_events: list[dict[str, Any] | None],
+    events: AsyncIterator[dict[str, Any]],
+) -> StreamingResponse:
+    return StreamingResponse(
+        _iter_sse(head_events, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+async def _iter_sse(
+    head_events: list[dict[str, Any] | None],
+    events: AsyncIterator[dict[str, Any]],
+) -> AsyncIterator[str]:
+    for event in head_events:
+        if event is not None:
+            yield _format_sse(event)
+    try:
+        async for event in events:
+            yield _format_sse(event)
+    except ChatServiceError as exc:
+        logger.warning("流式对话中断: %s", exc)
+        yield _format_sse({"type": "error", "message": str(exc)})
+
+
+def _format_sse(event: dict[str, Any]) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
@@ -0,0 +1,69 @@
+"""运行时状态接口。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies import get_async_session_store, get_session_store
+from app.repositories.session_store import AsyncSessionStore, SessionStore
+from app.services.asr.vad import get_vad_stats
+from app.services.dialogue.persona_loader import get_persona_registry
+from app.services.dialogue.prompt_cache_stats import get_prompt_cache_stats
+from app.services.hedging import get_hedge_stats
+from app.services.http_clients import get_http_pool_stats
+from app.services.tts.audio_cache import get_tts_audio_cache
+from app.services.tts.qwen_voice_clone_client import get_realtime_session_pool
+
+router = APIRouter(prefix="/v1/system", tags=["system"])
+
+
+@router.get("/http-pools")
+def get_http_pools() -> dict[str, Any]:
+    return get_http_pool_stats()
+
+
+@router.get("/sessions")
+async def list_active_sessions(
+    limit: int = Query(default=50, ge=1, le=500),
+    store: AsyncSessionStore = Depends(get_async_session_store),
+) -> dict[str, Any]:
+    return {"sessions": await store.list_active_sessions(limit)}
+
+
+@router.get("/session-cache")
+def get_session_cache_stats(store: SessionStore = Depends(get_session_store)) -> dict[str, Any]:
+    stats = store.cache_stats()
+    return {"enabled": stats is not None, **(stats or {})}
+
+
+@router.get("/prompt-cache")
+def get_prompt_cache() -> dict[str, Any]:
+    return get_prompt_cache_stats()
+
+
+@router.get("/personas")
+def get_personas() -> dict[str, Any]:
+    return get_persona_registry().stats()
+
+
+@router.get("/tts-cache")
+def get_tts_cache_stats() -> dict[str, Any]:
+    cache = get_tts_audio_cache()
+    return {"enabled": cache is not None, **(cache.stats() if cache is not None else {})}
+
+
+@router.get("/tts-realtime-pool")
+def get_tts_realtime_pool_stats() -> dict[str, Any]:
+    return get_realtime_session_pool().stats()
+
+
+@router.get("/hedging")
+def get_hedging_stats() -> dict[str, Any]:
+    return {"hedging": get_hedge_stats()}
+
+
+@router.get("/asr-vad")
+def get_asr_vad_stats() -> dict[str, Any]:
+    return {"vad": get_vad_stats()}
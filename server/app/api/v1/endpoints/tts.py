@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.schemas.tts import (
     CosyVoiceEnrollRequest,
@@ -11,6 +12,8 @@ from app.schemas.tts import (
     QwenVoiceEnrollResponse,
     TTSSynthesizeRequest,
 )
+from app.services.tts.audio_encoders import list_output_formats, negotiate_output_format
+from app.services.tts.audio_jobs import get_tts_audio_jobs
 from app.services.tts.tts_service import (
     TTSServiceError,
     delete_qwen_voice,
@@ -18,8 +21,10 @@ from app.services.tts.tts_service import (
     enroll_or_reuse_cosyvoice_voice,
     list_qwen_voices,
     list_cosyvoice_voices,
+    astream_with_fallback,
+    asynthesize_with_fallback,
+    iter_audio_chunks,
     probe_tts_providers,
-    synthesize_with_fallback,
 )
 
 router = APIRouter(prefix="/v1/tts", tags=["tts"])
@@ -30,12 +35,22 @@ def get_tts_providers() -> dict[str, object]:
     return {"providers": probe_tts_providers()}
 
 
+@router.get("/formats")
+def get_output_formats() -> dict[str, object]:
+    return {"output_formats": list_output_formats()}
+
+
 @router.post("/synthesize")
-def synthesize_audio(req: TTSSynthesizeRequest) -> Response:
+async def synthesize_audio(
+    req: TTSSynthesizeRequest,
+    request: Request,
+    stream: bool = Query(default=False, description="流式输出：千问 realtime / GPT-SoVITS streaming_mode 收到首块音频即开始返回"),
+) -> Response:
     payload = req.model_dump(exclude_none=True)
     text = str(payload.pop("text", "")).strip()
     if not text:
         raise HTTPException(status_code=400, detail="text 不能为空")
+    output_format = negotiate_output_format(payload.pop("output_format", None), request.headers.get("accept"))
 
     provider = str(payload.pop("provider", "auto")).strip().lower() or "auto"
     qwen_voice_id = str(payload.pop("qwen_voice_id", "")).strip()
@@ -44,6 +59,7 @@ def synthesize_audio(req: TTSSynthesizeRequest) -> Response:
     cosyvoice_target_model = str(payload.pop("cosyvoice_target_model", "")).strip()
     gpt_payload = dict(payload)
     gpt_payload["text"] = text
+    gpt_payload["_output_format"] = output_format
 
     if provider in {"qwen_clone_tts", "cosyvoice_tts"}:
         effective_voice_id = qwen_voice_id or cosyvoice_voice_id
@@ -61,12 +77,19 @@ def synthesize_audio(req: TTSSynthesizeRequest) -> Response:
         # 兼容旧 provider 名称。
         gpt_payload["__force_provider"] = "cosyvoice_tts"
 
+    if stream:
+        return await _stream_synthesized_audio(text, gpt_payload)
+
     try:
-        result = synthesize_with_fallback(
+        result = await asynthesize_with_fallback(
             text=text,
             gpt_sovits_payload=gpt_payload,
         )
-        headers = {"X-TTS-Provider": result.provider}
+        headers = {
+            "X-TTS-Provider": result.provider,
+            "X-TTS-Cache": "hit" if result.cache_hit else "miss",
+            "Vary": "Accept",
+        }
         if result.voice_id:
             headers["X-Qwen-Voice-ID"] = result.voice_id
             # 兼容旧头名。
@@ -76,6 +99,23 @@ def synthesize_audio(req: TTSSynthesizeRequest) -> Response:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
 
+@router.get("/audio/{audio_id}")
+async def fetch_audio(audio_id: str) -> StreamingResponse:
+    """取回对话接口 audio_mode=stream 时在后台合成的音频，合成未完成时等待。"""
+    try:
+        result = await get_tts_audio_jobs().wait(audio_id)
+    except TTSServiceError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    if result is None:
+        raise HTTPException(status_code=404, detail="音频不存在或已过期")
+
+    headers = {"X-TTS-Provider": result.provider, "X-TTS-Cache": "hit" if result.cache_hit else "miss"}
+    if result.voice_id:
+        headers["X-Qwen-Voice-ID"] = result.voice_id
+    # 不设置 Content-Length，按块写出（chunked transfer），切片基于 memoryview 不复制音频。
+    return StreamingResponse(iter_audio_chunks(result.audio_bytes), media_type=result.media_type, headers=headers)
+
+
 @router.post("/qwen/enroll", response_model=QwenVoiceEnrollResponse)
 def qwen_enroll(req: QwenVoiceEnrollRequest) -> QwenVoiceEnrollResponse:
     try:
@@ -151,3 +191,20 @@ def cosyvoice_voices(
         return {"voices": voices}
     except TTSServiceError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+
+async def _stream_synthesized_audio(text: str, gpt_payload: dict[str, object]) -> StreamingResponse:
+    # 流式输出不转码，忽略 output_format 协商。
+    gpt_payload.pop("_output_format", None)
+    try:
+        audio_stream = await astream_with_fallback(text=text, gpt_sovits_payload=gpt_payload)
+    except TTSServiceError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    headers = {
+        "X-TTS-Provider": audio_stream.provider,
+        "X-TTS-Cache": "hit" if audio_stream.cache_hit else "miss",
+    }
+    if audio_stream.voice_id:
+        headers["X-Qwen-Voice-ID"] = audio_stream.voice_id
+        headers["X-CosyVoice-Voice-ID"] = audio_stream.voice_id
+    return StreamingResponse(audio_stream.chunks, media_type=audio_stream.media_type, headers=headers)
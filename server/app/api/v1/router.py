@@ -7,6 +7,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints.asr import router as asr_router
 from app.api.v1.endpoints.auth import router as auth_router
 from app.api.v1.endpoints.chat import router as chat_router
+from app.api.v1.endpoints.system import router as system_router
 from app.api.v1.endpoints.tts import router as tts_router
 from app.api.v1.endpoints.user import router as user_router
 
@@ -16,3 +17,4 @@ api_router.include_router(asr_router)
 api_router.include_router(chat_router)
 api_router.include_router(tts_router)
 api_router.include_router(user_router)
+api_router.include_router(system_router)
@@ -80,16 +80,40 @@ class Settings:
     repo_root: Path
     configs_root: Path
     sqlite_db_path: Path
+    sqlite_busy_timeout_ms: int
+    sqlite_cache_size_kib: int
+    session_cache_max_sessions: int
+    session_cache_ttl_seconds: float
     llm_api_base_url: str
     llm_api_key: str
     llm_model: str
     llm_timeout_seconds: float
     llm_max_tokens: int
+    llm_prompt_cache_control: str
+    llm_prompt_state_position: str
+    llm_max_concurrency: int
+    tts_max_concurrency: int
+    asr_max_concurrency: int
+    http_pool_max_connections: int
+    http_pool_max_keepalive_connections: int
+    http_pool_keepalive_expiry_seconds: float
+    http_enable_http2: bool
     asr_base_url: str
     asr_timeout_seconds: float
     default_asr_lang: str
     asr_provider_priority: tuple[str, ...]
+    asr_hedge_enabled: bool
+    asr_hedge_delay_ms: int
+    asr_normalize_enabled: bool
+    asr_target_sample_rate: int
+    asr_vad_enabled: bool
+    asr_vad_min_silence_ms: int
+    asr_vad_padding_ms: int
+    asr_vad_max_segment_seconds: float
+    asr_vad_min_speech_dbfs: float
     tts_provider_priority: tuple[str, ...]
+    tts_hedge_enabled: bool
+    tts_hedge_delay_ms: int
     provider_failure_cooldown_seconds: float
     provider_probe_interval_seconds: float
     provider_probe_timeout_seconds: float
@@ -97,6 +121,11 @@ class Settings:
     dashscope_base_websocket_api_url: str
     qwen_voice_customization_url: str
     qwen_tts_realtime_ws_url: str
+    qwen_tts_realtime_pool_enabled: bool
+    qwen_tts_realtime_pool_max_idle: int
+    qwen_tts_realtime_pool_idle_seconds: float
+    qwen_tts_realtime_pool_max_age_seconds: float
+    qwen_tts_realtime_pool_prewarm: bool
     fun_asr_model: str
     fun_asr_sample_rate: int
     fun_asr_format: str
@@ -108,8 +137,22 @@ class Settings:
     fun_asr_vocabulary_id: str
     fun_asr_speech_noise_threshold: float | None
     dialogue_history_limit: int
+    persona_reload_interval_seconds: float
     event_inject_every_turns: int
     allow_local_chat_cache: bool
+    chat_stream_tts_workers: int
+    tts_cache_enabled: bool
+    tts_cache_dir: Path
+    tts_cache_memory_max_mb: int
+    tts_cache_disk_max_mb: int
+    tts_cache_max_text_chars: int
+    tts_phrase_bank_warmup: bool
+    tts_phrase_bank_personas: tuple[str, ...]
+    tts_audio_job_ttl_seconds: float
+    tts_audio_job_max_jobs: int
+    ffmpeg_path: str
+    tts_opus_bitrate_kbps: int
+    tts_mp3_bitrate_kbps: int
     gpt_sovits_base_url: str
     gpt_sovits_timeout_seconds: float
     gpt_sovits_default_ref_audio_path: str
@@ -128,6 +171,7 @@ class Settings:
     gpt_sovits_parallel_infer: bool
     gpt_sovits_split_bucket: bool
     gpt_sovits_seed: int
+    gpt_sovits_streaming_mode: bool
     cosyvoice_target_model: str
     cosyvoice_voice_id: str
     cosyvoice_voice_prefix: str
@@ -174,11 +218,30 @@ def get_settings() -> Settings:
         repo_root=repo_root,
         configs_root=configs_root,
         sqlite_db_path=sqlite_db_path,
+        sqlite_busy_timeout_ms=_to_int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"), 5000),
+        sqlite_cache_size_kib=_to_int(os.getenv("SQLITE_CACHE_SIZE_KIB", "8192"), 8192),
+        session_cache_max_sessions=_to_int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "1024"), 1024),
+        session_cache_ttl_seconds=_to_float(os.getenv("SESSION_CACHE_TTL_SECONDS", "300"), 300.0),
         llm_api_base_url=os.getenv("LLM_API_BASE_URL", "https://api.gptsapi.net"),
         llm_api_key=os.getenv("LLM_API_KEY", ""),
         llm_model=os.getenv("LLM_MODEL", "claude-sonnet-4-5-20250929"),
         llm_timeout_seconds=_to_float(os.getenv("LLM_TIMEOUT_SECONDS", "45"), 45.0),
         llm_max_tokens=_to_int(os.getenv("LLM_MAX_TOKENS", "512"), 512),
+        llm_prompt_cache_control=os.getenv("LLM_PROMPT_CACHE_CONTROL", "auto").strip().lower() or "auto",
+        llm_prompt_state_position=os.getenv("LLM_PROMPT_STATE_POSITION", "system").strip().lower() or "system",
+        llm_max_concurrency=_to_int(os.getenv("LLM_MAX_CONCURRENCY", "64"), 64),
+        tts_max_concurrency=_to_int(os.getenv("TTS_MAX_CONCURRENCY", "16"), 16),
+        asr_max_concurrency=_to_int(os.getenv("ASR_MAX_CONCURRENCY", "16"), 16),
+        http_pool_max_connections=_to_int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"), 100),
+        http_pool_max_keepalive_connections=_to_int(
+            os.getenv("HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS", "20"),
+            20,
+        ),
+        http_pool_keepalive_expiry_seconds=_to_float(
+            os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS", "30"),
+            30.0,
+        ),
+        http_enable_http2=_to_bool(os.getenv("HTTP_ENABLE_HTTP2", "true"), True),
         asr_base_url=os.getenv("SENSEVOICE_BASE_URL", "http://127.0.0.1:50000"),
         asr_timeout_seconds=_to_float(os.getenv("SENSEVOICE_TIMEOUT_SECONDS", "30"), 30.0),
         default_asr_lang=os.getenv("SENSEVOICE_DEFAULT_LANG", "zh"),
@@ -188,12 +251,24 @@ def get_settings() -> Settings:
                 ["sensevoice_http", "fun_asr_realtime"],
             )
         ),
+        asr_hedge_enabled=_to_bool(os.getenv("ASR_HEDGE_ENABLED", "false"), False),
+        asr_hedge_delay_ms=_to_int(os.getenv("ASR_HEDGE_DELAY_MS", "1200"), 1200),
+        asr_normalize_enabled=_to_bool(os.getenv("ASR_NORMALIZE_ENABLED", "true"), True),
+        asr_target_sample_rate=_to_int(os.getenv("ASR_TARGET_SAMPLE_RATE", "16000"), 16000),
+        asr_vad_enabled=_to_bool(os.getenv("ASR_VAD_ENABLED", "false"), False),
+        asr_vad_min_silence_ms=_to_int(os.getenv("ASR_VAD_MIN_SILENCE_MS", "600"), 600),
+        asr_vad_padding_ms=_to_int(os.getenv("ASR_VAD_PADDING_MS", "200"), 200),
+        # 过短的段会让长语音被切成大量碎片，下限 1 秒。
+        asr_vad_max_segment_seconds=max(_to_float(os.getenv("ASR_VAD_MAX_SEGMENT_SECONDS", "30"), 30.0), 1.0),
+        asr_vad_min_speech_dbfs=_to_float(os.getenv("ASR_VAD_MIN_SPEECH_DBFS", "-60"), -60.0),
         tts_provider_priority=tuple(
             _to_csv_list(
                 os.getenv("TTS_PROVIDER_PRIORITY"),
                 ["qwen_clone_tts", "gpt_sovits"],
             )
         ),
+        tts_hedge_enabled=_to_bool(os.getenv("TTS_HEDGE_ENABLED", "false"), False),
+        tts_hedge_delay_ms=_to_int(os.getenv("TTS_HEDGE_DELAY_MS", "1500"), 1500),
         provider_failure_cooldown_seconds=_to_float(
             os.getenv("PROVIDER_FAILURE_COOLDOWN_SECONDS", "30"),
             30.0,
@@ -219,6 +294,17 @@ def get_settings() -> Settings:
             "QWEN_TTS_REALTIME_WS_URL",
             "wss://dashscope.aliyuncs.com/api-ws/v1/realtime",
         ),
+        qwen_tts_realtime_pool_enabled=_to_bool(os.getenv("QWEN_TTS_REALTIME_POOL_ENABLED", "true"), True),
+        qwen_tts_realtime_pool_max_idle=_to_int(os.getenv("QWEN_TTS_REALTIME_POOL_MAX_IDLE", "4"), 4),
+        qwen_tts_realtime_pool_idle_seconds=_to_float(
+            os.getenv("QWEN_TTS_REALTIME_POOL_IDLE_SECONDS", "50"),
+            50.0,
+        ),
+        qwen_tts_realtime_pool_max_age_seconds=_to_float(
+            os.getenv("QWEN_TTS_REALTIME_POOL_MAX_AGE_SECONDS", "600"),
+            600.0,
+        ),
+        qwen_tts_realtime_pool_prewarm=_to_bool(os.getenv("QWEN_TTS_REALTIME_POOL_PREWARM", "true"), True),
         fun_asr_model=os.getenv("FUN_ASR_MODEL", "fun-asr-realtime"),
         fun_asr_sample_rate=_to_int(os.getenv("FUN_ASR_SAMPLE_RATE", "16000"), 16000),
         fun_asr_format=os.getenv("FUN_ASR_FORMAT", "pcm"),
@@ -243,8 +329,25 @@ def get_settings() -> Settings:
             os.getenv("FUN_ASR_SPEECH_NOISE_THRESHOLD")
         ),
         dialogue_history_limit=_to_int(os.getenv("DIALOGUE_HISTORY_LIMIT", "12"), 12),
+        persona_reload_interval_seconds=_to_float(os.getenv("PERSONA_RELOAD_INTERVAL_SECONDS", "2"), 2.0),
         event_inject_every_turns=_to_int(os.getenv("EVENT_INJECT_EVERY_TURNS", "5"), 5),
         allow_local_chat_cache=_to_bool(os.getenv("ALLOW_LOCAL_CHAT_CACHE", "true"), True),
+        chat_stream_tts_workers=_to_int(os.getenv("CHAT_STREAM_TTS_WORKERS", "2"), 2),
+        tts_cache_enabled=_to_bool(os.getenv("TTS_CACHE_ENABLED", "true"), True),
+        tts_cache_dir=_resolve_server_path(
+            os.getenv("TTS_CACHE_DIR", str(server_root / ".data" / "tts_cache")),
+            server_root,
+        ),
+        tts_cache_memory_max_mb=_to_int(os.getenv("TTS_CACHE_MEMORY_MAX_MB", "32"), 32),
+        tts_cache_disk_max_mb=_to_int(os.getenv("TTS_CACHE_DISK_MAX_MB", "512"), 512),
+        tts_cache_max_text_chars=_to_int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "64"), 64),
+        tts_phrase_bank_warmup=_to_bool(os.getenv("TTS_PHRASE_BANK_WARMUP", "false"), False),
+        tts_phrase_bank_personas=tuple(_to_csv_list(os.getenv("TTS_PHRASE_BANK_PERSONAS"), [])),
+        tts_audio_job_ttl_seconds=_to_float(os.getenv("TTS_AUDIO_JOB_TTL_SECONDS", "120"), 120.0),
+        tts_audio_job_max_jobs=_to_int(os.getenv("TTS_AUDIO_JOB_MAX_JOBS", "256"), 256),
+        ffmpeg_path=os.getenv("FFMPEG_PATH", "ffmpeg"),
+        tts_opus_bitrate_kbps=_to_int(os.getenv("TTS_OPUS_BITRATE_KBPS", "24"), 24),
+        tts_mp3_bitrate_kbps=_to_int(os.getenv("TTS_MP3_BITRATE_KBPS", "48"), 48),
         gpt_sovits_base_url=os.getenv("GPT_SOVITS_BASE_URL", "http://127.0.0.1:9880"),
         gpt_sovits_timeout_seconds=_to_float(
             os.getenv("GPT_SOVITS_TIMEOUT_SECONDS", "60"),
@@ -274,6 +377,7 @@ def get_settings() -> Settings:
         gpt_sovits_parallel_infer=_to_bool(os.getenv("GPT_SOVITS_PARALLEL_INFER", "true"), True),
         gpt_sovits_split_bucket=_to_bool(os.getenv("GPT_SOVITS_SPLIT_BUCKET", "true"), True),
         gpt_sovits_seed=_to_int(os.getenv("GPT_SOVITS_SEED", "-1"), -1),
+        gpt_sovits_streaming_mode=_to_bool(os.getenv("GPT_SOVITS_STREAMING_MODE", "false"), False),
         cosyvoice_target_model=os.getenv(
             "QWEN_TTS_TARGET_MODEL",
             os.getenv("COSYVOICE_TARGET_MODEL", "qwen3-tts-vc-realtime-2026-01-15"),
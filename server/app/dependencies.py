@@ -4,9 +4,12 @@ from __future__ import annotations
 
 from functools import lru_cache
 
+from fastapi import Depends
+
 from app.core.settings import get_settings
 from app.repositories.auth_store import AuthStore
-from app.repositories.session_store import SessionStore
+from app.repositories.session_cache import SessionCache
+from app.repositories.session_store import AsyncSessionStore, SessionStore
 from app.services.auth.captcha_verifier import CaptchaVerifier
 from app.services.auth.sms_auth_service import SmsAuthService
 
@@ -14,7 +17,26 @@ from app.services.auth.sms_auth_service import SmsAuthService
 @lru_cache(maxsize=1)
 def get_session_store() -> SessionStore:
     settings = get_settings()
-    return SessionStore(settings.sqlite_db_path)
+    cache = None
+    if settings.session_cache_max_sessions > 0:
+        cache = SessionCache(
+            max_sessions=settings.session_cache_max_sessions,
+            ttl_seconds=settings.session_cache_ttl_seconds,
+            history_size=settings.dialogue_history_limit,
+        )
+    return SessionStore(
+        settings.sqlite_db_path,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+        cache_size_kib=settings.sqlite_cache_size_kib,
+        cache=cache,
+    )
+
+
+def get_async_session_store(
+    store: SessionStore = Depends(get_session_store),
+) -> AsyncSessionStore:
+    # 依赖 get_session_store，测试中覆盖同步 store 即可同时作用于异步接口。
+    return AsyncSessionStore(store)
 
 
 @lru_cache(maxsize=1)
@@ -57,7 +79,14 @@ def get_sms_auth_service() -> SmsAuthService:
     )
 
 
+def close_session_store() -> None:
+    # 仅关闭已创建的实例，避免在退出阶段反而新建连接。
+    if get_session_store.cache_info().currsize:
+        get_session_store().close()
+
+
 def clear_dependency_cache() -> None:
+    close_session_store()
     get_session_store.cache_clear()
     get_auth_store.cache_clear()
     get_captcha_verifier.cache_clear()
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -10,8 +14,38 @@ load_dotenv()
 
 from app.api.v1.router import api_router
 from app.core.settings import get_settings
+from app.dependencies import close_session_store
+from app.services.dialogue.phrase_bank import awarm_phrase_bank
+from app.services.http_clients import aclose_http_clients
+from app.services.tts.audio_jobs import get_tts_audio_jobs
+from app.services.tts.qwen_voice_clone_client import get_realtime_session_pool
+from app.services.tts.tts_service import aprewarm_qwen_realtime_sessions
+from app.services.upstream_limits import shutdown_upstream_executors
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    # 常用台词预热与 realtime 会话预建放到后台，不阻塞启动；未完成时按正常合成路径处理。
+    warmup_tasks = []
+    if settings.tts_phrase_bank_warmup:
+        warmup_tasks.append(asyncio.create_task(awarm_phrase_bank()))
+    if settings.qwen_tts_realtime_pool_enabled and settings.qwen_tts_realtime_pool_prewarm:
+        warmup_tasks.append(asyncio.create_task(aprewarm_qwen_realtime_sessions()))
+    yield
+    for task in warmup_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await task
+    # 退出时取消未取回的后台合成，并释放上游连接池、realtime 长连接、SDK 线程池与 SQLite 长连接。
+    await get_tts_audio_jobs().aclose()
+    await asyncio.to_thread(get_realtime_session_pool().close_all)
+    await aclose_http_clients()
+    shutdown_upstream_executors()
+    close_session_store()
+
 
-app = FastAPI(title="Anima Companion Server", version="0.1.0")
+app = FastAPI(title="Anima Companion Server", version="0.1.0", lifespan=lifespan)
 settings = get_settings()
 
 app.add_middleware(
@@ -0,0 +1,193 @@
+"""热会话进程内缓存：近期历史、关系值与用户轮次。"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+
+@dataclass
+class _SessionEntry:
+    expires_at: float
+    # 每次写入递增；加载前记下版本，回填时版本不一致说明期间有写入，放弃回填。
+    version: int = 0
+    history: list[dict[str, str]] | None = None
+    history_complete: bool = False
+    relationship: dict[str, int] | None = None
+    user_turns: int | None = None
+
+
+@dataclass(frozen=True)
+class CacheLoadToken:
+    entry: _SessionEntry
+    version: int
+
+
+class SessionCache:
+    """按 session_id 的 LRU + TTL 缓存，由 SessionStore 写穿更新。
+
+    写入方需在 ``write_guard(session_id)`` 内完成落库与 ``record_*``，使回填不会夹在两者之间。
+    仅对当前进程可见；多进程部署时其他进程的写入最多在 TTL 后可见。
+    """
+
+    _LOCK_STRIPES = 64
+
+    def __init__(self, max_sessions: int = 1024, ttl_seconds: float = 300.0, history_size: int = 12) -> None:
+        self._max_sessions = max(int(max_sessions), 1)
+        self._ttl_seconds = max(float(ttl_seconds), 0.0)
+        self._history_size = max(int(history_size), 1)
+        self._entries: OrderedDict[str, _SessionEntry] = OrderedDict()
+        self._lock = Lock()
+        self._write_locks = tuple(Lock() for _ in range(self._LOCK_STRIPES))
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def history_size(self) -> int:
+        return self._history_size
+
+    def write_guard(self, session_id: str) -> Lock:
+        return self._write_locks[hash(session_id) % self._LOCK_STRIPES]
+
+    # ---- 读取 ----
+
+    def get_history(self, session_id: str, limit: int) -> list[dict[str, str]] | None:
+        with self._lock:
+            entry = self._get_live_entry(session_id)
+            history = entry.history if entry is not None else None
+            if history is None or (limit > len(history) and not entry.history_complete):
+                self._misses += 1
+                return None
+            self._hits += 1
+            selected = history[-limit:] if limit > 0 else []
+            return [dict(item) for item in selected]
+
+    def get_relationship(self, session_id: str) -> dict[str, int] | None:
+        with self._lock:
+            entry = self._get_live_entry(session_id)
+            if entry is None or entry.relationship is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return dict(entry.relationship)
+
+    def get_user_turns(self, session_id: str) -> int | None:
+        with self._lock:
+            entry = self._get_live_entry(session_id)
+            if entry is None or entry.user_turns is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry.user_turns
+
+    # ---- 未命中回填 ----
+
+    def begin_load(self, session_id: str) -> CacheLoadToken:
+        with self.write_guard(session_id), self._lock:
+            entry = self._ensure_entry(session_id)
+            return CacheLoadToken(entry=entry, version=entry.version)
+
+    def fill_history(self, session_id: str, token: CacheLoadToken, rows: list[dict[str, str]], limit: int) -> None:
+        with self.write_guard(session_id), self._lock:
+            entry = self._entry_for_fill(session_id, token)
+            if entry is None:
+                return
+            # rows 少于请求条数即代表会话全部消息均已读出。
+            complete = len(rows) < limit and len(rows) <= self._history_size
+            entry.history = [dict(item) for item in rows[-self._history_size :]]
+            entry.history_complete = complete
+
+    def fill_relationship(self, session_id: str, token: CacheLoadToken, relationship: dict[str, int]) -> None:
+        with self.write_guard(session_id), self._lock:
+            entry = self._entry_for_fill(session_id, token)
+            if entry is not None:
+                entry.relationship = dict(relationship)
+
+    def fill_user_turns(self, session_id: str, token: CacheLoadToken, user_turns: int) -> None:
+        with self.write_guard(session_id), self._lock:
+            entry = self._entry_for_fill(session_id, token)
+            if entry is not None:
+                entry.user_turns = int(user_turns)
+
+    # ---- 写穿 ----
+
+    def record_message(self, session_id: str, role: str, content: str) -> None:
+        with self._lock:
+            entry = self._ensure_entry(session_id)
+            entry.version += 1
+            if entry.history is not None:
+                entry.history.append({"role": role, "content": content})
+                if len(entry.history) > self._history_size:
+                    del entry.history[0 : len(entry.history) - self._history_size]
+                    entry.history_complete = False
+            if role == "user" and entry.user_turns is not None:
+                entry.user_turns += 1
+
+    def record_relationship_delta(self, session_id: str, delta: dict[str, int]) -> None:
+        with self._lock:
+            entry = self._ensure_entry(session_id)
+            entry.version += 1
+            if entry.relationship is not None:
+                for key, value in delta.items():
+                    entry.relationship[key] = entry.relationship.get(key, 0) + int(value)
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                entry.version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry.version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "sessions": len(self._entries),
+                "max_sessions": self._max_sessions,
+                "ttl_seconds": self._ttl_seconds,
+                "history_size": self._history_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+    # ---- 内部（调用方已持锁） ----
+
+    def _get_live_entry(self, session_id: str) -> _SessionEntry | None:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[session_id]
+            entry.version += 1
+            return None
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def _ensure_entry(self, session_id: str) -> _SessionEntry:
+        entry = self._get_live_entry(session_id)
+        if entry is not None:
+            return entry
+        entry = _SessionEntry(expires_at=time.monotonic() + self._ttl_seconds)
+        self._entries[session_id] = entry
+        while len(self._entries) > self._max_sessions:
+            _, evicted = self._entries.popitem(last=False)
+            evicted.version += 1
+            self._evictions += 1
+        return entry
+
+    def _entry_for_fill(self, session_id: str, token: CacheLoadToken) -> _SessionEntry | None:
+        entry = self._entries.get(session_id)
+        if entry is not token.entry or entry.version != token.version:
+            return None
+        return entry
@@ -2,27 +2,108 @@
 
 from __future__ import annotations
 
+import asyncio
 import sqlite3
+import threading
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 from typing import Any, Callable, TypeVar
 
+from app.repositories.session_cache import SessionCache
+
 T = TypeVar("T")
 
+# 按 PRAGMA user_version 逐级执行的结构迁移；每一步须可重复执行（修复缺表时会整体重放）。
+_SCHEMA_MIGRATIONS: tuple[str, ...] = (
+    # v1: 按会话读取 / 计数 / 清理的复合索引
+    """
+    CREATE INDEX IF NOT EXISTS idx_messages_session_id ON messages(session_id, id);
+    CREATE INDEX IF NOT EXISTS idx_messages_session_role ON messages(session_id, role);
+    CREATE INDEX IF NOT EXISTS idx_memories_session_id ON memories(session_id, id);
+    """,
+    # v2: 会话计数物化表，按现有消息回填
+    """
+    CREATE TABLE IF NOT EXISTS session_stats (
+      session_id TEXT PRIMARY KEY,
+      user_turns INTEGER NOT NULL DEFAULT 0,
+      assistant_turns INTEGER NOT NULL DEFAULT 0,
+      last_active_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_session_stats_last_active ON session_stats(last_active_at);
+    INSERT OR REPLACE INTO session_stats(session_id, user_turns, assistant_turns, last_active_at)
+    SELECT
+      session_id,
+      SUM(CASE WHEN role = 'user' THEN 1 ELSE 0 END),
+      SUM(CASE WHEN role = 'assistant' THEN 1 ELSE 0 END),
+      MAX(ts)
+    FROM messages
+    GROUP BY session_id;
+    """,
+)
+
 
 class SessionStore:
     """P0 会话持久化存储。"""
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        busy_timeout_ms: int = 5000,
+        cache_size_kib: int = 8192,
+        cache: SessionCache | None = None,
+    ) -> None:
         self._db_path = db_path
+        self._cache = cache
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._busy_timeout_ms = max(int(busy_timeout_ms), 0)
+        self._cache_size_kib = max(int(cache_size_kib), 0)
+        # 每个线程持有一条长连接；close() 递增代号，使各线程在下次使用时重连。
+        self._local = threading.local()
+        self._generation = 0
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_tables()
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "generation", -1) == self._generation:
+            return conn
+        conn = self._open_connection()
+        with self._connections_lock:
+            self._connections.append(conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+
+    def _open_connection(self) -> sqlite3.Connection:
+        # 连接只在所属线程内使用，check_same_thread=False 仅为允许 close() 跨线程回收。
+        conn = sqlite3.connect(
+            self._db_path,
+            timeout=self._busy_timeout_ms / 1000,
+            check_same_thread=False,
+        )
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size=-{self._cache_size_kib}")
         return conn
 
-    def _init_tables(self) -> None:
+    def close(self) -> None:
+        """关闭全部线程的连接；之后的调用会按需重新建立连接。"""
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _init_tables(self, *, replay_migrations: bool = False) -> None:
         with self._connect() as conn:
             conn.executescript(
                 """
@@ -52,6 +133,22 @@ class SessionStore:
                 );
                 """
             )
+        self._apply_migrations(replay=replay_migrations)
+
+    def _apply_migrations(self, *, replay: bool = False) -> None:
+        conn = self._connect()
+        current = 0 if replay else int(conn.execute("PRAGMA user_version").fetchone()[0])
+        for version, script in enumerate(_SCHEMA_MIGRATIONS, start=1):
+            if version <= current:
+                continue
+            # 迁移脚本与版本号写入同一事务，中途失败时下次启动整体重做。
+            try:
+                conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+            except sqlite3.Error:
+                # executescript 在出错语句处中止，事务仍开着；线程内复用的连接必须先回滚。
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
 
     @staticmethod
     def _is_missing_table_error(exc: sqlite3.OperationalError) -> bool:
@@ -64,19 +161,36 @@ class SessionStore:
         except sqlite3.OperationalError as exc:
             if not self._is_missing_table_error(exc):
                 raise
-            self._init_tables()
+            self._init_tables(replay_migrations=True)
             with self._connect() as conn:
                 return action(conn)
 
+    def _write_guard(self, session_id: str) -> AbstractContextManager[Any]:
+        return self._cache.write_guard(session_id) if self._cache is not None else nullcontext()
+
+    def cache_stats(self) -> dict[str, Any] | None:
+        return self._cache.stats() if self._cache is not None else None
+
     def add_message(self, session_id: str, role: str, content: str) -> None:
-        self._run_with_schema_retry(
-            lambda conn: conn.execute(
-                "INSERT INTO messages(session_id, role, content) VALUES(?, ?, ?)",
-                (session_id, role, content),
-            )
-        )
+        with self._write_guard(session_id):
+            self._run_with_schema_retry(lambda conn: self._insert_message(conn, session_id, role, content))
+            if self._cache is not None:
+                self._cache.record_message(session_id, role, content)
 
     def list_recent_messages(self, session_id: str, limit: int = 12) -> list[dict[str, str]]:
+        if self._cache is None:
+            return self._load_recent_messages(session_id, limit)
+        cached = self._cache.get_history(session_id, limit)
+        if cached is not None:
+            return cached
+        token = self._cache.begin_load(session_id)
+        # 按缓存容量多读一些，后续不同 limit 的请求也能命中。
+        load_limit = max(limit, self._cache.history_size)
+        rows = self._load_recent_messages(session_id, load_limit)
+        self._cache.fill_history(session_id, token, rows, load_limit)
+        return rows[-limit:] if limit > 0 else []
+
+    def _load_recent_messages(self, session_id: str, limit: int) -> list[dict[str, str]]:
         rows = self._run_with_schema_retry(
             lambda conn: conn.execute(
                 """
@@ -93,37 +207,65 @@ class SessionStore:
         return [{"role": str(row["role"]), "content": str(row["content"])} for row in rows]
 
     def count_user_turns(self, session_id: str) -> int:
+        if self._cache is None:
+            return self._load_user_turns(session_id)
+        cached = self._cache.get_user_turns(session_id)
+        if cached is not None:
+            return cached
+        token = self._cache.begin_load(session_id)
+        user_turns = self._load_user_turns(session_id)
+        self._cache.fill_user_turns(session_id, token, user_turns)
+        return user_turns
+
+    def _load_user_turns(self, session_id: str) -> int:
         row = self._run_with_schema_retry(
             lambda conn: conn.execute(
-                "SELECT COUNT(*) AS count FROM messages WHERE session_id = ? AND role = 'user'",
+                "SELECT user_turns FROM session_stats WHERE session_id = ?",
                 (session_id,),
             ).fetchone()
         )
-        return int(row["count"]) if row else 0
+        return int(row["user_turns"]) if row else 0
 
-    def upsert_memories(self, session_id: str, memory_writes: list[dict[str, str]]) -> None:
-        if not memory_writes:
-            return
-        self._run_with_schema_retry(
-            lambda conn: conn.executemany(
+    def list_active_sessions(self, limit: int = 50) -> list[dict[str, Any]]:
+        """按最近活跃时间倒序列出会话，仅读取 session_stats。"""
+        rows = self._run_with_schema_retry(
+            lambda conn: conn.execute(
                 """
-                INSERT INTO memories(session_id, key, value, type)
-                VALUES(?, ?, ?, ?)
+                SELECT session_id, user_turns, assistant_turns, last_active_at
+                FROM session_stats
+                ORDER BY last_active_at DESC
+                LIMIT ?
                 """,
-                [
-                    (
-                        session_id,
-                        item.get("key", "").strip(),
-                        item.get("value", "").strip(),
-                        item.get("type", "note").strip(),
-                    )
-                    for item in memory_writes
-                    if item.get("key") and item.get("value")
-                ],
-            )
+                (max(int(limit), 1),),
+            ).fetchall()
         )
+        return [
+            {
+                "session_id": str(row["session_id"]),
+                "user_turns": int(row["user_turns"]),
+                "assistant_turns": int(row["assistant_turns"]),
+                "last_active_at": str(row["last_active_at"]),
+            }
+            for row in rows
+        ]
+
+    def upsert_memories(self, session_id: str, memory_writes: list[dict[str, str]]) -> None:
+        if not memory_writes:
+            return
+        self._run_with_schema_retry(lambda conn: self._insert_memories(conn, session_id, memory_writes))
 
     def get_relationship(self, session_id: str) -> dict[str, int]:
+        if self._cache is None:
+            return self._load_relationship(session_id)
+        cached = self._cache.get_relationship(session_id)
+        if cached is not None:
+            return cached
+        token = self._cache.begin_load(session_id)
+        relationship = self._load_relationship(session_id)
+        self._cache.fill_relationship(session_id, token, relationship)
+        return relationship
+
+    def _load_relationship(self, session_id: str) -> dict[str, int]:
         row = self._run_with_schema_retry(
             lambda conn: conn.execute(
                 "SELECT trust, reliance, fatigue FROM relationship WHERE session_id = ?",
@@ -139,46 +281,163 @@ class SessionStore:
         }
 
     def apply_relationship_delta(self, session_id: str, delta: dict[str, Any]) -> dict[str, int]:
-        trust_delta = int(delta.get("trust", 0) or 0)
-        reliance_delta = int(delta.get("reliance", 0) or 0)
-        fatigue_delta = int(delta.get("fatigue", 0) or 0)
-        current = self.get_relationship(session_id)
-        updated = {
-            "trust": current["trust"] + trust_delta,
-            "reliance": current["reliance"] + reliance_delta,
-            "fatigue": current["fatigue"] + fatigue_delta,
-        }
-        self._run_with_schema_retry(
-            lambda conn: conn.execute(
-                """
-                INSERT INTO relationship(session_id, trust, reliance, fatigue)
-                VALUES(?, ?, ?, ?)
-                ON CONFLICT(session_id)
-                DO UPDATE SET
-                  trust = excluded.trust,
-                  reliance = excluded.reliance,
-                  fatigue = excluded.fatigue,
-                  ts = CURRENT_TIMESTAMP
-                """,
-                (
-                    session_id,
-                    updated["trust"],
-                    updated["reliance"],
-                    updated["fatigue"],
-                ),
+        applied = self._normalize_relationship_delta(delta)
+        with self._write_guard(session_id):
+            self._run_with_schema_retry(lambda conn: self._increment_relationship(conn, session_id, applied))
+            if self._cache is not None:
+                self._cache.record_relationship_delta(session_id, applied)
+        return applied
+
+    def commit_turn(
+        self,
+        session_id: str,
+        assistant_msg: str,
+        memories: list[dict[str, str]],
+        delta: dict[str, Any],
+    ) -> dict[str, int]:
+        """在同一事务内写入助手回复、记忆与关系增量，返回实际应用的增量。"""
+        applied = self._normalize_relationship_delta(delta)
+
+        def write(conn: sqlite3.Connection) -> None:
+            self._insert_message(conn, session_id, "assistant", assistant_msg)
+            self._insert_memories(conn, session_id, memories)
+            self._increment_relationship(conn, session_id, applied)
+
+        with self._write_guard(session_id):
+            self._run_with_schema_retry(write)
+            if self._cache is not None:
+                self._cache.record_message(session_id, "assistant", assistant_msg)
+                self._cache.record_relationship_delta(session_id, applied)
+        return applied
+
+    @staticmethod
+    def _insert_message(conn: sqlite3.Connection, session_id: str, role: str, content: str) -> None:
+        conn.execute(
+            "INSERT INTO messages(session_id, role, content) VALUES(?, ?, ?)",
+            (session_id, role, content),
+        )
+        # 与消息写入同一事务维护计数，轮次判断只需一次主键查询。
+        conn.execute(
+            """
+            INSERT INTO session_stats(session_id, user_turns, assistant_turns, last_active_at)
+            VALUES(?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(session_id)
+            DO UPDATE SET
+              user_turns = user_turns + excluded.user_turns,
+              assistant_turns = assistant_turns + excluded.assistant_turns,
+              last_active_at = excluded.last_active_at
+            """,
+            (session_id, int(role == "user"), int(role == "assistant")),
+        )
+
+    @staticmethod
+    def _insert_memories(
+        conn: sqlite3.Connection,
+        session_id: str,
+        memory_writes: list[dict[str, str]],
+    ) -> None:
+        rows = [
+            (
+                session_id,
+                item.get("key", "").strip(),
+                item.get("value", "").strip(),
+                item.get("type", "note").strip(),
             )
+            for item in memory_writes
+            if item.get("key") and item.get("value")
+        ]
+        if not rows:
+            return
+        conn.executemany(
+            """
+            INSERT INTO memories(session_id, key, value, type)
+            VALUES(?, ?, ?, ?)
+            """,
+            rows,
         )
+
+    @staticmethod
+    def _normalize_relationship_delta(delta: dict[str, Any]) -> dict[str, int]:
         return {
-            "trust": trust_delta,
-            "reliance": reliance_delta,
-            "fatigue": fatigue_delta,
+            "trust": int(delta.get("trust", 0) or 0),
+            "reliance": int(delta.get("reliance", 0) or 0),
+            "fatigue": int(delta.get("fatigue", 0) or 0),
         }
 
+    @staticmethod
+    def _increment_relationship(conn: sqlite3.Connection, session_id: str, delta: dict[str, int]) -> None:
+        # 在 SQL 内原地累加，避免先读后写在并发下丢失更新。
+        conn.execute(
+            """
+            INSERT INTO relationship(session_id, trust, reliance, fatigue)
+            VALUES(?, ?, ?, ?)
+            ON CONFLICT(session_id)
+            DO UPDATE SET
+              trust = trust + excluded.trust,
+              reliance = reliance + excluded.reliance,
+              fatigue = fatigue + excluded.fatigue,
+              ts = CURRENT_TIMESTAMP
+            """,
+            (session_id, delta["trust"], delta["reliance"], delta["fatigue"]),
+        )
+
     def clear_session(self, session_id: str) -> None:
-        self._run_with_schema_retry(
-            lambda conn: (
-                conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,)),
-                conn.execute("DELETE FROM memories WHERE session_id = ?", (session_id,)),
-                conn.execute("DELETE FROM relationship WHERE session_id = ?", (session_id,)),
+        with self._write_guard(session_id):
+            self._run_with_schema_retry(
+                lambda conn: (
+                    conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,)),
+                    conn.execute("DELETE FROM memories WHERE session_id = ?", (session_id,)),
+                    conn.execute("DELETE FROM relationship WHERE session_id = ?", (session_id,)),
+                    conn.execute("DELETE FROM session_stats WHERE session_id = ?", (session_id,)),
+                )
             )
-        )
+            if self._cache is not None:
+                self._cache.invalidate(session_id)
+
+
+class AsyncSessionStore:
+    """SessionStore 的异步外观：SQLite 调用放到线程中执行，避免阻塞事件循环。"""
+
+    def __init__(self, store: SessionStore) -> None:
+        self._store = store
+
+    @property
+    def sync_store(self) -> SessionStore:
+        return self._store
+
+    async def run(self, action: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在一次线程切换内执行多步同步存储操作：``action(sync_store, *args, **kwargs)``。"""
+        return await asyncio.to_thread(action, self._store, *args, **kwargs)
+
+    async def add_message(self, session_id: str, role: str, content: str) -> None:
+        await asyncio.to_thread(self._store.add_message, session_id, role, content)
+
+    async def list_recent_messages(self, session_id: str, limit: int = 12) -> list[dict[str, str]]:
+        return await asyncio.to_thread(self._store.list_recent_messages, session_id, limit)
+
+    async def count_user_turns(self, session_id: str) -> int:
+        return await asyncio.to_thread(self._store.count_user_turns, session_id)
+
+    async def list_active_sessions(self, limit: int = 50) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self._store.list_active_sessions, limit)
+
+    async def upsert_memories(self, session_id: str, memory_writes: list[dict[str, str]]) -> None:
+        await asyncio.to_thread(self._store.upsert_memories, session_id, memory_writes)
+
+    async def get_relationship(self, session_id: str) -> dict[str, int]:
+        return await asyncio.to_thread(self._store.get_relationship, session_id)
+
+    async def apply_relationship_delta(self, session_id: str, delta: dict[str, Any]) -> dict[str, int]:
+        return await asyncio.to_thread(self._store.apply_relationship_delta, session_id, delta)
+
+    async def commit_turn(
+        self,
+        session_id: str,
+        assistant_msg: str,
+        memories: list[dict[str, str]],
+        delta: dict[str, Any],
+    ) -> dict[str, int]:
+        return await asyncio.to_thread(self._store.commit_turn, session_id, assistant_msg, memories, delta)
+
+    async def clear_session(self, session_id: str) -> None:
+        await asyncio.to_thread(self._store.clear_session, session_id)
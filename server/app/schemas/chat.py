@@ -9,6 +9,10 @@ from pydantic import BaseModel, Field
 Emotion = Literal["neutral", "happy", "sad", "angry", "shy"]
 Animation = Literal["idle", "listen", "think", "speak", "happy", "sad", "angry"]
 MemoryType = Literal["preference", "taboo", "important_names", "note"]
+# base64：音频内联在 JSON 中；stream：先返回元数据与 tts_audio_url，音频经 GET 以二进制分块取回。
+AudioMode = Literal["base64", "stream"]
+# 上游统一合成 wav，其余格式由服务端转码；转码不可用时回退 wav，实际类型见 tts_media_type。
+OutputFormat = Literal["wav", "mp3", "opus", "webm"]
 
 
 class RelationshipDelta(BaseModel):
@@ -30,6 +34,8 @@ class ChatTextRequest(BaseModel):
     tts_provider: Literal["auto", "qwen_clone_tts", "gpt_sovits", "cosyvoice_tts"] = "qwen_clone_tts"
     qwen_voice_id: str = ""
     qwen_target_model: str = ""
+    audio_mode: AudioMode = "base64"
+    output_format: OutputFormat = "wav"
 
 
 class ChatTextResponse(BaseModel):
@@ -43,7 +49,8 @@ class ChatTextResponse(BaseModel):
 
 class ChatTextVoiceResponse(ChatTextResponse):
     tts_media_type: str
-    tts_audio_base64: str
+    tts_audio_base64: str = ""
+    tts_audio_url: str | None = None
     tts_error: str | None = None
     tts_provider: str | None = None
 
@@ -53,7 +60,8 @@ class ChatVoiceResponse(BaseModel):
     asr_provider: str | None = None
     assistant_text: str
     tts_media_type: str
-    tts_audio_base64: str
+    tts_audio_base64: str = ""
+    tts_audio_url: str | None = None
     tts_error: str | None = None
     tts_provider: str | None = None
     emotion: Emotion = "neutral"
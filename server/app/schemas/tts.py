@@ -6,6 +6,8 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from app.schemas.chat import OutputFormat
+
 LanguageCode = Literal["zh", "en", "ja"]
 
 
@@ -23,6 +25,7 @@ class TTSSynthesizeRequest(BaseModel):
     temperature: float = Field(1.0, ge=0.0, le=2.0)
     batch_size: int = Field(1, ge=1, le=20)
     media_type: Literal["wav", "raw", "ogg", "aac"] = "wav"
+    output_format: OutputFormat | None = Field(None, description="服务端转码输出格式 wav/mp3/opus/webm；留空按 Accept 协商")
     streaming_mode: bool = False
     qwen_voice_id: str = Field("", description="指定千问复刻 voice（可选）")
     qwen_target_model: str = Field("", description="指定千问 TTS 模型（可选）")
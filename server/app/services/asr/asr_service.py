@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from functools import partial
 from io import BytesIO
 import logging
 import wave
@@ -10,12 +13,17 @@ import wave
 import httpx
 
 from app.core.settings import get_settings
+from app.services.asr.audio_normalize import normalize_for_asr
 from app.services.asr.fun_asr_realtime_client import (
     FunASRClientError,
+    atranscribe_audio_stream_realtime,
     probe_fun_asr_ready,
     transcribe_audio_bytes_realtime,
 )
-from app.services.asr.sensevoice_client import SenseVoiceClientError, transcribe_wav
+from app.services.asr.sensevoice_client import SenseVoiceClientError, atranscribe_wav
+from app.services.asr.vad import split_speech_wav
+from app.services.hedging import run_hedged
+from app.services.http_clients import get_async_http_client
 from app.services.provider_availability import (
     mark_probe_result,
     mark_provider_failure,
@@ -23,10 +31,15 @@ from app.services.provider_availability import (
     should_probe,
     should_skip_provider,
 )
+from app.services.upstream_limits import UPSTREAM_ASR, run_blocking
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_ASR_PROVIDERS = {"sensevoice_http", "fun_asr_realtime"}
+# VAD 判定整段为静音时不调用上游，直接返回空结果。
+VAD_SILENCE_PROVIDER = "vad"
+# 足以覆盖常见 WAV 头（含 LIST 等附加块）。
+_AUDIO_HEAD_BYTES = 4096
 
 
 class ASRServiceError(RuntimeError):
@@ -37,51 +50,159 @@ class ASRUnavailableError(ASRServiceError):
     """所有 ASR provider 不可用。"""
 
 
+class ASREmptyAudioError(ASRServiceError):
+    """上传音频为空。"""
+
+
+class _EmptyTranscriptError(ASRServiceError):
+    """竞速模式下识别结果为空：不算胜出，也不计入 provider 失败。"""
+
+
 @dataclass
 class ASRResult:
     text: str
     provider: str
 
 
-def transcribe_with_fallback(audio_bytes: bytes, filename: str, lang: str | None = None) -> ASRResult:
+async def atranscribe_with_fallback(audio_bytes: bytes, filename: str, lang: str | None = None) -> ASRResult:
+    """按优先级识别整段音频，provider 失败时自动降级。
+
+    开启 ASR_HEDGE_ENABLED 时，不在冷却中的 provider 参与竞速：主 provider 超出 ASR_HEDGE_DELAY_MS
+    仍未返回非空结果时并行启动下一个，取最先返回的非空识别结果；否则逐个降级。
+    """
     settings = get_settings()
-    providers = _resolve_asr_provider_priority()
+    # 归一化与 VAD 为 CPU 计算（或 ffmpeg 子进程），放到线程中避免阻塞事件循环。
+    segments, filename = await asyncio.to_thread(_prepare_segments, audio_bytes, filename)
+    if not segments:
+        return ASRResult(text="", provider=VAD_SILENCE_PROVIDER)
+    hedge_enabled = settings.asr_hedge_enabled
     errors: list[str] = []
-
-    for provider in providers:
+    candidates: list[str] = []
+    for provider in _resolve_asr_provider_priority():
         should_skip, wait_seconds = should_skip_provider(provider)
         if should_skip:
             errors.append(f"{provider}: 冷却中({wait_seconds:.1f}s)")
             continue
+        candidates.append(provider)
+
+    outcome = await run_hedged(
+        "asr",
+        [
+            (
+                provider,
+                partial(
+                    _atry_provider,
+                    provider,
+                    segments,
+                    filename,
+                    lang,
+                    require_text=hedge_enabled,
+                ),
+            )
+            for provider in candidates
+        ],
+        hedge_after_seconds=settings.asr_hedge_delay_ms / 1000 if hedge_enabled else None,
+        expected_errors=(ASRServiceError,),
+    )
+    if outcome.result is not None:
+        return outcome.result
+    # 竞速中各 provider 都只识别出空文本（如静音），与逐个降级时一样返回空结果。
+    for provider, exc in outcome.errors:
+        if isinstance(exc, _EmptyTranscriptError):
+            return ASRResult(text="", provider=provider)
+    errors.extend(f"{provider}: {exc}" for provider, exc in outcome.errors)
+    reason = "; ".join(errors) if errors else "未配置可用 ASR provider"
+    raise ASRUnavailableError(f"语音识别暂不可用，请改用文本输入继续对话。详情: {reason}")
+
+
+async def _atry_provider(
+    provider: str,
+    segments: list[bytes],
+    filename: str,
+    lang: str | None,
+    *,
+    require_text: bool,
+) -> ASRResult:
+    settings = get_settings()
+    ok, probe_reason = await _aprobe_provider_if_needed(provider)
+    if not ok:
+        mark_provider_failure(provider, probe_reason, settings.provider_failure_cooldown_seconds)
+        raise ASRServiceError(f"探测失败({probe_reason})")
 
-        ok, probe_reason = _probe_provider_if_needed(provider)
+    try:
+        text = await _atranscribe_segments(provider=provider, segments=segments, filename=filename, lang=lang)
+    except ASRServiceError as exc:
+        mark_provider_failure(provider, str(exc), settings.provider_failure_cooldown_seconds)
+        logger.warning("ASR provider %s 调用失败: %s", provider, exc)
+        raise
+    mark_provider_success(provider)
+    if require_text and not text.strip():
+        raise _EmptyTranscriptError("识别结果为空")
+    return ASRResult(text=text, provider=provider)
+
+
+async def atranscribe_stream_with_fallback(
+    chunks: AsyncIterator[bytes],
+    *,
+    filename: str,
+    lang: str | None = None,
+    sample_rate: int | None = None,
+) -> ASRResult:
+    """上传音频边到达边送入 Fun-ASR 流式会话，识别与上传重叠，内存不随音频时长增长。
+
+    Fun-ASR 不在优先级中、冷却中、探测或建连失败（尚未送入音频）时，读完整段后走 atranscribe_with_fallback；
+    已开始送入音频后失败无法降级（音频未缓存），直接抛 ASRServiceError。
+    """
+    settings = get_settings()
+    provider = "fun_asr_realtime"
+    head, rest = await _apeek_audio_head(chunks)
+    if not head:
+        raise ASREmptyAudioError("audio 不能为空")
+
+    stream_ready = provider in _resolve_asr_provider_priority() and not should_skip_provider(provider)[0]
+    if stream_ready:
+        ok, probe_reason = await _aprobe_provider_if_needed(provider)
         if not ok:
-            errors.append(f"{provider}: 探测失败({probe_reason})")
             mark_provider_failure(provider, probe_reason, settings.provider_failure_cooldown_seconds)
-            continue
+            stream_ready = False
+
+    if stream_ready:
+        audio_format = _infer_audio_format(filename, fallback=settings.fun_asr_format)
+        fed = False
+
+        async def replay() -> AsyncIterator[bytes]:
+            nonlocal fed
+            fed = True
+            yield head
+            async for chunk in rest:
+                yield chunk
 
         try:
-            text = _transcribe_with_provider(
-                provider=provider,
-                audio_bytes=audio_bytes,
-                filename=filename,
-                lang=lang,
+            text = await atranscribe_audio_stream_realtime(
+                replay(),
+                audio_format=audio_format,
+                sample_rate=sample_rate
+                or _infer_sample_rate(audio_bytes=head, audio_format=audio_format, fallback=settings.fun_asr_sample_rate),
             )
+        except FunASRClientError as exc:
+            mark_provider_failure(provider, str(exc), settings.provider_failure_cooldown_seconds)
+            if fed:
+                raise ASRServiceError(f"{provider}: {exc}") from exc
+            logger.warning("Fun-ASR 流式会话建立失败，改为整段识别: %s", exc)
+        else:
             mark_provider_success(provider)
             return ASRResult(text=text, provider=provider)
-        except ASRServiceError as exc:
-            mark_provider_failure(provider, str(exc), settings.provider_failure_cooldown_seconds)
-            errors.append(f"{provider}: {exc}")
-            logger.warning("ASR provider %s 调用失败: %s", provider, exc)
 
-    reason = "; ".join(errors) if errors else "未配置可用 ASR provider"
-    raise ASRUnavailableError(f"语音识别暂不可用，请改用文本输入继续对话。详情: {reason}")
+    audio = bytearray(head)
+    async for chunk in rest:
+        audio.extend(chunk)
+    return await atranscribe_with_fallback(bytes(audio), filename, lang)
 
 
-def probe_asr_providers() -> dict[str, dict[str, str | bool]]:
+async def aprobe_asr_providers() -> dict[str, dict[str, str | bool]]:
     statuses: dict[str, dict[str, str | bool]] = {}
     for provider in _resolve_asr_provider_priority():
-        ok, reason = _probe_provider(provider)
+        ok, reason = await _aprobe_provider(provider)
         statuses[provider] = {"ok": ok, "reason": reason}
     return statuses
 
@@ -98,24 +219,23 @@ def _resolve_asr_provider_priority() -> list[str]:
     return resolved
 
 
-def _probe_provider_if_needed(provider: str) -> tuple[bool, str]:
+async def _aprobe_provider_if_needed(provider: str) -> tuple[bool, str]:
     settings = get_settings()
     if not should_probe(provider, settings.provider_probe_interval_seconds):
         return True, "probe_cached"
-    ok, reason = _probe_provider(provider)
+    ok, reason = await _aprobe_provider(provider)
     mark_probe_result(provider, ok)
     return ok, reason
 
 
-def _probe_provider(provider: str) -> tuple[bool, str]:
+async def _aprobe_provider(provider: str) -> tuple[bool, str]:
     settings = get_settings()
     if provider == "sensevoice_http":
         url = settings.asr_base_url.rstrip("/")
         try:
-            with httpx.Client(timeout=settings.provider_probe_timeout_seconds) as client:
-                # 连接可达即可；返回 404 也视作服务在线。
-                response = client.get(url)
-                _ = response.status_code
+            # 连接可达即可；返回 404 也视作服务在线。
+            response = await get_async_http_client(url).get(url, timeout=settings.provider_probe_timeout_seconds)
+            _ = response.status_code
             return True, "ok"
         except httpx.HTTPError as exc:
             return False, f"SenseVoice 不可达: {exc}"
@@ -124,39 +244,134 @@ def _probe_provider(provider: str) -> tuple[bool, str]:
     return False, f"未知 provider: {provider}"
 
 
-def _transcribe_with_provider(
+async def _atranscribe_with_provider(
     *,
     provider: str,
     audio_bytes: bytes,
     filename: str,
     lang: str | None,
 ) -> str:
-    settings = get_settings()
     if provider == "sensevoice_http":
         try:
-            return transcribe_wav(audio_bytes, filename=filename, lang=lang)
+            return await atranscribe_wav(audio_bytes, filename=filename, lang=lang)
         except SenseVoiceClientError as exc:
             raise ASRServiceError(str(exc)) from exc
 
     if provider == "fun_asr_realtime":
-        fmt = _infer_audio_format(filename, fallback=settings.fun_asr_format)
-        sample_rate = _infer_sample_rate(
-            audio_bytes=audio_bytes,
-            audio_format=fmt,
-            fallback=settings.fun_asr_sample_rate,
-        )
-        try:
-            return transcribe_audio_bytes_realtime(
-                audio_bytes,
-                audio_format=fmt,
-                sample_rate=sample_rate,
-            )
-        except FunASRClientError as exc:
-            raise ASRServiceError(str(exc)) from exc
+        # Fun-ASR SDK 基于线程回调，放入 ASR 专属线程池执行。
+        return await run_blocking(UPSTREAM_ASR, _transcribe_fun_asr, audio_bytes, filename)
 
     raise ASRServiceError(f"不支持的 ASR provider: {provider}")
 
 
+def _transcribe_fun_asr(audio_bytes: bytes, filename: str) -> str:
+    settings = get_settings()
+    fmt = _infer_audio_format(filename, fallback=settings.fun_asr_format)
+    sample_rate = _infer_sample_rate(audio_bytes=audio_bytes, audio_format=fmt, fallback=settings.fun_asr_sample_rate)
+    try:
+        return transcribe_audio_bytes_realtime(audio_bytes, audio_format=fmt, sample_rate=sample_rate)
+    except FunASRClientError as exc:
+        raise ASRServiceError(str(exc)) from exc
+
+
+async def _atranscribe_segments(
+    *,
+    provider: str,
+    segments: list[bytes],
+    filename: str,
+    lang: str | None,
+) -> str:
+    """VAD 切出的多段并行识别，按原顺序拼接；任一段失败即整体失败。"""
+    if len(segments) == 1:
+        return await _atranscribe_with_provider(provider=provider, audio_bytes=segments[0], filename=filename, lang=lang)
+    tasks = [
+        asyncio.ensure_future(
+            _atranscribe_with_provider(provider=provider, audio_bytes=segment, filename=filename, lang=lang)
+        )
+        for segment in segments
+    ]
+    try:
+        return _join_segment_texts(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _prepare_segments(audio_bytes: bytes, filename: str) -> tuple[list[bytes], str]:
+    """上传前预处理，返回 (各段音频, 上传文件名)。
+
+    - ASR_NORMALIZE_ENABLED：解码、下混、重采样为 ASR_TARGET_SAMPLE_RATE 的 16-bit 单声道 WAV；
+    - ASR_VAD_ENABLED：裁掉静音并在停顿处切段，返回空列表表示整段都是静音。
+    无法处理的音频原样作为一段。
+    """
+    settings = get_settings()
+    if settings.asr_normalize_enabled:
+        normalized = normalize_for_asr(audio_bytes, filename, target_rate=settings.asr_target_sample_rate)
+        if normalized is not None:
+            logger.info(
+                "ASR 音频归一化: %s -> %sHz mono，%s -> %s 字节",
+                normalized.source,
+                normalized.sample_rate,
+                len(audio_bytes),
+                len(normalized.audio_bytes),
+            )
+            audio_bytes = normalized.audio_bytes
+            filename = _wav_filename(filename)
+    if not settings.asr_vad_enabled:
+        return [audio_bytes], filename
+    result = split_speech_wav(
+        audio_bytes,
+        min_silence_ms=settings.asr_vad_min_silence_ms,
+        padding_ms=settings.asr_vad_padding_ms,
+        max_segment_seconds=settings.asr_vad_max_segment_seconds,
+        min_speech_dbfs=settings.asr_vad_min_speech_dbfs,
+    )
+    if result is None:
+        return [audio_bytes], filename
+    logger.info(
+        "ASR VAD: %.2fs -> %.2fs，%s 段",
+        result.input_seconds,
+        result.output_seconds,
+        len(result.segments),
+    )
+    return result.segments, _wav_filename(filename)
+
+
+def _wav_filename(filename: str) -> str:
+    # 处理后的音频均为 WAV，文件名后缀决定 Fun-ASR 的音频格式。
+    if _infer_audio_format(filename, fallback="") == "wav":
+        return filename
+    return "voice.wav"
+
+
+def _join_segment_texts(texts: list[str]) -> str:
+    """拼接分段识别结果：两侧均为拉丁字母或数字时补空格，中文直接相连。"""
+    joined = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if joined and joined[-1].isascii() and joined[-1].isalnum() and text[0].isascii() and text[0].isalnum():
+            joined += " "
+        joined += text
+    return joined
+
+
+async def _apeek_audio_head(
+    chunks: AsyncIterator[bytes],
+    min_bytes: int = _AUDIO_HEAD_BYTES,
+) -> tuple[bytes, AsyncIterator[bytes]]:
+    """先读够文件头（用于从 WAV 头推断采样率），返回已读部分与剩余迭代器。"""
+    iterator = aiter(chunks)
+    head = bytearray()
+    while len(head) < min_bytes:
+        try:
+            head.extend(await anext(iterator))
+        except StopAsyncIteration:
+            break
+    return bytes(head), iterator
+
+
 def _infer_audio_format(filename: str, *, fallback: str) -> str:
     text = str(filename or "").strip().lower()
     if "." in text:
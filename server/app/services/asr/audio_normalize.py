@@ -0,0 +1,164 @@
+"""ASR 上传前的音频归一化：解码、下混为单声道并重采样为 16-bit PCM WAV（默认 16 kHz）。
+
+WAV 的下混与重采样使用 NumPy 向量化实现，依赖可选包 numpy（pip install ".[audio]"）；
+mp3/opus 等压缩格式经 ffmpeg 解码。依赖缺失或无法解析时原样上传。
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_DECODE_TIMEOUT_SECONDS = 30.0
+# ffmpeg 解码的压缩格式（按文件名后缀判断）。
+_COMPRESSED_FORMATS = {"mp3", "opus", "ogg", "webm", "aac", "m4a", "amr", "flac", "speex"}
+# 降采样抗混叠 FIR 的单侧长度（抽头数 2N+1）。
+_LOWPASS_HALF_TAPS = 32
+
+
+@dataclass(frozen=True)
+class NormalizedAudio:
+    # 16-bit 单声道 PCM WAV。
+    audio_bytes: bytes
+    sample_rate: int
+    source: str
+
+
+def normalize_for_asr(audio_bytes: bytes, filename: str, *, target_rate: int) -> NormalizedAudio | None:
+    """归一化为 target_rate 的 16-bit 单声道 WAV；已满足、格式不支持或依赖缺失时返回 None。"""
+    if audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
+        return _normalize_wav(audio_bytes, target_rate=target_rate)
+    suffix = str(filename or "").strip().lower().rsplit(".", 1)[-1]
+    if suffix in _COMPRESSED_FORMATS:
+        return _decode_with_ffmpeg(audio_bytes, suffix, target_rate=target_rate)
+    return None
+
+
+def resample_mono(samples: Any, source_rate: int, target_rate: int) -> Any:
+    """float32 单声道重采样：降采样先做窗函数 sinc 低通抗混叠，再线性插值到目标采样点。"""
+    np = _load_numpy()
+    if np is None or source_rate == target_rate or len(samples) == 0:
+        return samples
+    # 短于滤波器的输入跳过低通：mode="same" 会按较长的 kernel 输出，样本数随之变化。
+    if target_rate < source_rate and len(samples) > 2 * _LOWPASS_HALF_TAPS:
+        cutoff = 0.5 * target_rate / source_rate
+        taps = np.arange(-_LOWPASS_HALF_TAPS, _LOWPASS_HALF_TAPS + 1)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        samples = np.convolve(samples, kernel / kernel.sum(), mode="same")
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(target_length) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def _normalize_wav(audio_bytes: bytes, *, target_rate: int) -> NormalizedAudio | None:
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+            channels = reader.getnchannels()
+            sample_width = reader.getsampwidth()
+            sample_rate = reader.getframerate()
+            frames = reader.readframes(reader.getnframes())
+    except (wave.Error, EOFError):
+        # 如 float WAV（wave 模块只支持整型 PCM）。
+        return None
+    if channels == 1 and sample_width == 2 and sample_rate == target_rate:
+        return None
+    np = _load_numpy()
+    if np is None or sample_rate <= 0 or sample_width not in (1, 2, 3, 4):
+        return None
+
+    samples = _pcm_to_float(np, frames, sample_width).reshape(-1, channels).mean(axis=1)
+    samples = resample_mono(samples, sample_rate, target_rate)
+    pcm16 = np.clip(np.round(samples * 32767.0), -32768, 32767).astype("<i2").tobytes()
+    return NormalizedAudio(
+        audio_bytes=_wrap_pcm16_wav(pcm16, target_rate),
+        sample_rate=target_rate,
+        source=f"wav {sample_rate}Hz {channels}ch {sample_width * 8}bit",
+    )
+
+
+def _pcm_to_float(np: Any, frames: bytes, sample_width: int) -> Any:
+    usable = len(frames) // sample_width * sample_width
+    frames = frames[:usable]
+    if sample_width == 1:
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        # 24-bit 补码符号扩展。
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        return values.astype(np.float32) / float(1 << 23)
+    return np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+
+
+def _decode_with_ffmpeg(audio_bytes: bytes, fmt: str, *, target_rate: int) -> NormalizedAudio | None:
+    binary = shutil.which(get_settings().ffmpeg_path)
+    if binary is None:
+        return None
+    command = [
+        binary,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        "pipe:0",
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(target_rate),
+        "-f",
+        "s16le",
+        "pipe:1",
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            input=audio_bytes,
+            capture_output=True,
+            timeout=_DECODE_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        logger.warning("ffmpeg 解码 %s 失败，原样上传: %s", fmt, exc)
+        return None
+    if completed.returncode != 0 or not completed.stdout:
+        detail = completed.stderr.decode("utf-8", errors="replace").strip()[-300:]
+        logger.warning("ffmpeg 解码 %s 失败(code=%s)，原样上传: %s", fmt, completed.returncode, detail)
+        return None
+    return NormalizedAudio(
+        audio_bytes=_wrap_pcm16_wav(completed.stdout, target_rate),
+        sample_rate=target_rate,
+        source=fmt,
+    )
+
+
+def _wrap_pcm16_wav(pcm16: bytes, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm16)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _load_numpy() -> Any:
+    try:
+        import numpy  # type: ignore
+    except ImportError:
+        logger.info("未安装 numpy，跳过 WAV 下混与重采样（pip install \".[audio]\"）")
+        return None
+    return numpy
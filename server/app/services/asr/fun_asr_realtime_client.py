@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 from queue import Empty, Queue
 from threading import Event
 from typing import Any
 
 from app.core.settings import get_settings
+from app.services.upstream_limits import UPSTREAM_ASR, run_on_upstream_executor, upstream_slot
 
 
 class FunASRClientError(RuntimeError):
@@ -45,15 +48,56 @@ def transcribe_audio_bytes_realtime(
         session.stop()
     finally:
         session.close()
+    return _collect_transcript(session)
 
-    events: list[FunASREvent] = []
-    while True:
-        event = session.poll_event(timeout=0.01)
-        if event is None:
-            break
+
+async def atranscribe_audio_stream_realtime(
+    chunks: AsyncIterator[bytes],
+    *,
+    audio_format: str,
+    sample_rate: int,
+) -> str:
+    """边接收边识别：音频块按帧大小切分后立即送入会话，内存只保留不足一帧的余量。
+
+    会话在读取第一块音频之前建立，建连失败时 chunks 尚未被消费，调用方可改走整段识别。
+    整个会话期间占用一个 ASR 上游并发额度，SDK 调用放到 ASR 上游线程池中执行。
+    """
+    session = FunASRRealtimeSession(
+        audio_format=audio_format,
+        sample_rate=sample_rate,
+        loop=asyncio.get_running_loop(),
+    )
+    chunk_size = _resolve_chunk_size(sample_rate=sample_rate, audio_format=audio_format)
+    async with upstream_slot(UPSTREAM_ASR):
+        await run_on_upstream_executor(UPSTREAM_ASR, session.start)
+        pending = bytearray()
+        received = 0
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                received += len(chunk)
+                pending.extend(chunk)
+                while len(pending) >= chunk_size:
+                    frame = bytes(pending[:chunk_size])
+                    del pending[:chunk_size]
+                    await run_on_upstream_executor(UPSTREAM_ASR, session.send_audio_frame, frame)
+            if not received:
+                raise FunASRClientError("空音频无法识别")
+            if pending:
+                await run_on_upstream_executor(UPSTREAM_ASR, session.send_audio_frame, bytes(pending))
+            # stop 会阻塞到服务端返回最终结果。
+            await run_on_upstream_executor(UPSTREAM_ASR, session.stop)
+        finally:
+            await run_on_upstream_executor(UPSTREAM_ASR, session.close)
+    return _collect_transcript(session)
+
+
+def _collect_transcript(session: FunASRRealtimeSession) -> str:
+    events = session.drain_events()
+    for event in events:
         if event.type == "error":
             raise FunASRClientError(event.error or "Fun-ASR 流式识别失败")
-        events.append(event)
 
     merged = _merge_result_events(events)
     if not merged:
@@ -62,17 +106,27 @@ def transcribe_audio_bytes_realtime(
 
 
 class FunASRRealtimeSession:
-    """面向 WebSocket 的 Fun-ASR 实时识别会话。"""
+    """面向 WebSocket 的 Fun-ASR 实时识别会话。
+
+    传入 loop 时，SDK 回调线程经 ``call_soon_threadsafe`` 把事件投递到 asyncio 队列，
+    调用方用 ``anext_event`` 等待，不再为每个会话占用一个轮询线程；close 后事件流以 None 结束。
+    未传 loop 时沿用线程队列，供同步调用方 ``poll_event``。
+    """
 
     def __init__(
         self,
         *,
         audio_format: str = "pcm",
         sample_rate: int = 16000,
+        loop: asyncio.AbstractEventLoop | None = None,
     ) -> None:
         self._audio_format = audio_format
         self._sample_rate = sample_rate
+        self._loop = loop
         self._event_queue: Queue[FunASREvent] = Queue()
+        self._async_events: asyncio.Queue[FunASREvent | None] | None = asyncio.Queue() if loop is not None else None
+        self._events_closed = False
+        self._events_ended = False
         self._recognition = None
         self._callback = None
         self._started = False
@@ -93,7 +147,7 @@ class FunASRRealtimeSession:
         self._callback = _create_streaming_callback(
             callback_base=callback_base,
             result_cls=result_cls,
-            event_queue=self._event_queue,
+            publish=self._publish,
         )
         kwargs: dict[str, Any] = {
             "model": settings.fun_asr_model,
@@ -141,27 +195,69 @@ class FunASRRealtimeSession:
             raise FunASRClientError(f"停止 Fun-ASR 会话失败: {exc}") from exc
 
     def close(self) -> None:
-        if not self._started:
-            return
-        if not self._stopped:
-            try:
-                self.stop()
-            except FunASRClientError:
-                pass
-        self._started = False
+        if self._started:
+            if not self._stopped:
+                try:
+                    self.stop()
+                except FunASRClientError:
+                    pass
+            self._started = False
+        if not self._events_closed:
+            self._events_closed = True
+            self._publish(None)
 
     def poll_event(self, timeout: float = 0.0) -> FunASREvent | None:
+        if self._async_events is not None:
+            raise FunASRClientError("已绑定事件循环的会话请使用 anext_event")
         try:
             return self._event_queue.get(timeout=max(timeout, 0.0))
         except Empty:
             return None
 
+    async def anext_event(self) -> FunASREvent | None:
+        """等待下一条识别事件；会话关闭且事件取尽后返回 None。"""
+        if self._async_events is None:
+            raise FunASRClientError("会话未绑定事件循环，请使用 poll_event")
+        if self._events_ended:
+            return None
+        event = await self._async_events.get()
+        if event is None:
+            self._events_ended = True
+        return event
+
+    def drain_events(self) -> list[FunASREvent]:
+        """取出已到达的全部事件（不等待）；绑定事件循环时须在该循环线程调用。"""
+        events: list[FunASREvent] = []
+        if self._async_events is None:
+            while (event := self.poll_event(timeout=0.01)) is not None:
+                events.append(event)
+            return events
+        while not self._events_ended and not self._async_events.empty():
+            event = self._async_events.get_nowait()
+            if event is None:
+                self._events_ended = True
+                break
+            events.append(event)
+        return events
+
+    def _publish(self, event: FunASREvent | None) -> None:
+        # SDK 回调运行在其自身线程中，asyncio 队列只能经 call_soon_threadsafe 写入。
+        if self._async_events is None:
+            if event is not None:
+                self._event_queue.put(event)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._async_events.put_nowait, event)
+        except RuntimeError:
+            # 事件循环已关闭（进程退出中），丢弃事件。
+            pass
+
 
 def _create_streaming_callback(
     *,
     callback_base: Any,
     result_cls: Any,
-    event_queue: Queue[FunASREvent],
+    publish: Callable[[FunASREvent], None],
 ) -> Any:
     class _StreamingRecognitionCallback(callback_base):  # type: ignore[misc, valid-type]
         def __init__(self) -> None:
@@ -169,19 +265,19 @@ def _create_streaming_callback(
             self._has_completed = Event()
 
         def on_open(self) -> None:
-            event_queue.put(FunASREvent(type="open"))
+            publish(FunASREvent(type="open"))
 
         def on_close(self) -> None:
-            event_queue.put(FunASREvent(type="close"))
+            publish(FunASREvent(type="close"))
 
         def on_complete(self) -> None:
-            event_queue.put(FunASREvent(type="complete"))
+            publish(FunASREvent(type="complete"))
             self._has_completed.set()
 
         def on_error(self, message: Any) -> None:
             request_id = str(getattr(message, "request_id", "") or "")
             error = str(getattr(message, "message", "") or "unknown error")
-            event_queue.put(
+            publish(
                 FunASREvent(
                     type="error",
                     request_id=request_id,
@@ -213,7 +309,7 @@ def _create_streaming_callback(
                 request_id = str(result.get_request_id() or "")
             except Exception:  # noqa: BLE001
                 request_id = ""
-            event_queue.put(
+            publish(
                 FunASREvent(
                     type="result",
                     text=text,
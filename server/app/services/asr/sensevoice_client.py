@@ -7,31 +7,53 @@ from typing import Any
 import httpx
 
 from app.core.settings import get_settings
+from app.services.http_clients import get_async_http_client
+from app.services.upstream_limits import UPSTREAM_ASR, upstream_slot
 
 
 class SenseVoiceClientError(RuntimeError):
     """SenseVoice 调用失败。"""
 
 
-def transcribe_wav(audio_bytes: bytes, filename: str, lang: str | None = None) -> str:
+async def atranscribe_wav(audio_bytes: bytes, filename: str, lang: str | None = None) -> str:
+    """上传整段音频转写，并发受 ASR 上游额度约束。"""
     settings = get_settings()
-    target_lang = (lang or settings.default_asr_lang).strip() or settings.default_asr_lang
-    url = f"{settings.asr_base_url.rstrip('/')}/api/v1/asr"
-    files = {
-        "files": (filename, audio_bytes, "audio/wav"),
-    }
-    data = {"keys": "audio", "lang": target_lang}
+    url, files, data = _build_asr_request(audio_bytes, filename=filename, lang=lang)
 
     try:
-        with httpx.Client(timeout=settings.asr_timeout_seconds) as client:
-            resp = client.post(url, files=files, data=data)
+        async with upstream_slot(UPSTREAM_ASR):
+            resp = await get_async_http_client(url).post(
+                url,
+                files=files,
+                data=data,
+                timeout=settings.asr_timeout_seconds,
+            )
             resp.raise_for_status()
             payload = resp.json()
     except httpx.HTTPError as exc:
         raise SenseVoiceClientError(f"ASR 请求失败: {exc}") from exc
     except ValueError as exc:
         raise SenseVoiceClientError("ASR 返回非 JSON 响应") from exc
+    return _require_text(payload)
+
+
+def _build_asr_request(
+    audio_bytes: bytes,
+    *,
+    filename: str,
+    lang: str | None,
+) -> tuple[str, dict[str, tuple[str, bytes, str]], dict[str, str]]:
+    settings = get_settings()
+    target_lang = (lang or settings.default_asr_lang).strip() or settings.default_asr_lang
+    url = f"{settings.asr_base_url.rstrip('/')}/api/v1/asr"
+    files = {
+        "files": (filename, audio_bytes, "audio/wav"),
+    }
+    data = {"keys": "audio", "lang": target_lang}
+    return url, files, data
+
 
+def _require_text(payload: Any) -> str:
     text = _extract_text(payload)
     if not text:
         payload_hint = str(payload)
@@ -0,0 +1,213 @@
+"""能量 VAD：上传 ASR 前裁掉首尾静音、压缩长停顿，并在停顿处把长音频切段，减少计费音频时长。"""
+
+from __future__ import annotations
+
+import sys
+import wave
+from array import array
+from dataclasses import dataclass
+from io import BytesIO
+from operator import mul
+from threading import Lock
+from typing import Any
+
+_FRAME_MS = 30
+# 短于该时长的能量突起（按键声、爆破音）不视为语音。
+_MIN_SPEECH_MS = 90
+# 绝对能量下限的默认值：低于 -60 dBFS（RMS≈33）的帧一律视为静音，
+# 防止近乎无声的录音被相对阈值判成语音；远场轻声说话约 -45 dBFS，下限须明显低于它。
+DEFAULT_MIN_SPEECH_DBFS = -60.0
+# 自适应阈值：底噪（10 分位帧能量）的 4 倍（+6 dB），且不超过响亮语音（90 分位）的 1/10（-10 dB），
+# 后者保证整段都是语音时不会把较轻的语音帧判成静音。
+_NOISE_PERCENTILE = 0.1
+_SPEECH_PERCENTILE = 0.9
+_NOISE_RATIO = 4.0
+_SPEECH_RATIO = 0.1
+
+_LOCK = Lock()
+_STATS: dict[str, float] = {}
+
+
+@dataclass(frozen=True)
+class VADResult:
+    # 每段为 16-bit 单声道 WAV；为空表示整段都是静音。
+    segments: list[bytes]
+    input_seconds: float
+    output_seconds: float
+
+
+def split_speech_wav(
+    wav_bytes: bytes,
+    *,
+    min_silence_ms: int,
+    padding_ms: int,
+    max_segment_seconds: float,
+    min_speech_dbfs: float = DEFAULT_MIN_SPEECH_DBFS,
+) -> VADResult | None:
+    """检测语音区间，返回裁剪、切段后的 WAV。
+
+    - 间隔短于 min_silence_ms 的停顿视为句内停顿，保留原样；
+    - 每个语音区间前后各保留 padding_ms，更长的停顿被压缩掉；
+    - 按停顿把语音区间打包成不超过 max_segment_seconds 的段，单个区间超长时在其中能量最低处切开；
+    - 低于 min_speech_dbfs（帧 RMS）的帧始终视为静音。
+    非 16-bit 单声道 PCM WAV（或无法解析）时返回 None，由调用方原样上传。
+    """
+    try:
+        with wave.open(BytesIO(wav_bytes), "rb") as reader:
+            if reader.getnchannels() != 1 or reader.getsampwidth() != 2 or reader.getcomptype() != "NONE":
+                return None
+            sample_rate = reader.getframerate()
+            frames = reader.readframes(reader.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    if sample_rate <= 0:
+        return None
+
+    samples = array("h")
+    samples.frombytes(frames[: len(frames) // 2 * 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    input_seconds = len(samples) / sample_rate
+
+    frame_len = max(sample_rate * _FRAME_MS // 1000, 1)
+    energies = _frame_energies(samples, frame_len)
+    regions = _detect_speech_frames(
+        energies,
+        min_silence_frames=max(min_silence_ms // _FRAME_MS, 1),
+        min_speech_frames=max(_MIN_SPEECH_MS // _FRAME_MS, 1),
+        min_speech_energy=(32768.0 * 10 ** (min(min_speech_dbfs, 0.0) / 20)) ** 2,
+    )
+    # 至少 2 帧，切分窗口内才有可前进的切点。
+    max_frames = max(int(max_segment_seconds * 1000 // _FRAME_MS), 2)
+    padding = max(padding_ms, 0) * sample_rate // 1000
+    spans: list[tuple[int, int]] = []
+    for region in regions:
+        for part_start, part_end in _split_long_region(region, energies, max_frames):
+            # 只在语音区间两端补 padding，区间内部的切点前后不重复音频。
+            start = part_start * frame_len - (padding if part_start == region[0] else 0)
+            end = part_end * frame_len + (padding if part_end == region[1] else 0)
+            start = max(start, spans[-1][1] if spans else 0)
+            spans.append((start, min(end, len(samples))))
+
+    segments: list[bytes] = []
+    output_samples = 0
+    pending: list[array] = []
+    pending_samples = 0
+    max_samples = max_frames * frame_len
+    for start, end in spans:
+        piece = samples[start:end]
+        if pending and pending_samples + len(piece) > max_samples:
+            segments.append(_encode_wav(pending, sample_rate))
+            pending, pending_samples = [], 0
+        pending.append(piece)
+        pending_samples += len(piece)
+        output_samples += len(piece)
+    if pending:
+        segments.append(_encode_wav(pending, sample_rate))
+
+    output_seconds = output_samples / sample_rate
+    _record(input_seconds=input_seconds, output_seconds=output_seconds, segments=len(segments))
+    return VADResult(segments=segments, input_seconds=input_seconds, output_seconds=output_seconds)
+
+
+def get_vad_stats() -> dict[str, Any]:
+    """累计处理的音频时长与裁剪后上传的时长。"""
+    with _LOCK:
+        stats = dict(_STATS)
+    input_seconds = stats.get("input_seconds", 0.0)
+    output_seconds = stats.get("output_seconds", 0.0)
+    return {
+        "requests": int(stats.get("requests", 0)),
+        "silent_requests": int(stats.get("silent_requests", 0)),
+        "segments": int(stats.get("segments", 0)),
+        "input_seconds": round(input_seconds, 3),
+        "output_seconds": round(output_seconds, 3),
+        "saved_ratio": round(1 - output_seconds / input_seconds, 4) if input_seconds else 0.0,
+    }
+
+
+def reset_vad_stats() -> None:
+    with _LOCK:
+        _STATS.clear()
+
+
+def _frame_energies(samples: array, frame_len: int) -> list[float]:
+    energies: list[float] = []
+    for start in range(0, len(samples), frame_len):
+        frame = samples[start : start + frame_len]
+        energies.append(sum(map(mul, frame, frame)) / len(frame))
+    return energies
+
+
+def _detect_speech_frames(
+    energies: list[float],
+    *,
+    min_silence_frames: int,
+    min_speech_frames: int,
+    min_speech_energy: float,
+) -> list[tuple[int, int]]:
+    """返回语音区间（帧下标，左闭右开）。"""
+    if not energies:
+        return []
+    ranked = sorted(energies)
+    noise = ranked[int((len(ranked) - 1) * _NOISE_PERCENTILE)]
+    loud = ranked[int((len(ranked) - 1) * _SPEECH_PERCENTILE)]
+    threshold = max(min_speech_energy, min(noise * _NOISE_RATIO, loud * _SPEECH_RATIO))
+
+    regions: list[tuple[int, int]] = []
+    start: int | None = None
+    for index, energy in enumerate(energies):
+        if energy >= threshold:
+            if start is None:
+                start = index
+        elif start is not None:
+            regions.append((start, index))
+            start = None
+    if start is not None:
+        regions.append((start, len(energies)))
+
+    merged: list[tuple[int, int]] = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] < min_silence_frames:
+            merged[-1] = (merged[-1][0], region[1])
+        else:
+            merged.append(region)
+    return [(start, end) for start, end in merged if end - start >= min_speech_frames]
+
+
+def _split_long_region(region: tuple[int, int], energies: list[float], max_frames: int) -> list[tuple[int, int]]:
+    """超长的连续语音在后半个窗口内能量最低的帧处切开，尽量落在换气停顿上。"""
+    parts: list[tuple[int, int]] = []
+    start, end = region
+    while end - start > max_frames:
+        window_start = start + max_frames // 2
+        # 切点严格大于 start，保证循环前进。
+        cut = min(range(max(window_start, start + 1), start + max_frames), key=energies.__getitem__)
+        parts.append((start, cut))
+        start = cut
+    parts.append((start, end))
+    return parts
+
+
+def _encode_wav(pieces: list[array], sample_rate: int) -> bytes:
+    buffer = BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        for piece in pieces:
+            if sys.byteorder == "big":
+                piece = array("h", piece)
+                piece.byteswap()
+            writer.writeframes(piece.tobytes())
+    return buffer.getvalue()
+
+
+def _record(*, input_seconds: float, output_seconds: float, segments: int) -> None:
+    with _LOCK:
+        _STATS["requests"] = _STATS.get("requests", 0) + 1
+        _STATS["segments"] = _STATS.get("segments", 0) + segments
+        _STATS["input_seconds"] = _STATS.get("input_seconds", 0.0) + input_seconds
+        _STATS["output_seconds"] = _STATS.get("output_seconds", 0.0) + output_seconds
+        if not segments:
+            _STATS["silent_requests"] = _STATS.get("silent_requests", 0) + 1
@@ -2,48 +2,51 @@
 
 from __future__ import annotations
 
+import asyncio
 from base64 import b64encode
+from collections import deque
 import re
-from typing import Any
+from typing import Any, AsyncIterator
 
 from app.core.settings import get_settings
-from app.repositories.session_store import SessionStore
+from app.repositories.session_store import AsyncSessionStore, SessionStore
 from app.services.dialogue.gptsapi_anthropic_client import (
     GPTSAPIAnthropicClientError,
-    request_messages_completion,
+    arequest_messages_completion,
+    astream_messages_completion,
 )
 from app.services.dialogue.llm_output_parser import parse_labeled_response
-from app.services.tts.tts_service import TTSServiceError, synthesize_with_fallback
+from app.services.tts.tts_service import (
+    TTSServiceError,
+    TTSSynthesizeResult,
+    asynthesize_with_fallback,
+)
 
 
 class ChatServiceError(RuntimeError):
     """聊天服务失败。"""
 
 ASSISTANT_TEXT_CHAR_LIMIT = 50
+# 回复为空或没有可读台词时的兜底句（亦作为常用台词预热）。
+FALLBACK_SPEAK_TEXT = "我在。"
 PERSONA_ASSISTANT_TEXT_CHAR_LIMITS = {
     "luotianyi": 60,
 }
+SPEAK_SENTENCE_ENDINGS = frozenset("。！？!?…~～")
 
 
-def run_text_chat(
+async def arun_text_chat(
     *,
-    store: SessionStore,
+    store: AsyncSessionStore,
     session_id: str,
     persona_id: str,
     user_text: str,
 ) -> dict[str, Any]:
-    clean_text = user_text.strip()
-    if not clean_text:
-        raise ChatServiceError("user_text 不能为空")
-
-    store.add_message(session_id, "user", clean_text)
-    settings = get_settings()
-    history = store.list_recent_messages(session_id, limit=settings.dialogue_history_limit)
-    relationship = store.get_relationship(session_id)
-    user_turns = store.count_user_turns(session_id)
+    """单轮对话：LLM 走 AsyncClient，存储读写各只切换一次线程。"""
+    history, relationship, user_turns = await store.run(_begin_chat_turn, session_id, user_text)
 
     try:
-        llm_raw_text = request_messages_completion(
+        llm_raw_text = await arequest_messages_completion(
             persona_id=persona_id,
             messages=history,
             relationship=relationship,
@@ -52,39 +55,182 @@ def run_text_chat(
     except GPTSAPIAnthropicClientError as exc:
         raise ChatServiceError(str(exc)) from exc
 
-    parsed = parse_labeled_response(llm_raw_text)
-    raw_assistant_text = str(parsed["assistant_text"])
-    assistant_text = _sanitize_assistant_text(
-        raw_assistant_text,
-        max_chars=_resolve_assistant_text_limit(persona_id),
-    )
-    assistant_tts_text = _extract_tts_speak_text(raw_assistant_text)
-    relationship_delta = dict(parsed["relationship_delta"])
-    memory_writes = list(parsed["memory_writes"])
+    return await store.run(_finish_chat_turn, session_id, persona_id, llm_raw_text)
 
-    store.add_message(session_id, "assistant", assistant_text)
-    store.upsert_memories(session_id, memory_writes)
-    applied_relationship_delta = store.apply_relationship_delta(session_id, relationship_delta)
 
-    return {
-        "session_id": session_id,
-        "assistant_text": assistant_text,
-        "emotion": parsed["emotion"],
-        "animation": parsed["animation"],
-        "relationship_delta": applied_relationship_delta,
-        "memory_writes": memory_writes,
-        "assistant_raw_text": raw_assistant_text,
-        "assistant_tts_text": assistant_tts_text,
-    }
-
-
-def synthesize_assistant_audio_base64(
-    assistant_text: str,
+async def astream_text_chat_with_voice(
     *,
+    store: AsyncSessionStore,
+    session_id: str,
+    persona_id: str,
+    user_text: str,
     force_tts_provider: str = "qwen_clone_tts",
     qwen_voice_id: str = "",
     qwen_target_model: str = "",
-) -> tuple[str, str, str]:
+    output_format: str = "wav",
+) -> AsyncIterator[dict[str, Any]]:
+    """流式对话：LLM 增量输出中每闭合一句 <speak> 台词即提交 TTS，按句序回推音频。
+
+    事件顺序：若干 ``audio``/``audio_error``（与 LLM 生成重叠），``chat``（完整结构化结果），
+    剩余 ``audio``/``audio_error``，最后 ``done``。
+    """
+    begin = asyncio.ensure_future(store.run(_begin_chat_turn, session_id, user_text))
+    try:
+        history, relationship, user_turns = await asyncio.shield(begin)
+    except asyncio.CancelledError:
+        # 用户消息已在线程中写入：等它落库再退出，保证先于下一轮的消息。
+        await asyncio.gather(begin, return_exceptions=True)
+        raise
+    settings = get_settings()
+    max_chars = _resolve_assistant_text_limit(persona_id)
+    splitter = SpeakSentenceSplitter()
+    raw_parts: list[str] = []
+    pending: deque[tuple[int, str, asyncio.Task[tuple[str, str, str]]]] = deque()
+    tts_slots = asyncio.Semaphore(max(settings.chat_stream_tts_workers, 1))
+    spoken_chars = 0
+    next_index = 0
+    turn_committed = False
+
+    async def synthesize_sentence(sentence: str) -> tuple[str, str, str]:
+        async with tts_slots:
+            return await _asynthesize_speak_text_base64(
+                sentence,
+                force_tts_provider=force_tts_provider,
+                qwen_voice_id=qwen_voice_id,
+                qwen_target_model=qwen_target_model,
+                output_format=output_format,
+            )
+
+    def submit(sentence: str) -> None:
+        nonlocal spoken_chars, next_index
+        if spoken_chars >= max_chars:
+            return
+        if spoken_chars + len(sentence) > max_chars:
+            # 与非流式路径的字数上限保持一致：首句超长时截断，后续超限句子不再合成。
+            if spoken_chars:
+                spoken_chars = max_chars
+                return
+            sentence = _truncate_text_prefer_punctuation(sentence, max_chars)
+        spoken_chars += len(sentence)
+        pending.append((next_index, sentence, asyncio.create_task(synthesize_sentence(sentence))))
+        next_index += 1
+
+    try:
+        try:
+            async for delta in astream_messages_completion(
+                persona_id=persona_id,
+                messages=history,
+                relationship=relationship,
+                include_initial_injection=(user_turns <= 1),
+            ):
+                raw_parts.append(delta)
+                for sentence in splitter.feed(delta):
+                    submit(sentence)
+                while pending and pending[0][2].done():
+                    yield await _build_stream_audio_event(*pending.popleft())
+        except GPTSAPIAnthropicClientError as exc:
+            raise ChatServiceError(str(exc)) from exc
+
+        for sentence in splitter.flush():
+            submit(sentence)
+
+        result = await store.run(_finish_chat_turn, session_id, persona_id, "".join(raw_parts))
+        turn_committed = True
+        if next_index == 0:
+            # 模型未输出 <speak> 时退回整段降级合成，保证至少有一段语音。
+            fallback_task = asyncio.create_task(
+                asynthesize_assistant_audio_base64(
+                    str(result["assistant_text"]),
+                    force_tts_provider=force_tts_provider,
+                    qwen_voice_id=qwen_voice_id,
+                    qwen_target_model=qwen_target_model,
+                    output_format=output_format,
+                )
+            )
+            pending.append((0, str(result["assistant_text"]), fallback_task))
+            next_index = 1
+
+        yield {
+            "type": "chat",
+            "session_id": result["session_id"],
+            "assistant_text": result["assistant_text"],
+            "emotion": result["emotion"],
+            "animation": result["animation"],
+            "relationship_delta": result["relationship_delta"],
+            "memory_writes": result["memory_writes"],
+        }
+        while pending:
+            yield await _build_stream_audio_event(*pending.popleft())
+        yield {"type": "done", "session_id": session_id, "audio_segments": next_index}
+    except (asyncio.CancelledError, GeneratorExit):
+        if not turn_committed:
+            # 被打断（如实时语音的 barge-in）时把已生成的部分回复写入历史，下一轮仍能接上上下文。
+            await asyncio.shield(store.run(_commit_interrupted_turn, session_id, persona_id, "".join(raw_parts)))
+        raise
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+
+
+class SpeakSentenceSplitter:
+    """增量解析 LLM 输出，按句切出已闭合的 <speak> 台词。"""
+
+    _MAX_TAG_LENGTH = 16
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._inside = False
+        self._sentence: list[str] = []
+
+    def feed(self, delta: str) -> list[str]:
+        self._pending += str(delta or "")
+        sentences: list[str] = []
+        while self._pending:
+            if self._pending[0] == "<":
+                close = self._pending.find(">", 0, self._MAX_TAG_LENGTH)
+                if close < 0 and len(self._pending) < self._MAX_TAG_LENGTH:
+                    # 标签可能被拆在两个增量之间，等待后续文本。
+                    break
+                if close > 0:
+                    tag = re.sub(r"\s+", "", self._pending[: close + 1]).lower()
+                    self._pending = self._pending[close + 1 :]
+                    if tag == "<speak>":
+                        self._take_sentence(sentences)
+                        self._inside = True
+                    elif tag == "</speak>":
+                        self._take_sentence(sentences)
+                        self._inside = False
+                    continue
+
+            char = self._pending[0]
+            self._pending = self._pending[1:]
+            if not self._inside:
+                continue
+            if self._sentence and self._sentence[-1] in SPEAK_SENTENCE_ENDINGS and char not in SPEAK_SENTENCE_ENDINGS:
+                # 连续标点（如“……”“！？”）归入同一句，遇到下一个正文字符再切句。
+                self._take_sentence(sentences)
+            self._sentence.append(char)
+        return sentences
+
+    def flush(self) -> list[str]:
+        """流结束时收尾：兼容缺少 </speak> 的写法。"""
+        sentences: list[str] = []
+        if self._inside:
+            self._sentence.append(re.sub(r"<[^<>]*$", "", self._pending))
+            self._take_sentence(sentences)
+        self._pending = ""
+        self._inside = False
+        return sentences
+
+    def _take_sentence(self, sentences: list[str]) -> None:
+        text = re.sub(r"\s+", "", "".join(self._sentence))
+        self._sentence = []
+        if _has_pronounceable_content(text):
+            sentences.append(text)
+
+
+def resolve_speak_text(assistant_text: str) -> str:
+    """取用于合成的台词：优先 <speak> 内容，否则用清洗后的回复，都不可读时为兜底句。"""
     speak_text = _extract_tts_speak_text(assistant_text)
     if not speak_text:
         # 兼容模型未按约定输出 speak 标签时的降级路径，避免整条语音链路失败。
@@ -93,25 +239,87 @@ def synthesize_assistant_audio_base64(
             max_chars=ASSISTANT_TEXT_CHAR_LIMIT,
         )
     if not _has_pronounceable_content(speak_text):
-        speak_text = "我在。"
+        speak_text = FALLBACK_SPEAK_TEXT
+    return speak_text
+
+
+async def asynthesize_assistant_audio_base64(
+    assistant_text: str,
+    *,
+    force_tts_provider: str = "qwen_clone_tts",
+    qwen_voice_id: str = "",
+    qwen_target_model: str = "",
+    output_format: str = "wav",
+) -> tuple[str, str, str]:
+    return await _asynthesize_speak_text_base64(
+        resolve_speak_text(assistant_text),
+        force_tts_provider=force_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=output_format,
+    )
+
 
+async def asynthesize_assistant_audio(
+    assistant_text: str,
+    *,
+    force_tts_provider: str = "qwen_clone_tts",
+    qwen_voice_id: str = "",
+    qwen_target_model: str = "",
+    output_format: str = "wav",
+) -> TTSSynthesizeResult:
+    """合成助手台词并返回原始音频 bytes，供二进制取回接口使用；失败时直接抛出 TTSServiceError。"""
+    speak_text = resolve_speak_text(assistant_text)
     payload = build_default_tts_payload(
         speak_text,
         force_tts_provider=force_tts_provider,
         qwen_voice_id=qwen_voice_id,
         qwen_target_model=qwen_target_model,
+        output_format=output_format,
+    )
+    return await asynthesize_with_fallback(text=speak_text, gpt_sovits_payload=payload)
+
+
+async def _asynthesize_speak_text_base64(
+    speak_text: str,
+    *,
+    force_tts_provider: str,
+    qwen_voice_id: str,
+    qwen_target_model: str,
+    output_format: str = "wav",
+) -> tuple[str, str, str]:
+    result = await _asynthesize_speak_text(
+        speak_text,
+        force_tts_provider=force_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=output_format,
+    )
+    return result.media_type, b64encode(result.audio_bytes).decode("utf-8"), result.provider
+
+
+async def _asynthesize_speak_text(
+    speak_text: str,
+    *,
+    force_tts_provider: str,
+    qwen_voice_id: str,
+    qwen_target_model: str,
+    output_format: str = "wav",
+) -> TTSSynthesizeResult:
+    payload = build_default_tts_payload(
+        speak_text,
+        force_tts_provider=force_tts_provider,
+        qwen_voice_id=qwen_voice_id,
+        qwen_target_model=qwen_target_model,
+        output_format=output_format,
     )
     try:
-        result = synthesize_with_fallback(
+        return await asynthesize_with_fallback(
             text=speak_text,
             gpt_sovits_payload=payload,
         )
-        audio_bytes = result.audio_bytes
-        media_type = result.media_type
-        provider = result.provider
     except TTSServiceError as exc:
         raise ChatServiceError(str(exc)) from exc
-    return media_type, b64encode(audio_bytes).decode("utf-8"), provider
 
 
 def build_default_tts_payload(
@@ -120,6 +328,7 @@ def build_default_tts_payload(
     force_tts_provider: str = "qwen_clone_tts",
     qwen_voice_id: str = "",
     qwen_target_model: str = "",
+    output_format: str = "wav",
 ) -> dict[str, Any]:
     settings = get_settings()
     ref_audio_path = _normalize_ref_audio_path(settings.gpt_sovits_default_ref_audio_path)
@@ -129,7 +338,7 @@ def build_default_tts_payload(
         "prompt_lang": settings.gpt_sovits_default_prompt_lang,
         "prompt_text": settings.gpt_sovits_default_prompt_text,
         "media_type": "wav",
-        "streaming_mode": False,
+        "streaming_mode": settings.gpt_sovits_streaming_mode,
         "text_split_method": settings.gpt_sovits_text_split_method,
         "batch_size": settings.gpt_sovits_batch_size,
         "fragment_interval": settings.gpt_sovits_fragment_interval,
@@ -153,9 +362,95 @@ def build_default_tts_payload(
         payload["_qwen_voice_id_override"] = qwen_voice_id.strip()
     if qwen_target_model.strip():
         payload["_qwen_target_model_override"] = qwen_target_model.strip()
+    if output_format and output_format != "wav":
+        # 上游仍合成 wav，由 TTS 服务层转码。
+        payload["_output_format"] = output_format
     return payload
 
 
+def _begin_chat_turn(
+    store: SessionStore,
+    session_id: str,
+    user_text: str,
+) -> tuple[list[dict[str, str]], dict[str, int], int]:
+    clean_text = user_text.strip()
+    if not clean_text:
+        raise ChatServiceError("user_text 不能为空")
+
+    store.add_message(session_id, "user", clean_text)
+    settings = get_settings()
+    history = store.list_recent_messages(session_id, limit=settings.dialogue_history_limit)
+    relationship = store.get_relationship(session_id)
+    user_turns = store.count_user_turns(session_id)
+    return history, relationship, user_turns
+
+
+def _finish_chat_turn(
+    store: SessionStore,
+    session_id: str,
+    persona_id: str,
+    llm_raw_text: str,
+) -> dict[str, Any]:
+    parsed = parse_labeled_response(llm_raw_text)
+    raw_assistant_text = str(parsed["assistant_text"])
+    assistant_text = _sanitize_assistant_text(
+        raw_assistant_text,
+        max_chars=_resolve_assistant_text_limit(persona_id),
+    )
+    assistant_tts_text = _extract_tts_speak_text(raw_assistant_text)
+    relationship_delta = dict(parsed["relationship_delta"])
+    memory_writes = list(parsed["memory_writes"])
+
+    applied_relationship_delta = store.commit_turn(session_id, assistant_text, memory_writes, relationship_delta)
+
+    return {
+        "session_id": session_id,
+        "assistant_text": assistant_text,
+        "emotion": parsed["emotion"],
+        "animation": parsed["animation"],
+        "relationship_delta": applied_relationship_delta,
+        "memory_writes": memory_writes,
+        "assistant_raw_text": raw_assistant_text,
+        "assistant_tts_text": assistant_tts_text,
+    }
+
+
+def _commit_interrupted_turn(
+    store: SessionStore,
+    session_id: str,
+    persona_id: str,
+    llm_raw_text: str,
+) -> str:
+    """只记录被打断前已生成的台词；输出不完整，不应用关系变化与记忆写入。"""
+    if not llm_raw_text.strip():
+        return ""
+    assistant_text = _sanitize_assistant_text(
+        str(parse_labeled_response(llm_raw_text)["assistant_text"]),
+        max_chars=_resolve_assistant_text_limit(persona_id),
+    )
+    store.add_message(session_id, "assistant", assistant_text)
+    return assistant_text
+
+
+async def _build_stream_audio_event(
+    index: int,
+    text: str,
+    task: asyncio.Task[tuple[str, str, str]],
+) -> dict[str, Any]:
+    try:
+        media_type, audio_base64, provider = await task
+    except ChatServiceError as exc:
+        return {"type": "audio_error", "index": index, "text": text, "error": str(exc)}
+    return {
+        "type": "audio",
+        "index": index,
+        "text": text,
+        "media_type": media_type,
+        "audio_base64": audio_base64,
+        "provider": provider,
+    }
+
+
 def _normalize_ref_audio_path(raw_value: str) -> str:
     text = str(raw_value or "").strip().strip('"').strip("'")
     if not text:
@@ -175,7 +470,7 @@ def _normalize_ref_audio_path(raw_value: str) -> str:
 def _sanitize_assistant_text(raw_text: str, max_chars: int = ASSISTANT_TEXT_CHAR_LIMIT) -> str:
     text = str(raw_text or "").strip()
     if not text:
-        return "我在。"
+        return FALLBACK_SPEAK_TEXT
 
     speak_text = _extract_tts_speak_text(text)
     if speak_text:
@@ -202,19 +497,19 @@ def _sanitize_assistant_text(raw_text: str, max_chars: int = ASSISTANT_TEXT_CHAR
         text = selected or lines[0]
 
     if _looks_like_narration_only(text):
-        return "我在。"
+        return FALLBACK_SPEAK_TEXT
 
     text = re.sub(r"\s+", "", text)
     if not text:
-        return "我在。"
+        return FALLBACK_SPEAK_TEXT
 
     if len(text) > max_chars:
         text = _truncate_text_prefer_punctuation(text, max_chars)
 
     if not _has_pronounceable_content(text):
-        return "我在。"
+        return FALLBACK_SPEAK_TEXT
 
-    return text or "我在。"
+    return text or FALLBACK_SPEAK_TEXT
 
 
 def _extract_tts_speak_text(raw_text: str) -> str:
@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 import json
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Iterable
+from threading import Lock
+from typing import Any, AsyncIterator, Iterable
 
 import httpx
 
 from app.core.settings import get_settings
-from app.services.dialogue.persona_loader import load_persona_prompt_context
+from app.services.dialogue.persona_loader import PersonaPromptContext, load_persona_prompt_context
+from app.services.dialogue.prompt_cache_stats import record_prompt_cache_usage
+from app.services.http_clients import get_async_http_client
+from app.services.upstream_limits import UPSTREAM_LLM, upstream_slot
 
 
 class GPTSAPIAnthropicClientError(RuntimeError):
@@ -22,80 +28,235 @@ PERSONA_ASSISTANT_CHAR_LIMITS = {
 }
 
 
-def request_messages_completion(
+PROMPT_SEGMENT_STATIC = "static_prefix"
+PROMPT_SEGMENT_PERSONA_INITIAL = "persona_initial"
+PROMPT_SEGMENT_HISTORY = "history"
+PROMPT_SEGMENT_STATE = "dynamic_state"
+
+
+@dataclass(frozen=True)
+class _PromptSegment:
+    name: str
+    text: str
+    cacheable: bool
+
+
+@dataclass(frozen=True)
+class _ChatRequest:
+    url: str
+    payload: dict[str, Any]
+    headers: dict[str, str]
+    timeout_seconds: float
+    # 按发送顺序记录各段字符数，用于根据 usage 估算哪些段命中了上游前缀缓存。
+    segment_chars: tuple[tuple[str, int], ...] = ()
+
+
+async def arequest_messages_completion(
     *,
     persona_id: str,
     messages: Iterable[dict[str, str]],
     relationship: dict[str, int],
     include_initial_injection: bool = True,
 ) -> str:
+    """单次（非流式）对话补全，并发受 LLM 上游额度约束。"""
+    chat_request = _prepare_chat_request(
+        persona_id=persona_id,
+        messages=messages,
+        relationship=relationship,
+        include_initial_injection=include_initial_injection,
+    )
+    try:
+        async with upstream_slot(UPSTREAM_LLM):
+            resp = await get_async_http_client(chat_request.url).post(
+                chat_request.url,
+                json=chat_request.payload,
+                headers=chat_request.headers,
+                timeout=chat_request.timeout_seconds,
+            )
+            resp.raise_for_status()
+            response_payload = resp.json()
+    except httpx.HTTPError as exc:
+        raise GPTSAPIAnthropicClientError(
+            f"LLM 请求失败(固定端点={chat_request.url}): {exc}"
+        ) from exc
+    except ValueError as exc:
+        raise GPTSAPIAnthropicClientError("LLM 返回非 JSON 响应") from exc
+    _record_usage(chat_request, response_payload)
+    return _extract_completion_text(response_payload)
+
+
+async def astream_messages_completion(
+    *,
+    persona_id: str,
+    messages: Iterable[dict[str, str]],
+    relationship: dict[str, int],
+    include_initial_injection: bool = True,
+) -> AsyncIterator[str]:
+    """以 stream=true 调用 chat/completions，逐段产出文本增量。"""
+    chat_request = _prepare_chat_request(
+        persona_id=persona_id,
+        messages=messages,
+        relationship=relationship,
+        include_initial_injection=include_initial_injection,
+        stream=True,
+    )
+
+    produced = False
+    usage_chunk: dict[str, Any] | None = None
+    try:
+        async with upstream_slot(UPSTREAM_LLM):
+            async with get_async_http_client(chat_request.url).stream(
+                "POST",
+                chat_request.url,
+                json=chat_request.payload,
+                headers=chat_request.headers,
+                timeout=chat_request.timeout_seconds,
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    chunk = _parse_stream_line(line)
+                    if chunk is None:
+                        continue
+                    if chunk is _STREAM_DONE:
+                        break
+                    if isinstance(chunk.get("usage"), dict):
+                        usage_chunk = chunk
+                    delta = _extract_stream_delta(chunk)
+                    if delta:
+                        produced = True
+                        yield delta
+    except httpx.HTTPError as exc:
+        raise GPTSAPIAnthropicClientError(
+            f"LLM 流式请求失败(固定端点={chat_request.url}): {exc}"
+        ) from exc
+
+    if usage_chunk is not None:
+        _record_usage(chat_request, usage_chunk)
+    if not produced:
+        raise GPTSAPIAnthropicClientError("LLM 流式响应未返回文本内容")
+
+
+def _prepare_chat_request(
+    *,
+    persona_id: str,
+    messages: Iterable[dict[str, str]],
+    relationship: dict[str, int],
+    include_initial_injection: bool,
+    stream: bool = False,
+) -> _ChatRequest:
     settings = get_settings()
     api_key = settings.llm_api_key.strip()
     if not api_key:
         raise GPTSAPIAnthropicClientError("LLM_API_KEY 未配置")
 
-    system_prompt = _build_system_prompt(
+    system_segments = _build_system_prompt_segments(
         persona_id,
         relationship,
         include_initial_injection=include_initial_injection,
     )
     normalized_messages = _normalize_messages(messages)
-    url_chat_completions = _join_api_path(settings.llm_api_base_url, "chat/completions")
+    state_at_tail = settings.llm_prompt_state_position == "tail"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
+    if stream:
+        headers["Accept"] = "text/event-stream"
+    return _ChatRequest(
+        url=_join_api_path(settings.llm_api_base_url, "chat/completions"),
+        payload=_build_chat_payload(
+            model=settings.llm_model,
+            max_tokens=settings.llm_max_tokens,
+            system_segments=system_segments,
+            messages=normalized_messages,
+            stream=stream,
+            cache_control=_resolve_cache_control(settings.llm_prompt_cache_control, settings.llm_model),
+            state_at_tail=state_at_tail,
+        ),
+        headers=headers,
+        timeout_seconds=settings.llm_timeout_seconds,
+        segment_chars=_layout_segment_chars(system_segments, normalized_messages, state_at_tail=state_at_tail),
+    )
 
-    try:
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            response_payload = _request_chat_completions(
-                client=client,
-                url=url_chat_completions,
-                model=settings.llm_model,
-                max_tokens=settings.llm_max_tokens,
-                system_prompt=system_prompt,
-                messages=normalized_messages,
-                headers=headers,
-            )
-    except httpx.HTTPError as exc:
-        raise GPTSAPIAnthropicClientError(
-            f"LLM 请求失败(固定端点={url_chat_completions}): {exc}"
-        ) from exc
-    except ValueError as exc:
-        raise GPTSAPIAnthropicClientError("LLM 返回非 JSON 响应") from exc
 
+def _extract_completion_text(response_payload: Any) -> str:
+    if not isinstance(response_payload, dict):
+        raise GPTSAPIAnthropicClientError("LLM 返回非 JSON 响应")
     text = _extract_text(response_payload)
     if not text:
         payload_keys = ",".join(sorted(str(k) for k in response_payload.keys()))
         raise GPTSAPIAnthropicClientError(f"LLM 未返回文本内容，可用字段: {payload_keys}")
     return text
 
-def _request_chat_completions(
+
+def _build_chat_payload(
     *,
-    client: httpx.Client,
-    url: str,
     model: str,
     max_tokens: int,
-    system_prompt: str,
+    system_segments: list[_PromptSegment],
     messages: list[dict[str, str]],
-    headers: dict[str, str],
+    stream: bool = False,
+    cache_control: bool = False,
+    state_at_tail: bool = False,
 ) -> dict[str, Any]:
-    payload_messages: list[dict[str, str]] = [{"role": "system", "content": system_prompt}]
+    # 静态段在前、每轮变化的状态段在后，保证上游前缀缓存可以跨轮、跨会话复用。
+    leading = [segment for segment in system_segments if not (state_at_tail and not segment.cacheable)]
+    trailing = [segment for segment in system_segments if state_at_tail and not segment.cacheable]
+    payload_messages: list[dict[str, Any]] = [
+        {"role": "system", "content": _render_system_content(leading, cache_control=cache_control)}
+    ]
     payload_messages.extend(messages)
-    payload = {
+    if trailing:
+        payload_messages.append({"role": "system", "content": "".join(segment.text for segment in trailing)})
+    payload: dict[str, Any] = {
         "model": model,
         "max_completion_tokens": max_tokens,
         "messages": payload_messages,
     }
+    if stream:
+        payload["stream"] = True
     if _is_kimi_25_model(model):
         # Kimi K2.5 默认启用 thinking，可能引入额外 reasoning 段，影响后续文本抽取。
         payload["thinking"] = {"type": "disabled"}
-    resp = client.post(url, json=payload, headers=headers)
-    resp.raise_for_status()
-    data = resp.json()
-    if not isinstance(data, dict):
-        raise ValueError("chat.completions 返回格式异常")
-    return data
+    return payload
+
+
+# 哨兵对象：SSE 收到 [DONE]。
+_STREAM_DONE: dict[str, Any] = {}
+
+
+def _parse_stream_line(line: str) -> dict[str, Any] | None:
+    text = str(line or "").strip()
+    if not text.startswith("data:"):
+        return None
+    data = text[len("data:") :].strip()
+    if not data:
+        return None
+    if data == "[DONE]":
+        return _STREAM_DONE
+    try:
+        parsed = json.loads(data)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _extract_stream_delta(chunk: dict[str, Any]) -> str:
+    choices = chunk.get("choices")
+    if not isinstance(choices, list):
+        return ""
+    parts: list[str] = []
+    for choice in choices:
+        if not isinstance(choice, dict):
+            continue
+        delta = choice.get("delta")
+        if not isinstance(delta, dict):
+            continue
+        # 只取 content，reasoning_content 等思考段不进入台词。
+        content = delta.get("content")
+        if isinstance(content, str) and content:
+            parts.append(content)
+    return "".join(parts)
 
 
 def _join_api_path(base_url: str, suffix: str) -> str:
@@ -118,13 +279,115 @@ def _normalize_messages(messages: Iterable[dict[str, str]]) -> list[dict[str, st
     return normalized or [{"role": "user", "content": "你好"}]
 
 
+def _render_system_content(segments: list[_PromptSegment], *, cache_control: bool) -> str | list[dict[str, Any]]:
+    if not cache_control:
+        return "".join(segment.text for segment in segments)
+    parts: list[dict[str, Any]] = []
+    for segment in segments:
+        part: dict[str, Any] = {"type": "text", "text": segment.text}
+        if segment.cacheable:
+            part["cache_control"] = {"type": "ephemeral"}
+        parts.append(part)
+    return parts
+
+
+def _resolve_cache_control(mode: str, model: str) -> bool:
+    normalized = str(mode or "").strip().lower()
+    if normalized == "on":
+        return True
+    if normalized == "off":
+        return False
+    # auto：仅对已知支持 cache_control 标记的 Claude 系模型开启。
+    return "claude" in str(model or "").lower()
+
+
+def _layout_segment_chars(
+    system_segments: list[_PromptSegment],
+    messages: list[dict[str, str]],
+    *,
+    state_at_tail: bool,
+) -> tuple[tuple[str, int], ...]:
+    history = (PROMPT_SEGMENT_HISTORY, sum(len(item["content"]) for item in messages))
+    leading = [(segment.name, len(segment.text)) for segment in system_segments if segment.cacheable or not state_at_tail]
+    trailing = [(segment.name, len(segment.text)) for segment in system_segments if state_at_tail and not segment.cacheable]
+    return (*leading, history, *trailing)
+
+
+def _record_usage(chat_request: _ChatRequest, response_payload: Any) -> None:
+    usage = response_payload.get("usage") if isinstance(response_payload, dict) else None
+    if isinstance(usage, dict):
+        record_prompt_cache_usage(chat_request.segment_chars, usage)
+
+
 def _build_system_prompt(
     persona_id: str,
     relationship: dict[str, int],
     *,
     include_initial_injection: bool = True,
 ) -> str:
+    segments = _build_system_prompt_segments(
+        persona_id,
+        relationship,
+        include_initial_injection=include_initial_injection,
+    )
+    return "".join(segment.text for segment in segments)
+
+
+def _build_system_prompt_segments(
+    persona_id: str,
+    relationship: dict[str, int],
+    *,
+    include_initial_injection: bool = True,
+) -> list[_PromptSegment]:
+    return _get_compiled_persona_prompt(persona_id).render(
+        relationship,
+        include_initial_injection=include_initial_injection,
+    )
+
+
+@dataclass(frozen=True)
+class _CompiledPersonaPrompt:
+    """单个 persona 的预编译提示词：静态段一次生成，每轮只渲染动态槽位。"""
+
+    static_prefix: _PromptSegment
+    persona_initial: _PromptSegment | None
+
+    def render(self, relationship: dict[str, int], *, include_initial_injection: bool) -> list[_PromptSegment]:
+        segments = [self.static_prefix]
+        if include_initial_injection and self.persona_initial is not None:
+            segments.append(self.persona_initial)
+        segments.append(_PromptSegment(PROMPT_SEGMENT_STATE, f"当前关系值={relationship}。", cacheable=False))
+        return segments
+
+
+_COMPILED_PROMPT_CACHE_SIZE = 64
+_COMPILED_PROMPTS: OrderedDict[tuple[str, str, int], _CompiledPersonaPrompt] = OrderedDict()
+_COMPILED_PROMPTS_LOCK = Lock()
+
+
+def _get_compiled_persona_prompt(persona_id: str) -> _CompiledPersonaPrompt:
     persona = load_persona_prompt_context(persona_id)
+    # 角色卡改动后 mtime 变化即自动重新编译；旧条目随 LRU 淘汰。
+    key = (
+        persona_id,
+        str(persona.source_path) if persona is not None and persona.source_path is not None else "",
+        persona.source_mtime_ns if persona is not None else 0,
+    )
+    with _COMPILED_PROMPTS_LOCK:
+        compiled = _COMPILED_PROMPTS.get(key)
+        if compiled is not None:
+            _COMPILED_PROMPTS.move_to_end(key)
+            return compiled
+
+    compiled = _compile_persona_prompt(persona_id, persona)
+    with _COMPILED_PROMPTS_LOCK:
+        _COMPILED_PROMPTS[key] = compiled
+        while len(_COMPILED_PROMPTS) > _COMPILED_PROMPT_CACHE_SIZE:
+            _COMPILED_PROMPTS.popitem(last=False)
+    return compiled
+
+
+def _compile_persona_prompt(persona_id: str, persona: PersonaPromptContext | None) -> _CompiledPersonaPrompt:
     assistant_char_limit = _resolve_assistant_char_limit(persona_id)
     global_injection_part = _load_global_dialogue_rules()
     persona_core_part = (
@@ -138,7 +401,7 @@ def _build_system_prompt(
         )
     )
     persona_initial_part = ""
-    if include_initial_injection and persona is not None:
+    if persona is not None:
         persona_initial_part = (
             f"{_format_optional_prompt_block('角色开场白参考（仅首轮）', persona.first_message)}"
             f"{_format_optional_prompt_block('角色对话示例（仅首轮）', persona.mes_example)}"
@@ -148,12 +411,10 @@ def _build_system_prompt(
             f"{_format_optional_prompt_block('角色AI补充材料（仅首轮）', persona.ai_additional_info)}"
             f"{_format_optional_prompt_block('角色AI需要遵循（仅首轮）', persona.ai_need_to_follow)}"
         )
-    return (
+    static_prefix = (
         "你是陪伴助手角色，必须稳定遵循指定角色设定，默认使用中文回复。"
         f"{global_injection_part}"
         f"{persona_core_part}"
-        f"{persona_initial_part}"
-        f"当前关系值={relationship}。"
         "assistant 内容中，真正说出口的台词必须放入 <speak>...</speak>。"
         "禁止只输出动作、心理、场景或旁白；每轮都必须至少有一句可直接说出口的 <speak> 台词。"
         "动作、心理、场景、旁白必须写在 <speak> 标签外。"
@@ -166,6 +427,14 @@ def _build_system_prompt(
         "[memory_writes][][/memory_writes]"
         "relationship_delta 和 memory_writes 必须是合法 JSON。"
     )
+    return _CompiledPersonaPrompt(
+        static_prefix=_PromptSegment(PROMPT_SEGMENT_STATIC, static_prefix, cacheable=True),
+        persona_initial=(
+            _PromptSegment(PROMPT_SEGMENT_PERSONA_INITIAL, persona_initial_part, cacheable=True)
+            if persona_initial_part
+            else None
+        ),
+    )
 
 
 def _resolve_assistant_char_limit(persona_id: str) -> int:
@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import json
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
+from threading import RLock
 
 from app.core.settings import get_settings
 
@@ -24,59 +27,207 @@ class PersonaPromptContext:
     ai_initial_injection: str
     ai_additional_info: str
     ai_need_to_follow: str
+    source_path: Path | None = None
+    source_mtime_ns: int = 0
 
 
 def load_persona_prompt_context(persona_id: str) -> PersonaPromptContext | None:
-    normalized = _normalize_key(persona_id)
-    if not normalized:
-        return None
-    return _load_persona_prompt_context_cached(normalized)
+    return get_persona_registry().get(persona_id)
 
 
-@lru_cache(maxsize=16)
-def _load_persona_prompt_context_cached(normalized_persona_id: str) -> PersonaPromptContext | None:
+@lru_cache(maxsize=1)
+def get_persona_registry() -> "PersonaRegistry":
     settings = get_settings()
-    card_path = _resolve_card_path(normalized_persona_id, settings.configs_root, settings.repo_root)
-    if card_path is None:
-        return None
-    return _load_context_from_card(card_path, normalized_persona_id)
+    return PersonaRegistry(
+        settings.configs_root,
+        settings.repo_root,
+        reload_interval_seconds=settings.persona_reload_interval_seconds,
+    )
 
 
-def _resolve_card_path(
-    normalized_persona_id: str,
-    configs_root: Path,
-    repo_root: Path,
-) -> Path | None:
-    persona_dir = configs_root / "persona"
-    if persona_dir.is_dir():
-        for yaml_path in sorted(persona_dir.glob("*.yaml")) + sorted(persona_dir.glob("*.yml")):
-            parsed = _parse_persona_yaml(yaml_path)
-            if parsed is None:
-                continue
-            candidate_keys = {_normalize_key(parsed["id"])}
-            for alias in parsed["aliases"]:
-                candidate_keys.add(_normalize_key(alias))
-            if normalized_persona_id not in candidate_keys:
+# 未配置 persona yaml 时的内置别名，优先级低于 configs/persona。
+_FALLBACK_CARDS = {
+    "phainon": "Phainon_actor_card.json",
+    "baie": "Phainon_actor_card.json",
+    "白厄": "Phainon_actor_card.json",
+}
+
+
+@dataclass(frozen=True)
+class _PersonaYamlEntry:
+    mtime_ns: int
+    persona_id: str
+    aliases: tuple[str, ...]
+    card_path: Path | None
+
+
+class PersonaRegistry:
+    """persona yaml 与角色卡的别名索引。
+
+    首次使用时解析全部 yaml；之后最多每 ``reload_interval_seconds`` 检查一次 mtime，
+    只重新解析有变化的 yaml / 角色卡。未知 id 进入负缓存，索引变化时清空。
+    """
+
+    def __init__(
+        self,
+        configs_root: Path,
+        repo_root: Path,
+        *,
+        reload_interval_seconds: float = 2.0,
+        negative_cache_size: int = 1024,
+    ) -> None:
+        self._persona_dir = configs_root / "persona"
+        self._configs_root = configs_root
+        self._repo_root = repo_root
+        self._reload_interval_seconds = max(float(reload_interval_seconds), 0.0)
+        self._negative_cache_size = max(int(negative_cache_size), 1)
+        self._lock = RLock()
+        self._yaml_entries: dict[Path, _PersonaYamlEntry] = {}
+        self._alias_index: dict[str, tuple[str, Path]] = {}
+        self._contexts: dict[Path, PersonaPromptContext | None] = {}
+        self._card_mtimes: dict[Path, int] = {}
+        self._missing: OrderedDict[str, None] = OrderedDict()
+        self._next_check_at = 0.0
+        self._indexed = False
+        self._reloads = 0
+
+    def get(self, persona_id: str) -> PersonaPromptContext | None:
+        key = _normalize_key(persona_id)
+        if not key:
+            return None
+        with self._lock:
+            self._refresh_if_due()
+            if key in self._missing:
+                self._missing.move_to_end(key)
+                return None
+            target = self._alias_index.get(key)
+            if target is None:
+                self._remember_missing(key)
+                return None
+            canonical_id, card_path = target
+            if card_path not in self._contexts:
+                self._card_mtimes[card_path] = _stat_mtime_ns(card_path)
+                self._contexts[card_path] = _load_context_from_card(card_path, canonical_id)
+            context = self._contexts[card_path]
+            if context is None:
+                self._remember_missing(key)
+            return context
+
+    def reload(self) -> bool:
+        """立即检查 yaml 与角色卡变化，返回索引或角色卡是否有更新。"""
+        with self._lock:
+            self._next_check_at = 0.0
+            return self._refresh_if_due()
+
+    def list_personas(self) -> list[str]:
+        """每张角色卡返回一个规范 persona_id（yaml 优先于内置别名）。"""
+        with self._lock:
+            self._refresh_if_due()
+            seen_cards: set[Path] = set()
+            persona_ids: list[str] = []
+            for canonical_id, card_path in self._alias_index.values():
+                if card_path not in seen_cards:
+                    seen_cards.add(card_path)
+                    persona_ids.append(canonical_id)
+            return persona_ids
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            self._refresh_if_due()
+            personas: dict[str, list[str]] = {}
+            for alias, (canonical_id, _) in self._alias_index.items():
+                personas.setdefault(canonical_id, []).append(alias)
+            return {
+                "personas": {persona_id: sorted(aliases) for persona_id, aliases in sorted(personas.items())},
+                "loaded_cards": sum(1 for context in self._contexts.values() if context is not None),
+                "negative_cache": len(self._missing),
+                "reloads": self._reloads,
+            }
+
+    def _refresh_if_due(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_check_at:
+            return False
+        self._next_check_at = now + self._reload_interval_seconds
+
+        index_changed = self._refresh_yaml_entries() or not self._indexed
+        self._indexed = True
+        cards_changed = False
+        for card_path, mtime_ns in list(self._card_mtimes.items()):
+            if _stat_mtime_ns(card_path) != mtime_ns:
+                self._card_mtimes.pop(card_path, None)
+                self._contexts.pop(card_path, None)
+                cards_changed = True
+
+        if index_changed:
+            self._alias_index = self._build_alias_index()
+        if index_changed or cards_changed:
+            self._missing.clear()
+            self._reloads += 1
+        return index_changed or cards_changed
+
+    def _refresh_yaml_entries(self) -> bool:
+        paths: list[Path] = []
+        if self._persona_dir.is_dir():
+            paths = sorted(self._persona_dir.glob("*.yaml")) + sorted(self._persona_dir.glob("*.yml"))
+
+        changed = False
+        current = set(paths)
+        for removed in [path for path in self._yaml_entries if path not in current]:
+            del self._yaml_entries[removed]
+            changed = True
+        for path in paths:
+            mtime_ns = _stat_mtime_ns(path)
+            entry = self._yaml_entries.get(path)
+            # 角色卡未找到的条目每次检查都重新解析路径，卡片后补上即可生效。
+            if entry is not None and entry.mtime_ns == mtime_ns and entry.card_path is not None:
                 continue
-            source_card = str(parsed["source_card"]).strip()
-            if not source_card:
+            refreshed = self._parse_yaml_entry(path, mtime_ns)
+            if refreshed != entry:
+                self._yaml_entries[path] = refreshed
+                changed = True
+        # 重建字典以保持 glob 的排序，决定重名别名的优先级。
+        if changed:
+            self._yaml_entries = {path: self._yaml_entries[path] for path in paths if path in self._yaml_entries}
+        return changed
+
+    def _parse_yaml_entry(self, path: Path, mtime_ns: int) -> _PersonaYamlEntry:
+        parsed = _parse_persona_yaml(path)
+        if parsed is None:
+            return _PersonaYamlEntry(mtime_ns=mtime_ns, persona_id="", aliases=(), card_path=None)
+        source_card = str(parsed["source_card"]).strip()
+        card_path = (
+            _resolve_source_card_path(source_card, path, self._configs_root, self._repo_root)
+            if source_card
+            else None
+        )
+        return _PersonaYamlEntry(
+            mtime_ns=mtime_ns,
+            persona_id=str(parsed["id"]),
+            aliases=tuple(str(alias) for alias in parsed["aliases"]),
+            card_path=card_path,
+        )
+
+    def _build_alias_index(self) -> dict[str, tuple[str, Path]]:
+        index: dict[str, tuple[str, Path]] = {}
+        for entry in self._yaml_entries.values():
+            if not entry.persona_id or entry.card_path is None:
                 continue
-            resolved = _resolve_source_card_path(source_card, yaml_path, configs_root, repo_root)
-            if resolved is not None:
-                return resolved
-
-    fallback_map = {
-        "phainon": "Phainon_actor_card.json",
-        "baie": "Phainon_actor_card.json",
-        "白厄": "Phainon_actor_card.json",
-    }
-    fallback_name = fallback_map.get(normalized_persona_id)
-    if not fallback_name:
-        return None
-    fallback_path = repo_root / fallback_name
-    if fallback_path.is_file():
-        return fallback_path
-    return None
+            for alias in (entry.persona_id, *entry.aliases):
+                key = _normalize_key(alias)
+                if key:
+                    index.setdefault(key, (entry.persona_id, entry.card_path))
+        for alias, card_name in _FALLBACK_CARDS.items():
+            fallback_path = self._repo_root / card_name
+            if fallback_path.is_file():
+                index.setdefault(_normalize_key(alias), (alias, fallback_path))
+        return index
+
+    def _remember_missing(self, key: str) -> None:
+        self._missing[key] = None
+        self._missing.move_to_end(key)
+        while len(self._missing) > self._negative_cache_size:
+            self._missing.popitem(last=False)
 
 
 def _parse_persona_yaml(path: Path) -> dict[str, object] | None:
@@ -99,7 +250,7 @@ def _parse_persona_yaml(path: Path) -> dict[str, object] | None:
         indent = len(raw_line) - len(raw_line.lstrip(" "))
         if in_aliases:
             if indent > aliases_indent and stripped.startswith("-"):
-                alias_value = _strip_yaml_value(stripped[1:].strip())
+                alias_value = strip_yaml_value(stripped[1:].strip())
                 if alias_value:
                     aliases.append(alias_value)
                 continue
@@ -112,13 +263,13 @@ def _parse_persona_yaml(path: Path) -> dict[str, object] | None:
         value = value.strip()
 
         if key == "id":
-            persona_id = _strip_yaml_value(value)
+            persona_id = strip_yaml_value(value)
         elif key == "source_card":
-            source_card = _strip_yaml_value(value)
+            source_card = strip_yaml_value(value)
         elif key == "aliases":
             in_aliases = True
             aliases_indent = indent
-            inline_value = _strip_yaml_value(value)
+            inline_value = strip_yaml_value(value)
             if inline_value:
                 aliases.append(inline_value)
 
@@ -153,6 +304,7 @@ def _resolve_source_card_path(
 
 
 def _load_context_from_card(card_path: Path, persona_id: str) -> PersonaPromptContext | None:
+    source_mtime_ns = _stat_mtime_ns(card_path)
     try:
         payload = json.loads(card_path.read_text(encoding="utf-8"))
     except (OSError, json.JSONDecodeError):
@@ -207,9 +359,18 @@ def _load_context_from_card(card_path: Path, persona_id: str) -> PersonaPromptCo
         ai_initial_injection=ai_initial_injection,
         ai_additional_info=ai_additional_info,
         ai_need_to_follow=ai_need_to_follow,
+        source_path=card_path,
+        source_mtime_ns=source_mtime_ns,
     )
 
 
+def _stat_mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
 def _first_text(*values: object) -> str:
     for value in values:
         text = str(value or "").strip()
@@ -250,7 +411,8 @@ def _clip_prompt_blob(text: str, max_length: int = 10000) -> str:
     return normalized[: max_length - 1].rstrip() + "…"
 
 
-def _strip_yaml_value(value: str) -> str:
+def strip_yaml_value(value: str) -> str:
+    """去掉简易 YAML 标量两侧成对的引号。"""
     text = str(value or "").strip()
     if len(text) >= 2 and text[0] == text[-1] and text[0] in {'"', "'"}:
         return text[1:-1].strip()
@@ -0,0 +1,204 @@
+"""常用台词预热：把可预知的短句提前合成进 TTS 缓存。"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.core.settings import get_settings
+from app.services.dialogue.chat_service import (
+    FALLBACK_SPEAK_TEXT,
+    SpeakSentenceSplitter,
+    build_default_tts_payload,
+    resolve_speak_text,
+)
+from app.services.dialogue.persona_loader import get_persona_registry, strip_yaml_value
+from app.services.tts.audio_cache import get_tts_audio_cache
+from app.services.tts.tts_service import (
+    TTSServiceError,
+    asynthesize_with_fallback,
+    resolve_tts_provider_priority,
+    synthesize_with_fallback,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PhraseBankReport:
+    personas: list[str] = field(default_factory=list)
+    providers: list[str] = field(default_factory=list)
+    phrases: int = 0
+    synthesized: int = 0
+    cached: int = 0
+    failed: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "personas": list(self.personas),
+            "providers": list(self.providers),
+            "phrases": self.phrases,
+            "synthesized": self.synthesized,
+            "cached": self.cached,
+            "failed": self.failed,
+            "errors": list(self.errors),
+        }
+
+
+def collect_phrase_bank(persona_ids: list[str] | None = None) -> dict[str, list[str]]:
+    """按 persona 汇总待预热台词：兜底句、开场白（整段与逐句）和事件台词。
+
+    与对话链路一致地从 ``<speak>`` 中取播报文本，整段用于非流式接口，
+    逐句用于流式接口；超过缓存长度上限的句子不会被缓存，直接略过。
+    """
+    settings = get_settings()
+    registry = get_persona_registry()
+    event_lines = load_event_speak_lines()
+    chosen = persona_ids or list(settings.tts_phrase_bank_personas) or registry.list_personas()
+
+    bank: dict[str, list[str]] = {}
+    for persona_id in chosen:
+        context = registry.get(persona_id)
+        if context is None:
+            logger.warning("预热跳过未知 persona: %s", persona_id)
+            continue
+        candidates = [FALLBACK_SPEAK_TEXT]
+        if context.first_message:
+            candidates.append(resolve_speak_text(context.first_message))
+            splitter = SpeakSentenceSplitter()
+            candidates.extend(splitter.feed(context.first_message))
+            candidates.extend(splitter.flush())
+        candidates.extend(event_lines)
+
+        phrases: list[str] = []
+        for text in candidates:
+            text = text.strip()
+            if text and len(text) <= settings.tts_cache_max_text_chars and text not in phrases:
+                phrases.append(text)
+        bank[context.persona_id] = phrases
+    return bank
+
+
+def load_event_speak_lines(path: Path | None = None) -> list[str]:
+    """读取事件配置中各事件的 ``speak_lines`` 列表。"""
+    events_path = path or _resolve_events_path()
+    if events_path is None:
+        return []
+    try:
+        raw_lines = events_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+
+    lines: list[str] = []
+    in_speak_lines = False
+    speak_lines_indent = 0
+    for raw_line in raw_lines:
+        stripped = raw_line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(raw_line) - len(raw_line.lstrip(" "))
+        if in_speak_lines:
+            if indent > speak_lines_indent and stripped.startswith("-"):
+                value = strip_yaml_value(stripped[1:].strip())
+                if value and value not in lines:
+                    lines.append(value)
+                continue
+            in_speak_lines = False
+        key, sep, _ = stripped.lstrip("- ").partition(":")
+        if sep and key.strip() == "speak_lines":
+            in_speak_lines = True
+            speak_lines_indent = indent
+    return lines
+
+
+def warm_phrase_bank(
+    persona_ids: list[str] | None = None,
+    *,
+    providers: list[str] | None = None,
+    qwen_voice_id: str = "",
+) -> PhraseBankReport:
+    """同步预热（供离线脚本调用）；已在缓存中的台词直接计为命中。"""
+    report, jobs = _plan_warmup(persona_ids, providers)
+    for provider, text in jobs:
+        try:
+            result = synthesize_with_fallback(
+                text=text,
+                gpt_sovits_payload=build_default_tts_payload(
+                    text, force_tts_provider=provider, qwen_voice_id=qwen_voice_id
+                ),
+            )
+        except TTSServiceError as exc:
+            _record_failure(report, provider, text, exc)
+            continue
+        _record_success(report, result.cache_hit)
+    return report
+
+
+async def awarm_phrase_bank(
+    persona_ids: list[str] | None = None,
+    *,
+    providers: list[str] | None = None,
+    qwen_voice_id: str = "",
+) -> PhraseBankReport:
+    """异步预热（供启动时后台任务调用）；逐句串行，避免挤占在线请求的上游并发额度。"""
+    report, jobs = _plan_warmup(persona_ids, providers)
+    for provider, text in jobs:
+        try:
+            result = await asynthesize_with_fallback(
+                text=text,
+                gpt_sovits_payload=build_default_tts_payload(
+                    text, force_tts_provider=provider, qwen_voice_id=qwen_voice_id
+                ),
+            )
+        except TTSServiceError as exc:
+            _record_failure(report, provider, text, exc)
+            continue
+        _record_success(report, result.cache_hit)
+    logger.info("TTS 台词预热完成: %s", report.as_dict())
+    return report
+
+
+def _plan_warmup(
+    persona_ids: list[str] | None,
+    providers: list[str] | None,
+) -> tuple[PhraseBankReport, list[tuple[str, str]]]:
+    report = PhraseBankReport()
+    if get_tts_audio_cache() is None:
+        report.errors.append("TTS 缓存未启用（TTS_CACHE_ENABLED=false），跳过预热")
+        return report, []
+
+    bank = collect_phrase_bank(persona_ids)
+    report.personas = list(bank)
+    report.providers = list(providers or resolve_tts_provider_priority())
+    # 当前音色按 provider 全局配置，不同 persona 的相同台词只需合成一次。
+    phrases: list[str] = []
+    for persona_phrases in bank.values():
+        for text in persona_phrases:
+            if text not in phrases:
+                phrases.append(text)
+    report.phrases = len(phrases)
+    return report, [(provider, text) for provider in report.providers for text in phrases]
+
+
+def _record_success(report: PhraseBankReport, cache_hit: bool) -> None:
+    if cache_hit:
+        report.cached += 1
+    else:
+        report.synthesized += 1
+
+
+def _record_failure(report: PhraseBankReport, provider: str, text: str, exc: Exception) -> None:
+    report.failed += 1
+    report.errors.append(f"{provider}: {text}: {exc}")
+    logger.warning("TTS 台词预热失败 provider=%s text=%s: %s", provider, text, exc)
+
+
+def _resolve_events_path() -> Path | None:
+    events_dir = get_settings().configs_root / "events"
+    for name in ("daily_events.yaml", "daily_events.example.yaml"):
+        candidate = events_dir / name
+        if candidate.is_file():
+            return candidate
+    return None
@@ -0,0 +1,82 @@
+"""LLM 前缀缓存命中统计（基于上游返回的 usage）。"""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any
+
+_LOCK = Lock()
+_TOTALS = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+_SEGMENTS: dict[str, dict[str, int]] = {}
+
+
+def record_prompt_cache_usage(segment_chars: tuple[tuple[str, int], ...], usage: dict[str, Any]) -> None:
+    """按缓存 token 占比估算命中的前缀长度，完整落在该前缀内的段记为命中。
+
+    上游只返回 token 数，段边界按字符比例折算，因此段级命中是估算值。
+    """
+    prompt_tokens, cached_tokens = extract_prompt_cache_tokens(usage)
+    if prompt_tokens <= 0:
+        return
+    total_chars = sum(chars for _, chars in segment_chars)
+    cached_chars = total_chars * min(cached_tokens / prompt_tokens, 1.0)
+
+    with _LOCK:
+        _TOTALS["requests"] += 1
+        _TOTALS["prompt_tokens"] += prompt_tokens
+        _TOTALS["cached_tokens"] += cached_tokens
+        offset = 0
+        for name, chars in segment_chars:
+            offset += chars
+            if chars <= 0:
+                continue
+            counters = _SEGMENTS.setdefault(name, {"sent": 0, "hits": 0})
+            counters["sent"] += 1
+            if cached_tokens > 0 and offset <= cached_chars:
+                counters["hits"] += 1
+
+
+def extract_prompt_cache_tokens(usage: dict[str, Any]) -> tuple[int, int]:
+    """兼容 OpenAI（prompt_tokens_details.cached_tokens）、Anthropic（cache_read_input_tokens）与 Kimi（cached_tokens）。"""
+    details = usage.get("prompt_tokens_details")
+    cached = _to_int(details.get("cached_tokens")) if isinstance(details, dict) else 0
+    cached = cached or _to_int(usage.get("cache_read_input_tokens")) or _to_int(usage.get("cached_tokens"))
+
+    prompt_tokens = _to_int(usage.get("prompt_tokens"))
+    if not prompt_tokens:
+        # Anthropic 的 input_tokens 不含缓存读写部分。
+        prompt_tokens = (
+            _to_int(usage.get("input_tokens"))
+            + _to_int(usage.get("cache_read_input_tokens"))
+            + _to_int(usage.get("cache_creation_input_tokens"))
+        )
+    return prompt_tokens, min(cached, prompt_tokens) if prompt_tokens else 0
+
+
+def get_prompt_cache_stats() -> dict[str, Any]:
+    with _LOCK:
+        totals = dict(_TOTALS)
+        segments = {name: dict(counters) for name, counters in _SEGMENTS.items()}
+    prompt_tokens = totals["prompt_tokens"]
+    return {
+        **totals,
+        "cached_token_ratio": round(totals["cached_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0,
+        "segments": {
+            name: {**counters, "hit_ratio": round(counters["hits"] / counters["sent"], 4) if counters["sent"] else 0.0}
+            for name, counters in segments.items()
+        },
+    }
+
+
+def reset_prompt_cache_stats() -> None:
+    with _LOCK:
+        for key in _TOTALS:
+            _TOTALS[key] = 0
+        _SEGMENTS.clear()
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return max(int(value or 0), 0)
+    except (TypeError, ValueError):
+        return 0
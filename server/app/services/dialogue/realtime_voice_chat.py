@@ -0,0 +1,141 @@
+"""全双工语音对话：同一条连接上完成 Fun-ASR 识别、LLM 回复与 TTS 回推，用户再次开口时打断当前回复。"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from app.repositories.session_store import AsyncSessionStore
+from app.services.asr.fun_asr_realtime_client import FunASRClientError, FunASREvent, FunASRRealtimeSession
+from app.services.dialogue.chat_service import ChatServiceError, astream_text_chat_with_voice
+from app.services.upstream_limits import UPSTREAM_ASR, run_on_upstream_executor
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimeVoiceChat:
+    """驱动一次全双工语音会话。
+
+    - 麦克风帧持续送入 Fun-ASR，识别结果以 ``transcript`` 事件实时回推；
+    - 收到 ``sentence_end`` 的整句后开启一轮回复（``astream_text_chat_with_voice``），其事件附带 ``turn`` 序号回推；
+    - 回复进行中又识别到新的语音时取消该轮（含未完成的 TTS），推送 ``interrupted``；
+    - 输入结束后等待最后一轮回复推送完毕再推送 ``close``。
+    """
+
+    def __init__(
+        self,
+        *,
+        store: AsyncSessionStore,
+        session_id: str,
+        persona_id: str,
+        send: Callable[[dict[str, Any]], Awaitable[None]],
+        audio_format: str,
+        sample_rate: int,
+        force_tts_provider: str = "qwen_clone_tts",
+        qwen_voice_id: str = "",
+        qwen_target_model: str = "",
+        output_format: str = "wav",
+    ) -> None:
+        self._store = store
+        self._session_id = session_id
+        self._persona_id = persona_id
+        self._send_raw = send
+        self._send_lock = asyncio.Lock()
+        self._audio_format = audio_format
+        self._sample_rate = sample_rate
+        self._tts_options = {
+            "force_tts_provider": force_tts_provider,
+            "qwen_voice_id": qwen_voice_id,
+            "qwen_target_model": qwen_target_model,
+            "output_format": output_format,
+        }
+        self._asr = FunASRRealtimeSession(
+            audio_format=audio_format,
+            sample_rate=sample_rate,
+            loop=asyncio.get_running_loop(),
+        )
+        self._turn = 0
+        self._reply_task: asyncio.Task[None] | None = None
+
+    async def run(self, frames: AsyncIterator[bytes]) -> None:
+        """消费麦克风帧直至结束；识别失败抛 FunASRClientError，调用方断开时由取消终止。"""
+        await run_on_upstream_executor(UPSTREAM_ASR, self._asr.start)
+        await self._send(
+            {
+                "type": "open",
+                "provider": "fun_asr_realtime",
+                "format": self._audio_format,
+                "sample_rate": self._sample_rate,
+            }
+        )
+        events_task = asyncio.create_task(self._pump_asr_events())
+        try:
+            async for frame in frames:
+                if events_task.done():
+                    break
+                await run_on_upstream_executor(UPSTREAM_ASR, self._asr.send_audio_frame, frame)
+            if not events_task.done():
+                # stop 会阻塞到服务端返回最终结果；close 后事件流以 None 结束，识别结果处理完即退出。
+                await run_on_upstream_executor(UPSTREAM_ASR, self._asr.stop)
+                await run_on_upstream_executor(UPSTREAM_ASR, self._asr.close)
+            await events_task
+            if self._reply_task is not None:
+                await self._reply_task
+            await self._send({"type": "close", "turns": self._turn})
+        finally:
+            events_task.cancel()
+            await asyncio.gather(events_task, self._cancel_reply(), return_exceptions=True)
+            await run_on_upstream_executor(UPSTREAM_ASR, self._asr.close)
+
+    async def _pump_asr_events(self) -> None:
+        while (event := await self._asr.anext_event()) is not None:
+            await self._handle_asr_event(event)
+
+    async def _handle_asr_event(self, event: FunASREvent) -> None:
+        if event.type == "error":
+            raise FunASRClientError(event.error or "Fun-ASR 流式识别失败")
+        text = event.text.strip()
+        if event.type != "result" or not text:
+            return
+        if self._reply_task is not None and not self._reply_task.done():
+            # 用户开口即打断：未推送完的音频与尚在合成的句子一并取消，已生成的部分回复仍写入历史。
+            await self._cancel_reply()
+            await self._send({"type": "interrupted", "turn": self._turn})
+        await self._send({"type": "transcript", "text": text, "sentence_end": event.sentence_end})
+        if event.sentence_end:
+            self._turn += 1
+            self._reply_task = asyncio.create_task(self._reply(self._turn, text))
+
+    async def _reply(self, turn: int, user_text: str) -> None:
+        events = astream_text_chat_with_voice(
+            store=self._store,
+            session_id=self._session_id,
+            persona_id=self._persona_id,
+            user_text=user_text,
+            **self._tts_options,
+        )
+        try:
+            async for event in events:
+                await self._send({**event, "turn": turn})
+        except ChatServiceError as exc:
+            logger.warning("实时语音对话第 %s 轮 LLM 失败: %s", turn, exc)
+            await self._send({"type": "error", "turn": turn, "message": f"LLM 对话失败: {exc}"})
+        finally:
+            await events.aclose()
+
+    async def _cancel_reply(self) -> None:
+        """取消并等待当前回复结束，保证其事件不会晚于后续事件推送。"""
+        task = self._reply_task
+        if task is None or task.done():
+            return
+        # 让刚创建的任务至少运行到首个 await：未启动就取消的协程不会执行任何代码，本轮用户消息会丢失。
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _send(self, payload: dict[str, Any]) -> None:
+        # 识别事件与回复事件来自不同任务，串行写入连接。
+        async with self._send_lock:
+            await self._send_raw(payload)
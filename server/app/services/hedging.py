@@ -0,0 +1,121 @@
+"""对冲请求：主 provider 超出延迟预算仍未返回时并行启动下一个，取最先成功者并取消其余。"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_LOCK = Lock()
+_STATS: dict[str, dict[str, Any]] = {}
+
+
+@dataclass
+class HedgeOutcome(Generic[T]):
+    winner: str | None
+    result: T | None
+    errors: list[tuple[str, BaseException]] = field(default_factory=list)
+    # 是否因超出延迟预算而并行启动过后备 provider。
+    hedged: bool = False
+
+
+async def run_hedged(
+    kind: str,
+    candidates: Sequence[tuple[str, Callable[[], Awaitable[T]]]],
+    *,
+    hedge_after_seconds: float | None,
+    expected_errors: tuple[type[BaseException], ...],
+) -> HedgeOutcome[T]:
+    """按顺序启动候选，返回最先成功的结果。
+
+    - 当前候选失败（expected_errors）时立即启动下一个；
+    - hedge_after_seconds 内没有任何候选完成时，并行启动下一个（对冲），计时从最近一次启动算起；
+    - hedge_after_seconds 为 None 时不对冲，退化为逐个降级；
+    - 返回前取消仍在进行的候选。其他异常原样抛出。
+    """
+    queue = list(candidates)
+    pending: dict[asyncio.Task[T], str] = {}
+    errors: list[tuple[str, BaseException]] = []
+    hedged = False
+
+    def launch() -> None:
+        name, factory = queue.pop(0)
+        pending[asyncio.ensure_future(factory())] = name
+
+    try:
+        if queue:
+            launch()
+        while pending:
+            timeout = hedge_after_seconds if queue and hedge_after_seconds is not None else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                logger.info(
+                    "%s 对冲：%s 超出 %.2fs 预算，并行启动 %s",
+                    kind,
+                    ",".join(pending.values()),
+                    hedge_after_seconds,
+                    queue[0][0],
+                )
+                launch()
+                continue
+            failed = False
+            for task in done:
+                name = pending.pop(task)
+                exc = task.exception()
+                if exc is None:
+                    _record(kind, hedged=hedged, winner=name)
+                    return HedgeOutcome(winner=name, result=task.result(), errors=errors, hedged=hedged)
+                if not isinstance(exc, expected_errors):
+                    raise exc
+                errors.append((name, exc))
+                failed = True
+            if failed and queue:
+                launch()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    _record(kind, hedged=hedged, winner=None)
+    return HedgeOutcome(winner=None, result=None, errors=errors, hedged=hedged)
+
+
+def get_hedge_stats() -> dict[str, Any]:
+    """按类别（tts/asr）返回请求数、对冲触发率与各 provider 胜出次数。"""
+    with _LOCK:
+        snapshot = {
+            kind: {**stats, "wins": dict(stats["wins"]), "hedged_wins": dict(stats["hedged_wins"])}
+            for kind, stats in _STATS.items()
+        }
+    for stats in snapshot.values():
+        requests = stats["requests"]
+        stats["hedge_rate"] = round(stats["hedged"] / requests, 4) if requests else 0.0
+    return snapshot
+
+
+def reset_hedge_stats() -> None:
+    with _LOCK:
+        _STATS.clear()
+
+
+def _record(kind: str, *, hedged: bool, winner: str | None) -> None:
+    with _LOCK:
+        stats = _STATS.setdefault(kind, {"requests": 0, "hedged": 0, "failed": 0, "wins": {}, "hedged_wins": {}})
+        stats["requests"] += 1
+        if hedged:
+            stats["hedged"] += 1
+        if winner is None:
+            stats["failed"] += 1
+            return
+        stats["wins"][winner] = stats["wins"].get(winner, 0) + 1
+        if hedged:
+            stats["hedged_wins"][winner] = stats["hedged_wins"].get(winner, 0) + 1
@@ -0,0 +1,155 @@
+"""上游 HTTP 客户端注册表：每个 origin 复用一个 keep-alive 连接池。"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from threading import Lock
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from app.core.settings import get_settings
+
+# 同步客户端全局共享；AsyncClient 的连接绑定事件循环，按循环分别维护。
+_SYNC_CLIENTS: dict[str, httpx.Client] = {}
+_ASYNC_CLIENTS: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = WeakKeyDictionary()
+_REQUEST_COUNTS: dict[tuple[str, str], int] = {}
+_LOCK = Lock()
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """返回 url 所属 origin 的共享同步客户端；超时请在单次请求上传入。"""
+    origin = _origin_of(url)
+    with _LOCK:
+        client = _SYNC_CLIENTS.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                http2=_http2_enabled(),
+                limits=_build_limits(),
+                event_hooks={"request": [_sync_request_hook(origin)]},
+            )
+            _SYNC_CLIENTS[origin] = client
+        return client
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """返回当前事件循环下 url 所属 origin 的共享异步客户端。"""
+    origin = _origin_of(url)
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        per_loop = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = per_loop.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=_http2_enabled(),
+                limits=_build_limits(),
+                event_hooks={"request": [_async_request_hook(origin)]},
+            )
+            per_loop[origin] = client
+        return client
+
+
+async def aclose_http_clients() -> None:
+    """关闭全部共享客户端，供应用 lifespan 退出时调用。"""
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        sync_clients = list(_SYNC_CLIENTS.values())
+        _SYNC_CLIENTS.clear()
+        async_clients = list(_ASYNC_CLIENTS.pop(loop, {}).values())
+        _REQUEST_COUNTS.clear()
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.aclose()
+
+
+def get_http_pool_stats() -> dict[str, Any]:
+    settings = get_settings()
+    with _LOCK:
+        entries = [("sync", origin, client) for origin, client in _SYNC_CLIENTS.items()]
+        for per_loop in list(_ASYNC_CLIENTS.values()):
+            entries.extend(("async", origin, client) for origin, client in per_loop.items())
+        request_counts = dict(_REQUEST_COUNTS)
+
+    pools = []
+    for kind, origin, client in sorted(entries, key=lambda item: (item[1], item[0])):
+        connections = _list_pool_connections(client)
+        idle = sum(1 for conn in connections if _call_flag(conn, "is_idle"))
+        pools.append(
+            {
+                "origin": origin,
+                "kind": kind,
+                "requests": request_counts.get((kind, origin), 0),
+                "connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "closed": client.is_closed,
+            }
+        )
+    return {
+        "http2_enabled": _http2_enabled(),
+        "limits": {
+            "max_connections": settings.http_pool_max_connections,
+            "max_keepalive_connections": settings.http_pool_max_keepalive_connections,
+            "keepalive_expiry_seconds": settings.http_pool_keepalive_expiry_seconds,
+        },
+        "pools": pools,
+    }
+
+
+def _origin_of(url: str) -> str:
+    parsed = httpx.URL(url)
+    port = f":{parsed.port}" if parsed.port else ""
+    return f"{parsed.scheme}://{parsed.host}{port}"
+
+
+def _build_limits() -> httpx.Limits:
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=max(settings.http_pool_max_connections, 1),
+        max_keepalive_connections=max(settings.http_pool_max_keepalive_connections, 0),
+        keepalive_expiry=max(settings.http_pool_keepalive_expiry_seconds, 0.0),
+    )
+
+
+def _http2_enabled() -> bool:
+    # HTTP/2 依赖可选包 h2（pip install "httpx[http2]"），未安装时回落 HTTP/1.1 keep-alive。
+    return get_settings().http_enable_http2 and importlib.util.find_spec("h2") is not None
+
+
+def _count_request(kind: str, origin: str) -> None:
+    with _LOCK:
+        key = (kind, origin)
+        _REQUEST_COUNTS[key] = _REQUEST_COUNTS.get(key, 0) + 1
+
+
+def _sync_request_hook(origin: str):
+    def hook(_request: httpx.Request) -> None:
+        _count_request("sync", origin)
+
+    return hook
+
+
+def _async_request_hook(origin: str):
+    async def hook(_request: httpx.Request) -> None:
+        _count_request("async", origin)
+
+    return hook
+
+
+def _list_pool_connections(client: httpx.Client | httpx.AsyncClient) -> list[Any]:
+    # httpx 未公开连接池统计，读取 httpcore 连接池的 connections 列表。
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    return list(getattr(pool, "connections", []) or [])
+
+
+def _call_flag(connection: Any, name: str) -> bool:
+    method = getattr(connection, name, None)
+    if not callable(method):
+        return False
+    try:
+        return bool(method())
+    except Exception:  # noqa: BLE001
+        return False
@@ -0,0 +1,259 @@
+"""TTS 音频内容寻址缓存：内存 LRU + 磁盘 LRU 两级，均按字节数限额淘汰。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 缓存键格式版本；键的组成变化时递增，使旧磁盘条目自然失效。
+_KEY_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    audio_bytes: bytes
+    media_type: str
+    provider: str
+    voice_id: str = ""
+
+
+def build_tts_cache_key(*, text: str, provider: str, voice_id: str = "", params: dict[str, Any] | None = None) -> str:
+    """对播报文本、provider、音色与影响音频的合成参数做 sha256。"""
+    material = {
+        "v": _KEY_VERSION,
+        "text": text,
+        "provider": provider,
+        "voice_id": voice_id,
+        "params": params or {},
+    }
+    encoded = json.dumps(material, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """热数据留在内存，完整副本落盘，进程重启后仍可命中。
+
+    磁盘条目为 ``<key>.audio`` + ``<key>.json`` 两个文件，启动时按 mtime 重建 LRU 顺序；
+    命中时刷新 mtime。``disk_max_bytes`` 为 0 时只使用内存层。
+    """
+
+    def __init__(self, memory_max_bytes: int, disk_dir: Path | None, disk_max_bytes: int) -> None:
+        self._memory_max_bytes = max(int(memory_max_bytes), 0)
+        self._disk_max_bytes = max(int(disk_max_bytes), 0)
+        self._disk_dir = disk_dir if disk_dir is not None and self._disk_max_bytes > 0 else None
+        self._memory: OrderedDict[str, CachedAudio] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_index: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        if self._disk_dir is not None:
+            self._load_disk_index()
+
+    def _get_from_memory(self, key: str) -> CachedAudio | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            self._memory.move_to_end(key)
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+            self._memory_hits += 1
+            return entry
+
+    def get(self, key: str) -> CachedAudio | None:
+        entry = self._get_from_memory(key)
+        if entry is not None:
+            return entry
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key: str, entry: CachedAudio) -> None:
+        if not entry.audio_bytes:
+            return
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            keys = list(self._disk_index)
+            self._disk_index.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            self._remove_disk_files(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            hits = self._memory_hits + self._disk_hits
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self._memory_max_bytes,
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self._disk_max_bytes if self._disk_dir is not None else 0,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+    # ---- 内存层（调用方已持锁） ----
+
+    def _remember(self, key: str, entry: CachedAudio) -> None:
+        size = len(entry.audio_bytes)
+        if size > self._memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous.audio_bytes)
+        self._memory[key] = entry
+        self._memory_bytes += size
+        while self._memory_bytes > self._memory_max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.audio_bytes)
+            self._evictions += 1
+
+    # ---- 磁盘层 ----
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        assert self._disk_dir is not None
+        return self._disk_dir / f"{key}.audio", self._disk_dir / f"{key}.json"
+
+    def _load_disk_index(self) -> None:
+        assert self._disk_dir is not None
+        try:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            audio_files = [
+                (path.stat().st_mtime_ns, path.stem, path.stat().st_size)
+                for path in self._disk_dir.glob("*.audio")
+                if path.with_suffix(".json").exists()
+            ]
+        except OSError as exc:
+            logger.warning("TTS 磁盘缓存目录不可用，仅启用内存缓存: %s", exc)
+            self._disk_dir = None
+            return
+        for _, key, size in sorted(audio_files):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+        for key in self._evict_disk_over_limit():
+            self._remove_disk_files(key)
+
+    def _read_disk(self, key: str) -> CachedAudio | None:
+        if self._disk_dir is None:
+            return None
+        with self._lock:
+            if key not in self._disk_index:
+                return None
+        audio_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            audio_bytes = audio_path.read_bytes()
+            os.utime(audio_path)
+        except (OSError, ValueError) as exc:
+            logger.warning("TTS 磁盘缓存条目损坏，已丢弃 %s: %s", key, exc)
+            with self._lock:
+                self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._remove_disk_files(key)
+            return None
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return CachedAudio(
+            audio_bytes=audio_bytes,
+            media_type=str(meta.get("media_type", "audio/wav")),
+            provider=str(meta.get("provider", "")),
+            voice_id=str(meta.get("voice_id", "")),
+        )
+
+    def _write_disk(self, key: str, entry: CachedAudio) -> None:
+        if self._disk_dir is None:
+            return
+        size = len(entry.audio_bytes)
+        if size > self._disk_max_bytes:
+            return
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+                return
+        audio_path, meta_path = self._paths(key)
+        meta = {"media_type": entry.media_type, "provider": entry.provider, "voice_id": entry.voice_id}
+        try:
+            # 先写临时文件再原子替换；元数据最后落盘，加载时以它作为条目完整的标志。
+            _atomic_write(audio_path, entry.audio_bytes)
+            _atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        except OSError as exc:
+            logger.warning("写入 TTS 磁盘缓存失败 %s: %s", key, exc)
+            self._remove_disk_files(key)
+            return
+        with self._lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._disk_index[key] = size
+            self._disk_bytes += size
+            evicted = self._evict_disk_over_limit()
+        for evicted_key in evicted:
+            self._remove_disk_files(evicted_key)
+
+    def _evict_disk_over_limit(self) -> list[str]:
+        # 只更新索引；文件删除由调用方在锁外完成。
+        evicted: list[str] = []
+        while self._disk_bytes > self._disk_max_bytes and self._disk_index:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self._evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _remove_disk_files(self, key: str) -> None:
+        if self._disk_dir is None:
+            return
+        for path in self._paths(key):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=1)
+def get_tts_audio_cache() -> TTSAudioCache | None:
+    """返回进程级 TTS 缓存；``TTS_CACHE_ENABLED=false`` 时返回 None。"""
+    settings = get_settings()
+    if not settings.tts_cache_enabled:
+        return None
+    return TTSAudioCache(
+        memory_max_bytes=settings.tts_cache_memory_max_mb * 1024 * 1024,
+        disk_dir=settings.tts_cache_dir,
+        disk_max_bytes=settings.tts_cache_disk_max_mb * 1024 * 1024,
+    )
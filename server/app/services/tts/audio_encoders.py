@@ -0,0 +1,185 @@
+"""TTS 输出格式编码器注册表：上游统一合成 WAV，按客户端协商结果在服务端转码。"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Lock
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_FORMAT = "wav"
+_ENCODE_TIMEOUT_SECONDS = 30.0
+
+# 客户端常用写法归一到注册名。
+_FORMAT_ALIASES = {"ogg": "opus", "mpeg": "mp3", "wave": "wav", "x-wav": "wav"}
+_MEDIA_TYPE_FORMATS = {
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/webm": "webm",
+}
+
+
+class AudioEncodeError(RuntimeError):
+    """音频转码失败。"""
+
+
+@dataclass(frozen=True)
+class AudioEncoder:
+    name: str
+    media_type: str
+    # 输入为任意 ffmpeg 可识别的音频 bytes（通常为 WAV），输出目标格式 bytes。
+    encode: Callable[[bytes], bytes]
+    is_available: Callable[[], bool] = lambda: True
+
+
+_ENCODERS: dict[str, AudioEncoder] = {}
+_LOCK = Lock()
+
+
+def register_audio_encoder(encoder: AudioEncoder) -> None:
+    """注册或替换某个输出格式的编码器，可用于接入 ffmpeg 之外的实现。"""
+    with _LOCK:
+        _ENCODERS[encoder.name] = encoder
+
+
+def get_audio_encoder(output_format: str) -> AudioEncoder | None:
+    with _LOCK:
+        return _ENCODERS.get(normalize_output_format(output_format))
+
+
+def output_media_type(output_format: str) -> str:
+    """输出格式对应的媒体类型；wav 或未注册的格式为 audio/wav。"""
+    fmt = normalize_output_format(output_format) or DEFAULT_OUTPUT_FORMAT
+    encoder = get_audio_encoder(fmt) if fmt != DEFAULT_OUTPUT_FORMAT else None
+    return encoder.media_type if encoder is not None else "audio/wav"
+
+
+def list_output_formats() -> list[str]:
+    """当前可用的输出格式（wav 恒可用）。"""
+    with _LOCK:
+        encoders = list(_ENCODERS.values())
+    available = [
+        encoder.name for encoder in encoders if encoder.name != DEFAULT_OUTPUT_FORMAT and _safe_available(encoder)
+    ]
+    return [DEFAULT_OUTPUT_FORMAT, *available]
+
+
+def normalize_output_format(raw_value: str | None) -> str:
+    text = str(raw_value or "").strip().lower()
+    return _FORMAT_ALIASES.get(text, text)
+
+
+def negotiate_output_format(requested: str | None, accept: str | None = None) -> str:
+    """显式 output_format 优先，其次按 Accept 的 q 值挑选可用格式；均不可用时回退 wav。"""
+    available = list_output_formats()
+    explicit = normalize_output_format(requested)
+    if explicit:
+        if explicit in available:
+            return explicit
+        logger.info("输出格式 %s 不可用，回退 %s", explicit, DEFAULT_OUTPUT_FORMAT)
+        return DEFAULT_OUTPUT_FORMAT
+
+    candidates: list[tuple[float, int, str]] = []
+    for position, item in enumerate(str(accept or "").split(",")):
+        media_type, _, params = item.strip().partition(";")
+        fmt = _MEDIA_TYPE_FORMATS.get(media_type.strip().lower())
+        if fmt is None or fmt not in available:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, fmt))
+    return min(candidates)[2] if candidates else DEFAULT_OUTPUT_FORMAT
+
+
+def encode_audio(audio_bytes: bytes, source_media_type: str, output_format: str) -> tuple[bytes, str]:
+    """转码为目标格式，返回 (bytes, media_type)；源格式已一致时原样返回。"""
+    fmt = normalize_output_format(output_format) or DEFAULT_OUTPUT_FORMAT
+    source_format = _MEDIA_TYPE_FORMATS.get(source_media_type.split(";")[0].strip().lower())
+    if fmt == source_format:
+        return audio_bytes, source_media_type
+    if fmt == DEFAULT_OUTPUT_FORMAT and source_format is None:
+        return audio_bytes, source_media_type
+    encoder = get_audio_encoder(fmt)
+    if encoder is None or not _safe_available(encoder):
+        raise AudioEncodeError(f"输出格式不可用: {fmt}")
+    return encoder.encode(audio_bytes), encoder.media_type
+
+
+def _safe_available(encoder: AudioEncoder) -> bool:
+    try:
+        return bool(encoder.is_available())
+    except Exception:  # noqa: BLE001
+        return False
+
+
+# ---- 内置 ffmpeg 编码器 ----
+
+
+def _ffmpeg_binary() -> str | None:
+    return shutil.which(get_settings().ffmpeg_path)
+
+
+def _build_ffmpeg_encoder(name: str, media_type: str, build_args: Callable[[], list[str]]) -> AudioEncoder:
+    def encode(audio_bytes: bytes) -> bytes:
+        binary = _ffmpeg_binary()
+        if binary is None:
+            raise AudioEncodeError("未找到 ffmpeg，请安装或配置 FFMPEG_PATH")
+        command = [binary, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-vn", "-ac", "1"]
+        command.extend([*build_args(), "pipe:1"])
+        try:
+            completed = subprocess.run(
+                command,
+                input=audio_bytes,
+                capture_output=True,
+                timeout=_ENCODE_TIMEOUT_SECONDS,
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            raise AudioEncodeError(f"ffmpeg 转码 {name} 失败: {exc}") from exc
+        if completed.returncode != 0 or not completed.stdout:
+            detail = completed.stderr.decode("utf-8", errors="replace").strip()[-300:]
+            raise AudioEncodeError(f"ffmpeg 转码 {name} 失败(code={completed.returncode}): {detail}")
+        return completed.stdout
+
+    return AudioEncoder(
+        name=name,
+        media_type=media_type,
+        encode=encode,
+        is_available=lambda: _ffmpeg_binary() is not None,
+    )
+
+
+def _opus_args(container: str) -> Callable[[], list[str]]:
+    def build() -> list[str]:
+        bitrate = max(get_settings().tts_opus_bitrate_kbps, 6)
+        return ["-c:a", "libopus", "-b:a", f"{bitrate}k", "-application", "voip", "-f", container]
+
+    return build
+
+
+def _mp3_args() -> list[str]:
+    bitrate = max(get_settings().tts_mp3_bitrate_kbps, 8)
+    return ["-c:a", "libmp3lame", "-b:a", f"{bitrate}k", "-f", "mp3"]
+
+
+register_audio_encoder(_build_ffmpeg_encoder("mp3", "audio/mpeg", _mp3_args))
+register_audio_encoder(_build_ffmpeg_encoder("opus", "audio/ogg", _opus_args("ogg")))
+register_audio_encoder(_build_ffmpeg_encoder("webm", "audio/webm", _opus_args("webm")))
@@ -0,0 +1,103 @@
+"""待取回的合成音频：对话先返回元数据，音频由 ``GET /v1/tts/audio/{id}`` 以二进制分块取回。"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.core.settings import get_settings
+from app.services.tts.tts_service import TTSSynthesizeResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _AudioJob:
+    task: asyncio.Task[TTSSynthesizeResult]
+    expires_at: float
+
+
+class TTSAudioJobs:
+    """按 audio_id 保存合成任务，过期或超出上限时取消并丢弃。
+
+    任务在提交时即开始执行，客户端拿到对话元数据后再来取音频，合成与响应传输重叠进行。
+    音频只以原始 bytes 保存，取回时按块写出，不经过 base64。
+    """
+
+    def __init__(self, ttl_seconds: float = 120.0, max_jobs: int = 256) -> None:
+        self._ttl_seconds = max(float(ttl_seconds), 1.0)
+        self._max_jobs = max(int(max_jobs), 1)
+        self._jobs: OrderedDict[str, _AudioJob] = OrderedDict()
+
+    def submit(self, synthesis: Coroutine[Any, Any, TTSSynthesizeResult]) -> str:
+        self._purge_expired()
+        audio_id = uuid.uuid4().hex
+        task = asyncio.create_task(synthesis)
+        task.add_done_callback(_log_job_failure)
+        self._jobs[audio_id] = _AudioJob(task=task, expires_at=time.monotonic() + self._ttl_seconds)
+        while len(self._jobs) > self._max_jobs:
+            _, evicted = self._jobs.popitem(last=False)
+            evicted.task.cancel()
+        return audio_id
+
+    async def wait(self, audio_id: str) -> TTSSynthesizeResult | None:
+        """等待合成完成；未知、已过期或等待期间被淘汰的 id 返回 None，合成失败时抛出原异常。"""
+        self._purge_expired()
+        job = self._jobs.get(audio_id)
+        if job is None:
+            return None
+        try:
+            return await asyncio.shield(job.task)
+        except asyncio.CancelledError:
+            # 任务被淘汰或随 aclose() 取消：与过期同样处理；调用方自身被取消时照常抛出。
+            if job.task.cancelled():
+                return None
+            raise
+
+    async def aclose(self) -> None:
+        tasks = [job.task for job in self._jobs.values()]
+        self._jobs.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        self._purge_expired()
+        pending = sum(1 for job in self._jobs.values() if not job.task.done())
+        return {
+            "jobs": len(self._jobs),
+            "pending": pending,
+            "max_jobs": self._max_jobs,
+            "ttl_seconds": self._ttl_seconds,
+        }
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        expired = [audio_id for audio_id, job in self._jobs.items() if job.expires_at <= now]
+        for audio_id in expired:
+            self._jobs.pop(audio_id).task.cancel()
+
+
+def _log_job_failure(task: asyncio.Task[TTSSynthesizeResult]) -> None:
+    # 取出异常，避免客户端未来取音频时 asyncio 报 "exception was never retrieved"。
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.warning("后台 TTS 合成失败: %s", exc)
+
+
+@lru_cache(maxsize=1)
+def get_tts_audio_jobs() -> TTSAudioJobs:
+    settings = get_settings()
+    return TTSAudioJobs(
+        ttl_seconds=settings.tts_audio_job_ttl_seconds,
+        max_jobs=settings.tts_audio_job_max_jobs,
+    )
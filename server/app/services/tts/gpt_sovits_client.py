@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
-import json
+import struct
+from collections.abc import AsyncIterator
 from typing import Any
-from urllib import error, request
+
+import httpx
 
 from app.core.settings import get_settings
+from app.services.http_clients import get_async_http_client, get_http_client
+from app.services.upstream_limits import UPSTREAM_TTS, upstream_slot
 
 
 class GPTSoVITSClientError(RuntimeError):
     """GPT-SoVITS 接口请求失败。"""
 
 
+_MEDIA_TYPES = {"wav": "audio/wav", "ogg": "audio/ogg", "aac": "audio/aac", "raw": "audio/L16"}
+_WAV_HEADER_BYTES = 44
+
+
 def synthesize(payload: dict[str, Any]) -> tuple[bytes, str]:
     """调用 GPT-SoVITS /tts 并返回音频二进制与媒体类型。"""
     settings = get_settings()
@@ -26,15 +34,8 @@ def synthesize(payload: dict[str, Any]) -> tuple[bytes, str]:
             timeout_seconds=settings.gpt_sovits_timeout_seconds,
         )
     except GPTSoVITSClientError as exc:
-        if not _should_retry_with_auto_reference(normalized_payload, str(exc)):
-            raise
-
-        fallback_payload = {
-            "text": str(normalized_payload.get("text", "")).strip(),
-            "media_type": str(normalized_payload.get("media_type", "wav")).strip() or "wav",
-            "streaming_mode": bool(normalized_payload.get("streaming_mode", False)),
-        }
-        if not fallback_payload["text"]:
+        fallback_payload = _build_fallback_payload(normalized_payload, str(exc))
+        if fallback_payload is None:
             raise
 
         try:
@@ -49,32 +50,182 @@ def synthesize(payload: dict[str, Any]) -> tuple[bytes, str]:
             ) from fallback_exc
 
 
+async def asynthesize(payload: dict[str, Any]) -> tuple[bytes, str]:
+    """synthesize 的异步版本，并发受 TTS 上游额度约束。"""
+    settings = get_settings()
+    base_url = settings.gpt_sovits_base_url.rstrip("/")
+    normalized_payload = _normalize_tts_payload(payload)
+
+    async with upstream_slot(UPSTREAM_TTS):
+        try:
+            return await _apost_json_for_audio(
+                url=f"{base_url}/tts",
+                payload=normalized_payload,
+                timeout_seconds=settings.gpt_sovits_timeout_seconds,
+            )
+        except GPTSoVITSClientError as exc:
+            fallback_payload = _build_fallback_payload(normalized_payload, str(exc))
+            if fallback_payload is None:
+                raise
+
+            try:
+                return await _apost_json_for_audio(
+                    url=f"{base_url}/tts_to_audio/",
+                    payload=fallback_payload,
+                    timeout_seconds=settings.gpt_sovits_timeout_seconds,
+                )
+            except GPTSoVITSClientError as fallback_exc:
+                raise GPTSoVITSClientError(
+                    f"{exc}; 回退 /tts_to_audio/ 也失败: {fallback_exc}"
+                ) from fallback_exc
+
+
+async def astream_synthesize(payload: dict[str, Any]) -> AsyncIterator[bytes]:
+    """以 streaming_mode 调用 /tts，上游每到一块就产出一块。
+
+    首块之前失败时按 synthesize 的规则回退 /tts_to_audio/（整段返回后作为单块产出）；
+    首块之后失败抛出 GPTSoVITSClientError，由调用方决定如何截断。
+    """
+    settings = get_settings()
+    base_url = settings.gpt_sovits_base_url.rstrip("/")
+    normalized_payload = _normalize_tts_payload(payload)
+    normalized_payload["streaming_mode"] = True
+    url = f"{base_url}/tts"
+
+    async with upstream_slot(UPSTREAM_TTS):
+        started = False
+        try:
+            async with get_async_http_client(url).stream(
+                "POST",
+                url,
+                json=normalized_payload,
+                timeout=settings.gpt_sovits_timeout_seconds,
+            ) as resp:
+                if resp.status_code >= 400 or resp.headers.get("Content-Type", "").startswith("application/json"):
+                    await resp.aread()
+                    _read_audio_response(resp)
+                async for chunk in resp.aiter_bytes():
+                    if not chunk:
+                        continue
+                    if not started and _is_wav_payload(normalized_payload):
+                        # 流式 WAV 头的长度字段无意义（常为 0），改成“长度未知”以便客户端边收边播。
+                        chunk = patch_wav_length(chunk, None)
+                    started = True
+                    yield chunk
+            if not started:
+                raise GPTSoVITSClientError("GPT-SoVITS 流式响应为空")
+            return
+        except httpx.HTTPError as exc:
+            error = GPTSoVITSClientError(f"GPT-SoVITS 流式请求失败: {exc}")
+            if started:
+                raise error from exc
+        except GPTSoVITSClientError as exc:
+            if started:
+                raise
+            error = exc
+
+        fallback_payload = _build_fallback_payload(normalized_payload, str(error))
+        if fallback_payload is None:
+            raise error
+        # 回退接口按非流式整段返回，避免旧版 api.py 对 streaming_mode 支持不一致。
+        fallback_payload["streaming_mode"] = False
+        try:
+            audio_bytes, _media_type = await _apost_json_for_audio(
+                url=f"{base_url}/tts_to_audio/",
+                payload=fallback_payload,
+                timeout_seconds=settings.gpt_sovits_timeout_seconds,
+            )
+        except GPTSoVITSClientError as fallback_exc:
+            raise GPTSoVITSClientError(f"{error}; 回退 /tts_to_audio/ 也失败: {fallback_exc}") from fallback_exc
+        yield audio_bytes
+
+
+def stream_media_type(payload: dict[str, Any]) -> str:
+    """流式响应需在收到上游响应头之前确定媒体类型，按请求的 media_type 推断。"""
+    media_type = str(payload.get("media_type", "wav")).strip().lower() or "wav"
+    return _MEDIA_TYPES.get(media_type, "audio/wav")
+
+
+def patch_wav_length(audio: bytes, data_size: int | None) -> bytes:
+    """改写标准 44 字节 WAV 头中的长度字段；data_size 为 None 表示长度未知。非标准头原样返回。"""
+    if len(audio) < _WAV_HEADER_BYTES or audio[:4] != b"RIFF" or audio[8:12] != b"WAVE" or audio[36:40] != b"data":
+        return audio
+    size = 0xFFFFFFFF - 36 if data_size is None else int(data_size)
+    return (
+        audio[:4]
+        + struct.pack("<I", min(size + 36, 0xFFFFFFFF))
+        + audio[8:40]
+        + struct.pack("<I", size)
+        + audio[_WAV_HEADER_BYTES:]
+    )
+
+
+def finalize_streamed_wav(raw: bytes) -> bytes:
+    """streaming_mode 下整段拼接的 WAV，头部 data 长度为 0 或未知，按实际长度修正。"""
+    if len(raw) < _WAV_HEADER_BYTES or raw[36:40] != b"data":
+        return raw
+    declared = struct.unpack_from("<I", raw, 40)[0]
+    actual = len(raw) - _WAV_HEADER_BYTES
+    if declared == 0 or declared > actual:
+        return patch_wav_length(raw, actual)
+    return raw
+
+
+def _is_wav_payload(payload: dict[str, Any]) -> bool:
+    return stream_media_type(payload) == "audio/wav"
+
+
+def _build_fallback_payload(payload: dict[str, Any], message: str) -> dict[str, Any] | None:
+    if not _should_retry_with_auto_reference(payload, message):
+        return None
+    fallback_payload = {
+        "text": str(payload.get("text", "")).strip(),
+        "media_type": str(payload.get("media_type", "wav")).strip() or "wav",
+        "streaming_mode": bool(payload.get("streaming_mode", False)),
+    }
+    if not fallback_payload["text"]:
+        return None
+    return fallback_payload
+
+
 def _post_json_for_audio(
     *,
     url: str,
     payload: dict[str, Any],
     timeout_seconds: float,
 ) -> tuple[bytes, str]:
-    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    req = request.Request(
-        url=url,
-        data=body,
-        method="POST",
-        headers={"Content-Type": "application/json"},
-    )
     try:
-        with request.urlopen(req, timeout=timeout_seconds) as resp:
-            raw = resp.read()
-            media_type = resp.headers.get("Content-Type", "audio/wav")
-            if media_type.startswith("application/json"):
-                message = raw.decode("utf-8", errors="ignore")
-                raise GPTSoVITSClientError(f"GPT-SoVITS 返回错误: {message}")
-            return raw, media_type
-    except error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise GPTSoVITSClientError(f"HTTP {exc.code}: {detail}") from exc
-    except error.URLError as exc:
-        raise GPTSoVITSClientError(f"无法连接 GPT-SoVITS: {exc.reason}") from exc
+        resp = get_http_client(url).post(url, json=payload, timeout=timeout_seconds)
+    except httpx.HTTPError as exc:
+        raise GPTSoVITSClientError(f"无法连接 GPT-SoVITS: {exc}") from exc
+    return _read_audio_response(resp)
+
+
+async def _apost_json_for_audio(
+    *,
+    url: str,
+    payload: dict[str, Any],
+    timeout_seconds: float,
+) -> tuple[bytes, str]:
+    try:
+        resp = await get_async_http_client(url).post(url, json=payload, timeout=timeout_seconds)
+    except httpx.HTTPError as exc:
+        raise GPTSoVITSClientError(f"无法连接 GPT-SoVITS: {exc}") from exc
+    return _read_audio_response(resp)
+
+
+def _read_audio_response(resp: httpx.Response) -> tuple[bytes, str]:
+    raw = resp.content
+    if resp.status_code >= 400:
+        detail = raw.decode("utf-8", errors="ignore")
+        raise GPTSoVITSClientError(f"HTTP {resp.status_code}: {detail}")
+    media_type = resp.headers.get("Content-Type", "audio/wav")
+    if media_type.startswith("application/json"):
+        message = raw.decode("utf-8", errors="ignore")
+        raise GPTSoVITSClientError(f"GPT-SoVITS 返回错误: {message}")
+    if media_type.startswith(("audio/wav", "audio/x-wav")):
+        raw = finalize_streamed_wav(raw)
+    return raw, media_type
 
 
 def _should_retry_with_auto_reference(payload: dict[str, Any], message: str) -> bool:
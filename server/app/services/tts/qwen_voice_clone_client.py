@@ -2,23 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import json
 import re
+import struct
 import threading
 import time
 import wave
+from collections.abc import AsyncIterator, Callable
+from functools import lru_cache
 from typing import Any
 
 import httpx
 
 from app.core.settings import get_settings
+from app.services.http_clients import get_async_http_client, get_http_client
+from app.services.tts.realtime_session_pool import PooledSession, RealtimeSessionPool
+from app.services.upstream_limits import UPSTREAM_TTS, run_blocking, upstream_slot
 
 QWEN_VOICE_ENROLLMENT_MODEL = "qwen-voice-enrollment"
 DEFAULT_QWEN_CUSTOMIZATION_URL = "https://dashscope.aliyuncs.com/api/v1/services/audio/tts/customization"
 DEFAULT_QWEN_REALTIME_WS_URL = "wss://dashscope.aliyuncs.com/api-ws/v1/realtime"
 VOICE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+REALTIME_SAMPLE_RATE = 24000
 
 
 class QwenVoiceClientError(RuntimeError):
@@ -26,8 +34,19 @@ class QwenVoiceClientError(RuntimeError):
 
 
 class _RealtimeAudioCollector:
-    def __init__(self) -> None:
+    """接收一句话的 realtime 回调（在 SDK 线程中触发），收到 response.done 即结束。
+
+    未指定 on_audio 时累积到 pcm_audio；指定时逐块转交，由调用方负责跨线程投递。
+    """
+
+    def __init__(
+        self,
+        on_audio: Callable[[bytes], None] | None = None,
+        on_done: Callable[[], None] | None = None,
+    ) -> None:
         self._done = threading.Event()
+        self._on_audio = on_audio
+        self._on_done = on_done
         self.pcm_audio = bytearray()
         self.error_text = ""
 
@@ -36,6 +55,10 @@ class _RealtimeAudioCollector:
 
     def on_close(self, close_status_code: int, close_msg: str) -> None:
         _ = close_status_code, close_msg
+        # 连接意外断开时不会再收到 session.finished，避免等待方一直挂起。
+        if not self._done.is_set():
+            self.error_text = self.error_text or f"realtime 连接已关闭(code={close_status_code})"
+            self._finish()
 
     def on_event(self, response: dict[str, Any]) -> None:
         event_type = str(response.get("type", "")).strip()
@@ -43,23 +66,138 @@ class _RealtimeAudioCollector:
             chunk = str(response.get("delta", ""))
             if chunk:
                 try:
-                    self.pcm_audio.extend(base64.b64decode(chunk))
+                    pcm_chunk = base64.b64decode(chunk)
                 except Exception as exc:  # noqa: BLE001
                     self.error_text = f"realtime 音频解码失败: {exc}"
-                    self._done.set()
+                    self._finish()
+                    return
+                if self._on_audio is not None:
+                    self._on_audio(pcm_chunk)
+                else:
+                    self.pcm_audio.extend(pcm_chunk)
             return
         if event_type == "error":
             self.error_text = json.dumps(response, ensure_ascii=False)
-            self._done.set()
+            self._finish()
             return
-        if event_type == "session.finished":
-            self._done.set()
+        if event_type in {"response.done", "session.finished"}:
+            self._finish()
 
     def wait_done(self, timeout_seconds: float) -> bool:
         return self._done.wait(timeout_seconds)
 
+    def _finish(self) -> None:
+        if self._done.is_set():
+            return
+        self._done.set()
+        if self._on_done is not None:
+            self._on_done()
+
 
 def synthesize(text: str, *, model: str, voice_id: str) -> tuple[bytes, str]:
+    api_key, clean_text, chosen_model, chosen_voice = _validate_synthesis_args(text, model, voice_id)
+    if "realtime" not in chosen_model.lower():
+        return _synthesize_non_realtime(
+            text=clean_text,
+            model=chosen_model,
+            voice_id=chosen_voice,
+            api_key=api_key,
+        )
+    return _synthesize_realtime(text=clean_text, model=chosen_model, voice_id=chosen_voice)
+
+
+async def asynthesize(text: str, *, model: str, voice_id: str) -> tuple[bytes, str]:
+    """synthesize 的异步版本：SDK 调用在 TTS 专属线程池执行，音频下载走 AsyncClient。"""
+    api_key, clean_text, chosen_model, chosen_voice = _validate_synthesis_args(text, model, voice_id)
+    if "realtime" in chosen_model.lower():
+        return await run_blocking(
+            UPSTREAM_TTS,
+            _synthesize_realtime,
+            text=clean_text,
+            model=chosen_model,
+            voice_id=chosen_voice,
+        )
+
+    audio_url = await run_blocking(
+        UPSTREAM_TTS,
+        _request_non_realtime_audio_url,
+        text=clean_text,
+        model=chosen_model,
+        voice_id=chosen_voice,
+        api_key=api_key,
+    )
+    try:
+        audio_resp = await get_async_http_client(audio_url).get(audio_url, timeout=60.0)
+        audio_resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise QwenVoiceClientError(f"下载合成音频失败: {exc}") from exc
+    return audio_resp.content, _resolve_download_media_type(audio_resp)
+
+
+async def astream_synthesize(text: str, *, model: str, voice_id: str) -> AsyncIterator[bytes]:
+    """逐块产出 realtime 合成的 PCM（24kHz/16bit/单声道），收到首个 delta 即可开始播放。
+
+    仅支持 realtime 模型；生成器存续期间占用一个 TTS 上游并发额度，提前中止时请调用 aclose()。
+    """
+    _, clean_text, chosen_model, chosen_voice = _validate_synthesis_args(text, model, voice_id)
+    if "realtime" not in chosen_model.lower():
+        raise QwenVoiceClientError(f"流式合成需要 realtime 模型: {chosen_model}")
+
+    loop = asyncio.get_running_loop()
+    pool = get_realtime_session_pool()
+    idle_timeout = _realtime_timeout_seconds()
+    async with upstream_slot(UPSTREAM_TTS):
+        for attempt in range(2):
+            queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+            push = _make_threadsafe_push(loop, queue)
+            collector = _RealtimeAudioCollector(on_audio=push, on_done=lambda push=push: push(None))
+            lease = await asyncio.to_thread(
+                _begin_realtime_utterance,
+                text=clean_text,
+                model=chosen_model,
+                voice_id=chosen_voice,
+                collector=collector,
+            )
+            reusable = False
+            try:
+                received = False
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(queue.get(), timeout=idle_timeout)
+                    except asyncio.TimeoutError as exc:
+                        raise QwenVoiceClientError("等待 realtime 音频超时") from exc
+                    if chunk is None:
+                        break
+                    received = True
+                    yield chunk
+                if collector.error_text:
+                    if lease.reused and not received and attempt == 0:
+                        continue
+                    raise QwenVoiceClientError(f"realtime 合成失败: {collector.error_text}")
+                if not received:
+                    raise QwenVoiceClientError("realtime 未返回音频数据")
+                reusable = True
+                return
+            finally:
+                lease.session.detach()
+                await asyncio.to_thread(pool.release, lease, reusable=reusable)
+
+
+def pcm16_mono_24k_wav_header(data_size: int | None = None) -> bytes:
+    """realtime PCM 对应的 WAV 头；data_size 为 None 时长度字段取最大值，用于长度未知的流式输出。"""
+    size = 0xFFFFFFFF - 36 if data_size is None else int(data_size)
+    byte_rate = REALTIME_SAMPLE_RATE * 2
+    return (
+        b"RIFF"
+        + struct.pack("<I", min(size + 36, 0xFFFFFFFF))
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, REALTIME_SAMPLE_RATE, byte_rate, 2, 16)
+        + b"data"
+        + struct.pack("<I", size)
+    )
+
+
+def _validate_synthesis_args(text: str, model: str, voice_id: str) -> tuple[str, str, str, str]:
     settings = get_settings()
     api_key = settings.dashscope_api_key.strip()
     if not api_key:
@@ -73,71 +211,178 @@ def synthesize(text: str, *, model: str, voice_id: str) -> tuple[bytes, str]:
     chosen_model = str(model or "").strip()
     if not chosen_model:
         raise QwenVoiceClientError("model 不能为空")
+    return api_key, clean_text, chosen_model, voice_id.strip()
 
-    if "realtime" not in chosen_model.lower():
-        return _synthesize_non_realtime(
-            text=clean_text,
-            model=chosen_model,
-            voice_id=voice_id.strip(),
-            api_key=api_key,
-        )
 
-    try:
-        import dashscope  # type: ignore
-        from dashscope.audio.qwen_tts_realtime import (  # type: ignore
-            AudioFormat,
-            QwenTtsRealtime,
-            QwenTtsRealtimeCallback,
+def _synthesize_realtime(*, text: str, model: str, voice_id: str) -> tuple[bytes, str]:
+    pool = get_realtime_session_pool()
+    for attempt in range(2):
+        collector = _RealtimeAudioCollector()
+        lease = _begin_realtime_utterance(text=text, model=model, voice_id=voice_id, collector=collector)
+        reusable = False
+        try:
+            if not collector.wait_done(timeout_seconds=_realtime_timeout_seconds()):
+                raise QwenVoiceClientError("等待 realtime 合成超时（未收到 response.done）")
+            if collector.error_text:
+                # 复用的连接可能已在服务端过期，尚未产出音频时换新连接重试一次。
+                if lease.reused and not collector.pcm_audio and attempt == 0:
+                    continue
+                raise QwenVoiceClientError(f"realtime 合成失败: {collector.error_text}")
+            if not collector.pcm_audio:
+                raise QwenVoiceClientError("realtime 未返回音频数据")
+            reusable = True
+            wav_bytes = _pcm16_mono_24k_to_wav_bytes(bytes(collector.pcm_audio))
+            return wav_bytes, "audio/wav"
+        finally:
+            lease.session.detach()
+            pool.release(lease, reusable=reusable)
+    raise QwenVoiceClientError("realtime 合成失败：重试后仍不可用")
+
+
+class _RealtimeSession:
+    """一条已完成 update_session（commit 模式）的 realtime 连接，可逐句 append_text + commit 连续合成。"""
+
+    def __init__(self, *, model: str, voice_id: str) -> None:
+        settings = get_settings()
+        try:
+            import dashscope  # type: ignore
+            from dashscope.audio.qwen_tts_realtime import (  # type: ignore
+                AudioFormat,
+                QwenTtsRealtime,
+                QwenTtsRealtimeCallback,
+            )
+        except ImportError as exc:  # pragma: no cover - 依赖环境
+            raise QwenVoiceClientError("dashscope SDK 缺少 qwen_tts_realtime 依赖") from exc
+
+        dashscope.api_key = settings.dashscope_api_key.strip()
+        self.closed = False
+        self._collector: _RealtimeAudioCollector | None = None
+        session = self
+
+        class _Callback(QwenTtsRealtimeCallback):
+            def on_open(self) -> None:
+                return
+
+            def on_close(self, close_status_code: int, close_msg: str) -> None:
+                session._on_close(close_status_code, close_msg)
+
+            def on_event(self, response: dict[str, Any]) -> None:
+                session._on_event(response)
+
+        self._client = QwenTtsRealtime(
+            model=model,
+            callback=_Callback(),
+            url=settings.qwen_tts_realtime_ws_url.strip() or DEFAULT_QWEN_REALTIME_WS_URL,
         )
-    except ImportError as exc:  # pragma: no cover - 依赖环境
-        raise QwenVoiceClientError("dashscope SDK 缺少 qwen_tts_realtime 依赖") from exc
-
-    dashscope.api_key = api_key
-    collector = _RealtimeAudioCollector()
+        try:
+            self._client.connect()
+            self._client.update_session(
+                voice=voice_id,
+                response_format=AudioFormat.PCM_24000HZ_MONO_16BIT,
+                mode="commit",
+            )
+        except Exception as exc:  # noqa: BLE001
+            self.close()
+            raise QwenVoiceClientError(f"千问 realtime 建连失败: {exc}") from exc
+
+    def start(self, text: str, collector: _RealtimeAudioCollector) -> None:
+        if self.closed:
+            raise QwenVoiceClientError("realtime 连接已关闭")
+        self._collector = collector
+        try:
+            self._client.append_text(text)
+            self._client.commit()
+        except Exception as exc:  # noqa: BLE001
+            self._collector = None
+            raise QwenVoiceClientError(f"千问 realtime 提交文本失败: {exc}") from exc
+
+    def detach(self) -> None:
+        self._collector = None
+
+    def close(self) -> None:
+        self.closed = True
+        close = getattr(self._client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:  # noqa: BLE001
+                pass
 
-    class _Callback(QwenTtsRealtimeCallback):
-        def on_open(self) -> None:
-            collector.on_open()
+    def _on_event(self, response: dict[str, Any]) -> None:
+        if str(response.get("type", "")).strip() == "session.finished":
+            self.closed = True
+        collector = self._collector
+        if collector is not None:
+            collector.on_event(response)
 
-        def on_close(self, close_status_code: int, close_msg: str) -> None:
+    def _on_close(self, close_status_code: int, close_msg: str) -> None:
+        self.closed = True
+        collector = self._collector
+        if collector is not None:
             collector.on_close(close_status_code, close_msg)
 
-        def on_event(self, response: dict[str, Any]) -> None:
-            collector.on_event(response)
 
-    client = QwenTtsRealtime(
-        model=chosen_model,
-        callback=_Callback(),
-        url=settings.qwen_tts_realtime_ws_url.strip() or DEFAULT_QWEN_REALTIME_WS_URL,
+@lru_cache(maxsize=1)
+def get_realtime_session_pool() -> RealtimeSessionPool[_RealtimeSession]:
+    settings = get_settings()
+    return RealtimeSessionPool(
+        factory=lambda key: _RealtimeSession(model=key[0], voice_id=key[1]),
+        close=_RealtimeSession.close,
+        max_idle=settings.qwen_tts_realtime_pool_max_idle if settings.qwen_tts_realtime_pool_enabled else 0,
+        idle_seconds=settings.qwen_tts_realtime_pool_idle_seconds,
+        max_age_seconds=settings.qwen_tts_realtime_pool_max_age_seconds,
+        is_healthy=lambda session: not session.closed,
     )
-    try:
-        client.connect()
-        client.update_session(
-            voice=voice_id.strip(),
-            response_format=AudioFormat.PCM_24000HZ_MONO_16BIT,
-            mode="server_commit",
-        )
-        client.append_text(clean_text)
-        client.finish()
-        if not collector.wait_done(timeout_seconds=max(settings.provider_probe_timeout_seconds * 20, 30.0)):
-            raise QwenVoiceClientError("等待 realtime 合成超时（未收到 session.finished）")
-        if collector.error_text:
-            raise QwenVoiceClientError(f"realtime 合成失败: {collector.error_text}")
-        if not collector.pcm_audio:
-            raise QwenVoiceClientError("realtime 未返回音频数据")
-        wav_bytes = _pcm16_mono_24k_to_wav_bytes(bytes(collector.pcm_audio))
-        return wav_bytes, "audio/wav"
-    except Exception as exc:  # noqa: BLE001
-        if isinstance(exc, QwenVoiceClientError):
-            raise
-        raise QwenVoiceClientError(f"千问 realtime 合成失败: {exc}") from exc
-    finally:
-        close = getattr(client, "close", None)
-        if callable(close):
-            try:
-                close()
-            except Exception:  # noqa: BLE001
-                pass
+
+
+def prewarm_realtime_session(*, model: str, voice_id: str) -> bool:
+    """启动时为 (model, voice_id) 预建一条 realtime 会话放入池中；非 realtime 模型或已有空闲会话时返回 False。"""
+    if not get_settings().dashscope_api_key.strip():
+        raise QwenVoiceClientError("未配置 DASHSCOPE_API_KEY")
+    chosen_model = str(model or "").strip()
+    chosen_voice = str(voice_id or "").strip()
+    if not chosen_voice or "realtime" not in chosen_model.lower():
+        return False
+    return get_realtime_session_pool().prewarm((chosen_model, chosen_voice))
+
+
+def _begin_realtime_utterance(
+    *,
+    text: str,
+    model: str,
+    voice_id: str,
+    collector: _RealtimeAudioCollector,
+) -> PooledSession[_RealtimeSession]:
+    """借一条会话并提交文本；音频随后经 collector 回调到达。调用方负责 detach 与归还。"""
+    pool = get_realtime_session_pool()
+    while True:
+        lease = pool.acquire((model, voice_id))
+        try:
+            lease.session.start(text, collector)
+            return lease
+        except QwenVoiceClientError:
+            pool.release(lease, reusable=False)
+            if not lease.reused:
+                raise
+            # 池中连接可能已被服务端关闭但尚未回调 on_close，丢弃后继续取下一条或新建。
+
+
+def _make_threadsafe_push(
+    loop: asyncio.AbstractEventLoop,
+    queue: asyncio.Queue[bytes | None],
+) -> Callable[[bytes | None], None]:
+    def push(item: bytes | None) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # 事件循环已关闭（进程退出中），丢弃剩余音频。
+            pass
+
+    return push
+
+
+def _realtime_timeout_seconds() -> float:
+    return max(get_settings().provider_probe_timeout_seconds * 20, 30.0)
 
 
 def create_voice(
@@ -267,8 +512,7 @@ def _post_customization(payload_input: dict[str, Any]) -> dict[str, Any]:
         "Content-Type": "application/json",
     }
     try:
-        with httpx.Client(timeout=60.0) as client:
-            response = client.post(endpoint, json=payload, headers=headers)
+        response = get_http_client(endpoint).post(endpoint, json=payload, headers=headers, timeout=60.0)
     except httpx.HTTPError as exc:
         raise QwenVoiceClientError(f"千问声音复刻请求失败: {exc}") from exc
 
@@ -302,12 +546,22 @@ def _pcm16_mono_24k_to_wav_bytes(pcm_audio: bytes) -> bytes:
     with wave.open(buffer, "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
-        wf.setframerate(24000)
+        wf.setframerate(REALTIME_SAMPLE_RATE)
         wf.writeframes(pcm_audio)
     return buffer.getvalue()
 
 
 def _synthesize_non_realtime(*, text: str, model: str, voice_id: str, api_key: str) -> tuple[bytes, str]:
+    audio_url = _request_non_realtime_audio_url(text=text, model=model, voice_id=voice_id, api_key=api_key)
+    try:
+        audio_resp = get_http_client(audio_url).get(audio_url, timeout=60.0)
+        audio_resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise QwenVoiceClientError(f"下载合成音频失败: {exc}") from exc
+    return audio_resp.content, _resolve_download_media_type(audio_resp)
+
+
+def _request_non_realtime_audio_url(*, text: str, model: str, voice_id: str, api_key: str) -> str:
     settings = get_settings()
     try:
         import dashscope  # type: ignore
@@ -334,16 +588,11 @@ def _synthesize_non_realtime(*, text: str, model: str, voice_id: str, api_key: s
     audio_url = _extract_audio_url(response)
     if not audio_url:
         raise QwenVoiceClientError(f"千问非实时合成未返回音频 URL: {response}")
+    return audio_url
 
-    try:
-        with httpx.Client(timeout=60.0) as client:
-            audio_resp = client.get(audio_url)
-            audio_resp.raise_for_status()
-    except httpx.HTTPError as exc:
-        raise QwenVoiceClientError(f"下载合成音频失败: {exc}") from exc
 
-    media_type = audio_resp.headers.get("content-type", "audio/wav").split(";")[0].strip() or "audio/wav"
-    return audio_resp.content, media_type
+def _resolve_download_media_type(audio_resp: httpx.Response) -> str:
+    return audio_resp.headers.get("content-type", "audio/wav").split(";")[0].strip() or "audio/wav"
 
 
 def _extract_audio_url(response: Any) -> str:
@@ -0,0 +1,161 @@
+"""realtime 合成长连接池：按 (model, voice_id) 复用已完成 update_session 的会话，省去每句的握手与会话配置。"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+S = TypeVar("S")
+
+
+@dataclass
+class PooledSession(Generic[S]):
+    session: S
+    key: Hashable
+    created_at: float
+    idle_since: float
+    uses: int = 0
+    # 本次借出的会话是否来自池中（而非新建），复用连接失败时调用方可换新连接重试。
+    reused: bool = False
+
+
+class RealtimeSessionPool(Generic[S]):
+    """线程安全的会话池；只缓存空闲会话，借出中的会话数量由上游并发额度约束。
+
+    - max_idle：全局最多保留的空闲会话数，超出时关闭最久未用的会话；为 0 时等同关闭连接复用。
+    - idle_seconds：空闲超过该时长的会话在下次借还时关闭，避免拿到被服务端回收的连接。
+    - max_age_seconds：会话总存活上限，到期后不再归还入池。
+    - is_healthy：借出前的健康检查（如连接是否已被关闭），不健康的会话直接丢弃。
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Hashable], S],
+        close: Callable[[S], None],
+        *,
+        max_idle: int,
+        idle_seconds: float,
+        max_age_seconds: float,
+        is_healthy: Callable[[S], bool] = lambda _session: True,
+    ) -> None:
+        self._factory = factory
+        self._close = close
+        self._is_healthy = is_healthy
+        self._max_idle = max(int(max_idle), 0)
+        self._idle_seconds = max(float(idle_seconds), 0.0)
+        self._max_age_seconds = max(float(max_age_seconds), 0.0)
+        self._idle: list[PooledSession[S]] = []
+        self._lock = Lock()
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+
+    def acquire(self, key: Hashable) -> PooledSession[S]:
+        """取一个该 key 的空闲健康会话；没有时新建（新建在锁外进行，可能抛出 factory 的异常）。"""
+        stale: list[PooledSession[S]] = []
+        picked: PooledSession[S] | None = None
+        with self._lock:
+            stale.extend(self._pop_expired_locked())
+            # 从最近归还的开始找，最热的连接最可能仍然可用。
+            for index in range(len(self._idle) - 1, -1, -1):
+                entry = self._idle[index]
+                if entry.key != key:
+                    continue
+                del self._idle[index]
+                if self._safe_healthy(entry.session):
+                    picked = entry
+                    break
+                stale.append(entry)
+            if picked is not None:
+                self._reused += 1
+            self._discarded += len(stale)
+        self._close_all(stale)
+
+        if picked is not None:
+            picked.reused = True
+            picked.uses += 1
+            return picked
+        session = self._factory(key)
+        with self._lock:
+            self._created += 1
+        now = time.monotonic()
+        return PooledSession(session=session, key=key, created_at=now, idle_since=now, uses=1)
+
+    def release(self, entry: PooledSession[S], *, reusable: bool) -> None:
+        """归还会话；不可复用、已过期或池已满时关闭。"""
+        now = time.monotonic()
+        to_close: list[PooledSession[S]] = []
+        with self._lock:
+            expired_by_age = self._max_age_seconds > 0 and now - entry.created_at >= self._max_age_seconds
+            if not reusable or expired_by_age or self._max_idle == 0 or not self._safe_healthy(entry.session):
+                to_close.append(entry)
+            else:
+                entry.idle_since = now
+                entry.reused = False
+                self._idle.append(entry)
+                while len(self._idle) > self._max_idle:
+                    to_close.append(self._idle.pop(0))
+            to_close.extend(self._pop_expired_locked())
+            self._discarded += len(to_close)
+        self._close_all(to_close)
+
+    def prewarm(self, key: Hashable) -> bool:
+        """为 key 预建一条空闲会话；关闭复用或已有该 key 的空闲会话时跳过。新建失败时抛出 factory 的异常。"""
+        with self._lock:
+            if self._max_idle == 0 or any(entry.key == key for entry in self._idle):
+                return False
+        self.release(self.acquire(key), reusable=True)
+        return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = list(self._idle)
+            self._idle.clear()
+        self._close_all(entries)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            idle_by_key: dict[str, int] = {}
+            for entry in self._idle:
+                label = "/".join(str(part) for part in entry.key) if isinstance(entry.key, tuple) else str(entry.key)
+                idle_by_key[label] = idle_by_key.get(label, 0) + 1
+            return {
+                "idle": len(self._idle),
+                "idle_by_key": idle_by_key,
+                "max_idle": self._max_idle,
+                "idle_seconds": self._idle_seconds,
+                "max_age_seconds": self._max_age_seconds,
+                "created": self._created,
+                "reused": self._reused,
+                "discarded": self._discarded,
+            }
+
+    def _pop_expired_locked(self) -> list[PooledSession[S]]:
+        now = time.monotonic()
+        expired: list[PooledSession[S]] = []
+        kept: list[PooledSession[S]] = []
+        for entry in self._idle:
+            idle_expired = self._idle_seconds > 0 and now - entry.idle_since >= self._idle_seconds
+            age_expired = self._max_age_seconds > 0 and now - entry.created_at >= self._max_age_seconds
+            (expired if idle_expired or age_expired else kept).append(entry)
+        self._idle = kept
+        return expired
+
+    def _safe_healthy(self, session: S) -> bool:
+        try:
+            return bool(self._is_healthy(session))
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _close_all(self, entries: list[PooledSession[S]]) -> None:
+        for entry in entries:
+            try:
+                self._close(entry.session)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("关闭 realtime 会话失败: %s", exc)
@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import partial
 import logging
 from typing import Any
 
 import httpx
 
 from app.core.settings import get_settings
+from app.services.hedging import run_hedged
+from app.services.http_clients import get_async_http_client, get_http_client
 from app.services.provider_availability import (
     mark_probe_result,
     mark_provider_failure,
@@ -18,12 +23,30 @@ from app.services.provider_availability import (
     should_skip_provider,
 )
 from app.services.tts import cosyvoice_registry
-from app.services.tts.gpt_sovits_client import GPTSoVITSClientError, synthesize as synthesize_gpt_sovits
+from app.services.tts.audio_cache import CachedAudio, build_tts_cache_key, get_tts_audio_cache
+from app.services.tts.audio_encoders import (
+    DEFAULT_OUTPUT_FORMAT,
+    AudioEncodeError,
+    encode_audio,
+    normalize_output_format,
+)
+from app.services.tts.gpt_sovits_client import (
+    GPTSoVITSClientError,
+    astream_synthesize as astream_gpt_sovits,
+    asynthesize as asynthesize_gpt_sovits,
+    finalize_streamed_wav,
+    stream_media_type as gpt_sovits_stream_media_type,
+    synthesize as synthesize_gpt_sovits,
+)
 from app.services.tts.qwen_voice_clone_client import (
     QwenVoiceClientError,
+    astream_synthesize as astream_qwen_clone_tts,
+    asynthesize as asynthesize_qwen_clone_tts,
     create_voice,
     delete_voice,
     list_voices,
+    pcm16_mono_24k_wav_header,
+    prewarm_realtime_session,
     probe_qwen_ready,
     query_voice,
     synthesize as synthesize_qwen_clone_tts,
@@ -35,6 +58,7 @@ logger = logging.getLogger(__name__)
 PRIMARY_QWEN_PROVIDER = "qwen_clone_tts"
 LEGACY_COSYVOICE_PROVIDER = "cosyvoice_tts"
 SUPPORTED_TTS_PROVIDERS = {"gpt_sovits", PRIMARY_QWEN_PROVIDER, LEGACY_COSYVOICE_PROVIDER}
+AUDIO_CHUNK_BYTES = 64 * 1024
 
 
 class TTSServiceError(RuntimeError):
@@ -51,6 +75,18 @@ class TTSSynthesizeResult:
     media_type: str
     provider: str
     voice_id: str = ""
+    cache_hit: bool = False
+
+
+@dataclass
+class TTSAudioStream:
+    """流式合成结果：chunks 需被完整消费，提前中止时调用 chunks.aclose() 释放上游连接。"""
+
+    chunks: AsyncIterator[bytes | memoryview]
+    media_type: str
+    provider: str
+    voice_id: str = ""
+    cache_hit: bool = False
 
 
 @dataclass
@@ -70,14 +106,19 @@ def synthesize_with_fallback(
     text: str,
     gpt_sovits_payload: dict[str, Any] | None = None,
 ) -> TTSSynthesizeResult:
+    """同步逐个降级合成，仅供离线台词库重建（phrase_bank.warm_phrase_bank）使用；在线接口走 asynthesize_with_fallback。"""
     settings = get_settings()
     force_provider = ""
     if gpt_sovits_payload:
         force_provider = str(gpt_sovits_payload.get("__force_provider", "")).strip().lower()
-    providers = _resolve_tts_provider_priority(force_provider=force_provider)
+    providers = resolve_tts_provider_priority(force_provider=force_provider)
     errors: list[str] = []
 
     for provider in providers:
+        cached = _lookup_tts_cache(provider, text, gpt_sovits_payload)
+        if cached is not None:
+            return cached
+
         should_skip, wait_seconds = should_skip_provider(provider)
         if should_skip:
             errors.append(f"{provider}: 冷却中({wait_seconds:.1f}s)")
@@ -96,6 +137,9 @@ def synthesize_with_fallback(
                 gpt_sovits_payload=gpt_sovits_payload,
             )
             mark_provider_success(provider)
+            result, encoded = _encode_output_format(result, gpt_sovits_payload)
+            if encoded:
+                _store_tts_cache(text, gpt_sovits_payload, result)
             return result
         except TTSServiceError as exc:
             mark_provider_failure(provider, str(exc), settings.provider_failure_cooldown_seconds)
@@ -106,9 +150,161 @@ def synthesize_with_fallback(
     raise TTSUnavailableError(f"TTS 暂不可用，已降级纯文本。详情: {reason}")
 
 
+async def asynthesize_with_fallback(
+    *,
+    text: str,
+    gpt_sovits_payload: dict[str, Any] | None = None,
+) -> TTSSynthesizeResult:
+    """synthesize_with_fallback 的异步版本，不占用请求线程。
+
+    开启 TTS_HEDGE_ENABLED 时，主 provider 超出 TTS_HEDGE_DELAY_MS 仍未返回，会并行启动下一个 provider，
+    取先完成者并取消另一个；否则逐个降级。
+    """
+    settings = get_settings()
+    force_provider = ""
+    if gpt_sovits_payload:
+        force_provider = str(gpt_sovits_payload.get("__force_provider", "")).strip().lower()
+    providers = resolve_tts_provider_priority(force_provider=force_provider)
+
+    # 任一 provider 命中缓存即直接返回：缓存音频不依赖上游是否可用。
+    for provider in providers:
+        cached = await asyncio.to_thread(_lookup_tts_cache, provider, text, gpt_sovits_payload)
+        if cached is not None:
+            return cached
+
+    outcome = await run_hedged(
+        "tts",
+        [
+            (provider, partial(_atry_provider, provider, text, gpt_sovits_payload))
+            for provider in providers
+        ],
+        hedge_after_seconds=settings.tts_hedge_delay_ms / 1000 if settings.tts_hedge_enabled else None,
+        expected_errors=(TTSServiceError,),
+    )
+    if outcome.result is not None:
+        return outcome.result
+    errors = [f"{provider}: {exc}" for provider, exc in outcome.errors]
+    reason = "; ".join(errors) if errors else "未配置可用 TTS provider"
+    raise TTSUnavailableError(f"TTS 暂不可用，已降级纯文本。详情: {reason}")
+
+
+async def _atry_provider(
+    provider: str,
+    text: str,
+    gpt_sovits_payload: dict[str, Any] | None,
+) -> TTSSynthesizeResult:
+    """单个 provider 的一次完整尝试：冷却/探测检查、合成、转码与写缓存；不可用时抛 TTSServiceError。
+
+    被对冲取消时不记入 provider 失败。
+    """
+    settings = get_settings()
+    should_skip, wait_seconds = should_skip_provider(provider)
+    if should_skip:
+        raise TTSServiceError(f"冷却中({wait_seconds:.1f}s)")
+
+    ok, probe_reason = await _aprobe_provider_if_needed(provider)
+    if not ok:
+        mark_provider_failure(provider, probe_reason, settings.provider_failure_cooldown_seconds)
+        raise TTSServiceError(f"探测失败({probe_reason})")
+
+    try:
+        result = await _asynthesize_with_provider(
+            provider=provider,
+            text=text,
+            gpt_sovits_payload=gpt_sovits_payload,
+        )
+    except TTSServiceError as exc:
+        mark_provider_failure(provider, str(exc), settings.provider_failure_cooldown_seconds)
+        logger.warning("TTS provider %s 调用失败: %s", provider, exc)
+        raise
+    mark_provider_success(provider)
+    encoded = True
+    if _read_output_format(gpt_sovits_payload) != DEFAULT_OUTPUT_FORMAT:
+        result, encoded = await asyncio.to_thread(_encode_output_format, result, gpt_sovits_payload)
+    if encoded:
+        await asyncio.to_thread(_store_tts_cache, text, gpt_sovits_payload, result)
+    return result
+
+
+async def astream_with_fallback(
+    *,
+    text: str,
+    gpt_sovits_payload: dict[str, Any] | None = None,
+) -> TTSAudioStream:
+    """流式合成：千问 realtime 模型与 streaming_mode 的 GPT-SoVITS 边合成边输出，其余情况整段合成后分块输出。
+
+    返回前已拿到首块音频，降级只发生在首块之前；之后上游中断只能截断音频流。
+    忽略 output_format：千问输出 WAV，GPT-SoVITS 输出其 media_type。
+    """
+    settings = get_settings()
+    payload = dict(gpt_sovits_payload or {})
+    payload.pop("_output_format", None)
+    force_provider = str(payload.get("__force_provider", "")).strip().lower()
+    providers = resolve_tts_provider_priority(force_provider=force_provider)
+    errors: list[str] = []
+
+    for provider in providers:
+        cached = await asyncio.to_thread(_lookup_tts_cache, provider, text, payload)
+        if cached is not None:
+            return _buffered_audio_stream(cached)
+
+        should_skip, wait_seconds = should_skip_provider(provider)
+        if should_skip:
+            errors.append(f"{provider}: 冷却中({wait_seconds:.1f}s)")
+            continue
+
+        ok, probe_reason = await _aprobe_provider_if_needed(provider)
+        if not ok:
+            errors.append(f"{provider}: 探测失败({probe_reason})")
+            mark_provider_failure(provider, probe_reason, settings.provider_failure_cooldown_seconds)
+            continue
+
+        try:
+            stream = await _astream_with_provider(provider=provider, text=text, gpt_sovits_payload=payload)
+            mark_provider_success(provider)
+            return stream
+        except TTSServiceError as exc:
+            mark_provider_failure(provider, str(exc), settings.provider_failure_cooldown_seconds)
+            errors.append(f"{provider}: {exc}")
+            logger.warning("TTS provider %s 流式调用失败: %s", provider, exc)
+
+    reason = "; ".join(errors) if errors else "未配置可用 TTS provider"
+    raise TTSUnavailableError(f"TTS 暂不可用，已降级纯文本。详情: {reason}")
+
+
+async def iter_audio_chunks(audio_bytes: bytes, chunk_bytes: int = AUDIO_CHUNK_BYTES) -> AsyncIterator[memoryview]:
+    """把整段音频切成块写出；基于 memoryview 切片，不复制音频。"""
+    view = memoryview(audio_bytes)
+    for offset in range(0, len(view), chunk_bytes):
+        yield view[offset : offset + chunk_bytes]
+
+
+async def aprewarm_qwen_realtime_sessions() -> int:
+    """为已配置的千问音色预建 realtime 会话，首句合成免去建连；返回新建的会话数。
+
+    只读配置与本地登记表（不触发自动复刻）；千问不在 TTS_PROVIDER_PRIORITY 中、未配置音色或非 realtime 模型时跳过。
+    """
+    settings = get_settings()
+    if PRIMARY_QWEN_PROVIDER not in resolve_tts_provider_priority() or not settings.dashscope_api_key.strip():
+        return 0
+    voice_id = await asyncio.to_thread(_peek_qwen_voice_id)
+    if not voice_id:
+        return 0
+    try:
+        created = await asyncio.to_thread(
+            prewarm_realtime_session,
+            model=settings.cosyvoice_target_model,
+            voice_id=voice_id,
+        )
+    except QwenVoiceClientError as exc:
+        logger.warning("千问 realtime 会话预建失败: %s", exc)
+        return 0
+    return 1 if created else 0
+
+
 def probe_tts_providers() -> dict[str, dict[str, str | bool]]:
     statuses: dict[str, dict[str, str | bool]] = {}
-    for provider in _resolve_tts_provider_priority():
+    for provider in resolve_tts_provider_priority():
         ok, reason = _probe_provider(provider)
         statuses[provider] = {"ok": ok, "reason": reason}
     return statuses
@@ -235,7 +431,8 @@ def list_cosyvoice_voices(prefix: str | None = None, page_index: int = 0, page_s
     return list_qwen_voices(prefix=prefix, page_index=page_index, page_size=page_size)
 
 
-def _resolve_tts_provider_priority(force_provider: str = "") -> list[str]:
+def resolve_tts_provider_priority(force_provider: str = "") -> list[str]:
+    """按 TTS_PROVIDER_PRIORITY（或强制指定的 provider）解析出参与降级的 provider 列表。"""
     forced = force_provider.strip().lower()
     if forced in SUPPORTED_TTS_PROVIDERS:
         if forced == LEGACY_COSYVOICE_PROVIDER:
@@ -269,9 +466,32 @@ def _probe_provider(provider: str) -> tuple[bool, str]:
     if provider == "gpt_sovits":
         url = settings.gpt_sovits_base_url.rstrip("/")
         try:
-            with httpx.Client(timeout=settings.provider_probe_timeout_seconds) as client:
-                response = client.get(url)
-                _ = response.status_code
+            response = get_http_client(url).get(url, timeout=settings.provider_probe_timeout_seconds)
+            _ = response.status_code
+            return True, "ok"
+        except httpx.HTTPError as exc:
+            return False, f"GPT-SoVITS 不可达: {exc}"
+    if provider in {PRIMARY_QWEN_PROVIDER, LEGACY_COSYVOICE_PROVIDER}:
+        return probe_qwen_ready()
+    return False, f"未知 provider: {provider}"
+
+
+async def _aprobe_provider_if_needed(provider: str) -> tuple[bool, str]:
+    settings = get_settings()
+    if not should_probe(provider, settings.provider_probe_interval_seconds):
+        return True, "probe_cached"
+    ok, reason = await _aprobe_provider(provider)
+    mark_probe_result(provider, ok)
+    return ok, reason
+
+
+async def _aprobe_provider(provider: str) -> tuple[bool, str]:
+    settings = get_settings()
+    if provider == "gpt_sovits":
+        url = settings.gpt_sovits_base_url.rstrip("/")
+        try:
+            response = await get_async_http_client(url).get(url, timeout=settings.provider_probe_timeout_seconds)
+            _ = response.status_code
             return True, "ok"
         except httpx.HTTPError as exc:
             return False, f"GPT-SoVITS 不可达: {exc}"
@@ -287,13 +507,7 @@ def _synthesize_with_provider(
     gpt_sovits_payload: dict[str, Any] | None,
 ) -> TTSSynthesizeResult:
     if provider == "gpt_sovits":
-        payload = dict(gpt_sovits_payload or {"text": text, "media_type": "wav", "streaming_mode": False})
-        payload.pop("__force_provider", None)
-        payload.pop("_cosyvoice_voice_id_override", None)
-        payload.pop("_cosyvoice_target_model_override", None)
-        payload.pop("_qwen_voice_id_override", None)
-        payload.pop("_qwen_target_model_override", None)
-        payload["text"] = text
+        payload = _build_gpt_sovits_request_payload(text, gpt_sovits_payload)
         try:
             audio_bytes, media_type = synthesize_gpt_sovits(payload)
         except GPTSoVITSClientError as exc:
@@ -301,22 +515,8 @@ def _synthesize_with_provider(
         return TTSSynthesizeResult(audio_bytes=audio_bytes, media_type=media_type, provider=provider)
 
     if provider in {PRIMARY_QWEN_PROVIDER, LEGACY_COSYVOICE_PROVIDER}:
-        settings = get_settings()
-        payload = gpt_sovits_payload or {}
-        override_voice_id = str(
-            payload.get("_qwen_voice_id_override") or payload.get("_cosyvoice_voice_id_override") or ""
-        ).strip()
-        override_model = str(
-            payload.get("_qwen_target_model_override") or payload.get("_cosyvoice_target_model_override") or ""
-        ).strip()
         try:
-            voice_id = override_voice_id or _resolve_qwen_voice_id(allow_auto_enroll=True)
-            if not voice_id:
-                raise TTSServiceError(
-                    "未找到可用千问 voice_id。请先调用 /v1/tts/qwen/enroll（或兼容路由 /v1/tts/cosyvoice/enroll），"
-                    "或配置 QWEN_VOICE_ID/COSYVOICE_VOICE_ID。"
-                )
-            target_model = override_model or settings.cosyvoice_target_model
+            voice_id, target_model = _resolve_qwen_synthesis_target(gpt_sovits_payload)
             audio_bytes, media_type = synthesize_qwen_clone_tts(
                 text,
                 model=target_model,
@@ -334,6 +534,297 @@ def _synthesize_with_provider(
     raise TTSServiceError(f"不支持的 TTS provider: {provider}")
 
 
+async def _asynthesize_with_provider(
+    *,
+    provider: str,
+    text: str,
+    gpt_sovits_payload: dict[str, Any] | None,
+) -> TTSSynthesizeResult:
+    if provider == "gpt_sovits":
+        payload = _build_gpt_sovits_request_payload(text, gpt_sovits_payload)
+        try:
+            audio_bytes, media_type = await asynthesize_gpt_sovits(payload)
+        except GPTSoVITSClientError as exc:
+            raise TTSServiceError(str(exc)) from exc
+        return TTSSynthesizeResult(audio_bytes=audio_bytes, media_type=media_type, provider=provider)
+
+    if provider in {PRIMARY_QWEN_PROVIDER, LEGACY_COSYVOICE_PROVIDER}:
+        try:
+            # voice_id 解析可能读注册表或调用 list 接口，放到线程中避免阻塞事件循环。
+            voice_id, target_model = await asyncio.to_thread(
+                _resolve_qwen_synthesis_target,
+                gpt_sovits_payload,
+            )
+            audio_bytes, media_type = await asynthesize_qwen_clone_tts(
+                text,
+                model=target_model,
+                voice_id=voice_id,
+            )
+        except (QwenVoiceClientError, TTSServiceError) as exc:
+            raise TTSServiceError(str(exc)) from exc
+        return TTSSynthesizeResult(
+            audio_bytes=audio_bytes,
+            media_type=media_type,
+            provider=PRIMARY_QWEN_PROVIDER,
+            voice_id=voice_id,
+        )
+
+    raise TTSServiceError(f"不支持的 TTS provider: {provider}")
+
+
+async def _astream_with_provider(
+    *,
+    provider: str,
+    text: str,
+    gpt_sovits_payload: dict[str, Any],
+) -> TTSAudioStream:
+    cacheable = get_tts_audio_cache() is not None and len(text) <= get_settings().tts_cache_max_text_chars
+    if provider == "gpt_sovits" and gpt_sovits_payload.get("streaming_mode"):
+        request_payload = _build_gpt_sovits_request_payload(text, gpt_sovits_payload)
+        media_type = gpt_sovits_stream_media_type(request_payload)
+        try:
+            audio_chunks = astream_gpt_sovits(request_payload)
+            first_chunk = await anext(audio_chunks)
+        except StopAsyncIteration as exc:
+            raise TTSServiceError("GPT-SoVITS 未返回音频数据") from exc
+        except GPTSoVITSClientError as exc:
+            raise TTSServiceError(str(exc)) from exc
+        on_complete = (
+            partial(_store_streamed_audio, text, gpt_sovits_payload, provider, media_type, "") if cacheable else None
+        )
+        return TTSAudioStream(
+            chunks=_relay_audio_stream(provider, first_chunk, audio_chunks, on_complete=on_complete),
+            media_type=media_type,
+            provider=provider,
+        )
+
+    if provider in {PRIMARY_QWEN_PROVIDER, LEGACY_COSYVOICE_PROVIDER}:
+        try:
+            voice_id, target_model = await asyncio.to_thread(_resolve_qwen_synthesis_target, gpt_sovits_payload)
+            if "realtime" in target_model.lower():
+                pcm_chunks = astream_qwen_clone_tts(text, model=target_model, voice_id=voice_id)
+                # 先取首块：连接/鉴权失败在这里暴露，仍可降级到下一个 provider。
+                first_chunk = await anext(pcm_chunks)
+                on_complete = (
+                    partial(_store_streamed_audio, text, gpt_sovits_payload, PRIMARY_QWEN_PROVIDER, "", voice_id)
+                    if cacheable
+                    else None
+                )
+                return TTSAudioStream(
+                    chunks=_relay_audio_stream(
+                        PRIMARY_QWEN_PROVIDER,
+                        first_chunk,
+                        pcm_chunks,
+                        header=pcm16_mono_24k_wav_header(),
+                        on_complete=on_complete,
+                    ),
+                    media_type="audio/wav",
+                    provider=PRIMARY_QWEN_PROVIDER,
+                    voice_id=voice_id,
+                )
+        except StopAsyncIteration as exc:
+            raise TTSServiceError("realtime 未返回音频数据") from exc
+        except (QwenVoiceClientError, TTSServiceError) as exc:
+            raise TTSServiceError(str(exc)) from exc
+
+    result = await _asynthesize_with_provider(provider=provider, text=text, gpt_sovits_payload=gpt_sovits_payload)
+    await asyncio.to_thread(_store_tts_cache, text, gpt_sovits_payload, result)
+    return _buffered_audio_stream(result)
+
+
+async def _relay_audio_stream(
+    provider: str,
+    first_chunk: bytes,
+    audio_chunks: AsyncIterator[bytes],
+    *,
+    header: bytes = b"",
+    on_complete: Callable[[bytes], None] | None = None,
+) -> AsyncIterator[bytes]:
+    """转发上游音频块；完整结束时把累积的音频（不含 header）交给 on_complete 在线程中处理。"""
+    collected = bytearray(first_chunk) if on_complete is not None else None
+    completed = False
+    try:
+        if header:
+            yield header
+        yield first_chunk
+        async for chunk in audio_chunks:
+            if collected is not None:
+                collected.extend(chunk)
+            yield chunk
+        completed = True
+    except (GPTSoVITSClientError, QwenVoiceClientError) as exc:
+        # 响应头已发出，无法再降级；记录失败让后续请求走冷却逻辑。
+        mark_provider_failure(provider, str(exc), get_settings().provider_failure_cooldown_seconds)
+        logger.warning("TTS provider %s 流式输出中断，音频已截断: %s", provider, exc)
+    finally:
+        await audio_chunks.aclose()
+
+    if completed and on_complete is not None and collected is not None:
+        await asyncio.to_thread(on_complete, bytes(collected))
+
+
+def _store_streamed_audio(
+    text: str,
+    gpt_sovits_payload: dict[str, Any],
+    provider: str,
+    media_type: str,
+    voice_id: str,
+    audio: bytes,
+) -> None:
+    if provider == PRIMARY_QWEN_PROVIDER:
+        # realtime 产出裸 PCM，补上真实长度的 WAV 头再缓存。
+        audio, media_type = pcm16_mono_24k_wav_header(len(audio)) + audio, "audio/wav"
+    elif media_type == "audio/wav":
+        audio = finalize_streamed_wav(audio)
+    result = TTSSynthesizeResult(audio_bytes=audio, media_type=media_type, provider=provider, voice_id=voice_id)
+    _store_tts_cache(text, gpt_sovits_payload, result)
+
+
+def _buffered_audio_stream(result: TTSSynthesizeResult) -> TTSAudioStream:
+    return TTSAudioStream(
+        chunks=iter_audio_chunks(result.audio_bytes),
+        media_type=result.media_type,
+        provider=result.provider,
+        voice_id=result.voice_id,
+        cache_hit=result.cache_hit,
+    )
+
+
+def _build_gpt_sovits_request_payload(text: str, gpt_sovits_payload: dict[str, Any] | None) -> dict[str, Any]:
+    payload = dict(gpt_sovits_payload or {"text": text, "media_type": "wav", "streaming_mode": False})
+    payload.pop("__force_provider", None)
+    payload.pop("_cosyvoice_voice_id_override", None)
+    payload.pop("_cosyvoice_target_model_override", None)
+    payload.pop("_qwen_voice_id_override", None)
+    payload.pop("_qwen_target_model_override", None)
+    payload.pop("_output_format", None)
+    payload["text"] = text
+    return payload
+
+
+def _resolve_qwen_synthesis_target(gpt_sovits_payload: dict[str, Any] | None) -> tuple[str, str]:
+    settings = get_settings()
+    override_voice_id, override_model = _read_qwen_overrides(gpt_sovits_payload)
+    voice_id = override_voice_id or _resolve_qwen_voice_id(allow_auto_enroll=True)
+    if not voice_id:
+        raise TTSServiceError(
+            "未找到可用千问 voice_id。请先调用 /v1/tts/qwen/enroll（或兼容路由 /v1/tts/cosyvoice/enroll），"
+            "或配置 QWEN_VOICE_ID/COSYVOICE_VOICE_ID。"
+        )
+    return voice_id, override_model or settings.cosyvoice_target_model
+
+
+def _read_qwen_overrides(gpt_sovits_payload: dict[str, Any] | None) -> tuple[str, str]:
+    payload = gpt_sovits_payload or {}
+    override_voice_id = str(
+        payload.get("_qwen_voice_id_override") or payload.get("_cosyvoice_voice_id_override") or ""
+    ).strip()
+    override_model = str(
+        payload.get("_qwen_target_model_override") or payload.get("_cosyvoice_target_model_override") or ""
+    ).strip()
+    return override_voice_id, override_model
+
+
+def _tts_cache_key(
+    provider: str,
+    text: str,
+    gpt_sovits_payload: dict[str, Any] | None,
+    *,
+    voice_id: str = "",
+) -> str | None:
+    """计算缓存键；长句不缓存，千问音色无法在本地确定时（需调用上游查询）也不缓存。"""
+    if len(text) > get_settings().tts_cache_max_text_chars:
+        return None
+    output_format = _read_output_format(gpt_sovits_payload)
+    # 各输出格式分别缓存；wav 不写入键，保持与既有缓存条目兼容。
+    format_params = {} if output_format == DEFAULT_OUTPUT_FORMAT else {"output_format": output_format}
+    if provider == "gpt_sovits":
+        params = _build_gpt_sovits_request_payload(text, gpt_sovits_payload)
+        params.pop("text", None)
+        return build_tts_cache_key(text=text, provider=provider, params={**params, **format_params})
+    if provider in {PRIMARY_QWEN_PROVIDER, LEGACY_COSYVOICE_PROVIDER}:
+        override_voice_id, override_model = _read_qwen_overrides(gpt_sovits_payload)
+        chosen_voice_id = voice_id or override_voice_id or _peek_qwen_voice_id()
+        if not chosen_voice_id:
+            return None
+        return build_tts_cache_key(
+            text=text,
+            provider=PRIMARY_QWEN_PROVIDER,
+            voice_id=chosen_voice_id,
+            params={"target_model": override_model or get_settings().cosyvoice_target_model, **format_params},
+        )
+    return None
+
+
+def _read_output_format(gpt_sovits_payload: dict[str, Any] | None) -> str:
+    raw_value = (gpt_sovits_payload or {}).get("_output_format")
+    return normalize_output_format(raw_value) or DEFAULT_OUTPUT_FORMAT
+
+
+def _encode_output_format(
+    result: TTSSynthesizeResult,
+    gpt_sovits_payload: dict[str, Any] | None,
+) -> tuple[TTSSynthesizeResult, bool]:
+    """按请求的输出格式转码；失败时降级返回原始音频，第二项为 False 表示不应写入该格式的缓存。"""
+    output_format = _read_output_format(gpt_sovits_payload)
+    if output_format == DEFAULT_OUTPUT_FORMAT:
+        return result, True
+    try:
+        audio_bytes, media_type = encode_audio(result.audio_bytes, result.media_type, output_format)
+    except AudioEncodeError as exc:
+        logger.warning("TTS 输出转码 %s 失败，降级返回原始音频: %s", output_format, exc)
+        return result, False
+    return replace(result, audio_bytes=audio_bytes, media_type=media_type), True
+
+
+def _peek_qwen_voice_id() -> str:
+    # 只读配置与本地登记表，不触发 list_voices / 自动复刻。
+    settings = get_settings()
+    explicit = settings.cosyvoice_voice_id.strip()
+    if explicit:
+        return explicit
+    alias_entry = cosyvoice_registry.get_voice_entry(settings.cosyvoice_voice_alias)
+    return str((alias_entry or {}).get("voice_id", "")).strip()
+
+
+def _lookup_tts_cache(
+    provider: str,
+    text: str,
+    gpt_sovits_payload: dict[str, Any] | None,
+) -> TTSSynthesizeResult | None:
+    cache = get_tts_audio_cache()
+    if cache is None:
+        return None
+    key = _tts_cache_key(provider, text, gpt_sovits_payload)
+    entry = cache.get(key) if key else None
+    if entry is None:
+        return None
+    return TTSSynthesizeResult(
+        audio_bytes=entry.audio_bytes,
+        media_type=entry.media_type,
+        provider=entry.provider or provider,
+        voice_id=entry.voice_id,
+        cache_hit=True,
+    )
+
+
+def _store_tts_cache(text: str, gpt_sovits_payload: dict[str, Any] | None, result: TTSSynthesizeResult) -> None:
+    cache = get_tts_audio_cache()
+    if cache is None:
+        return
+    key = _tts_cache_key(result.provider, text, gpt_sovits_payload, voice_id=result.voice_id)
+    if key:
+        cache.put(
+            key,
+            CachedAudio(
+                audio_bytes=result.audio_bytes,
+                media_type=result.media_type,
+                provider=result.provider,
+                voice_id=result.voice_id,
+            ),
+        )
+
+
 def _resolve_qwen_voice_id(*, allow_auto_enroll: bool) -> str:
     settings = get_settings()
     explicit = settings.cosyvoice_voice_id.strip()
@@ -0,0 +1,80 @@
+"""上游并发额度：按 provider 限流，而不是按线程池大小限流。"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+from app.core.settings import get_settings
+
+T = TypeVar("T")
+
+UPSTREAM_LLM = "llm"
+UPSTREAM_TTS = "tts"
+UPSTREAM_ASR = "asr"
+
+# asyncio.Semaphore 会绑定首次争用时的事件循环，测试/多循环场景下按循环分别创建。
+_SEMAPHORES: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = WeakKeyDictionary()
+_EXECUTORS: dict[str, ThreadPoolExecutor] = {}
+_LOCK = Lock()
+
+
+def upstream_slot(upstream: str) -> asyncio.Semaphore:
+    """返回当前事件循环下该上游的并发信号量。"""
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        per_loop = _SEMAPHORES.setdefault(loop, {})
+        semaphore = per_loop.get(upstream)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(_resolve_limit(upstream))
+            per_loop[upstream] = semaphore
+        return semaphore
+
+
+async def run_blocking(upstream: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在上游专属线程池中执行同步 SDK 调用（如 dashscope），并受同一并发额度约束。"""
+    async with upstream_slot(upstream):
+        return await run_on_upstream_executor(upstream, func, *args, **kwargs)
+
+
+async def run_on_upstream_executor(upstream: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """只切到上游专属线程池执行，不再获取并发额度。
+
+    用于已持有额度的会话（或按连接计的长会话）里的逐帧 SDK 调用，避免占用默认线程池。
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(upstream), partial(func, *args, **kwargs))
+
+
+def shutdown_upstream_executors() -> None:
+    with _LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_executor(upstream: str) -> ThreadPoolExecutor:
+    with _LOCK:
+        executor = _EXECUTORS.get(upstream)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=_resolve_limit(upstream),
+                thread_name_prefix=f"upstream-{upstream}",
+            )
+            _EXECUTORS[upstream] = executor
+        return executor
+
+
+def _resolve_limit(upstream: str) -> int:
+    settings = get_settings()
+    limits = {
+        UPSTREAM_LLM: settings.llm_max_concurrency,
+        UPSTREAM_TTS: settings.tts_max_concurrency,
+        UPSTREAM_ASR: settings.asr_max_concurrency,
+    }
+    return max(int(limits.get(upstream, 8)), 1)
@@ -0,0 +1,45 @@
+"""system prompt 构建微基准：逐轮重新拼装 vs 预编译模板渲染。
+
+用法（server 目录下）：python -m tests.benchmark.bench_prompt_build [--persona phainon] [--rounds 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from app.services.dialogue import gptsapi_anthropic_client as client
+from app.services.dialogue.persona_loader import load_persona_prompt_context
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="system prompt 构建微基准")
+    parser.add_argument("--persona", default="phainon")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    relationship = {"trust": 3, "reliance": 1, "fatigue": 0}
+    rounds = max(args.rounds, 1)
+
+    def rebuild_every_turn() -> str:
+        persona = load_persona_prompt_context(args.persona)
+        segments = client._compile_persona_prompt(args.persona, persona).render(
+            relationship,
+            include_initial_injection=True,
+        )
+        return "".join(segment.text for segment in segments)
+
+    def render_compiled() -> str:
+        return client._build_system_prompt(args.persona, relationship, include_initial_injection=True)
+
+    assert rebuild_every_turn() == render_compiled()
+    prompt_chars = len(render_compiled())
+    print(f"persona={args.persona} prompt_chars={prompt_chars} rounds={rounds}")
+    for label, func in (("rebuild", rebuild_every_turn), ("compiled", render_compiled)):
+        seconds = min(timeit.repeat(func, number=rounds, repeat=5))
+        print(f"{label:>9}: {seconds / rounds * 1e6:8.2f} us/turn")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
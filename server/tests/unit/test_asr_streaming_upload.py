@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import wave
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import chat as chat_endpoint
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.asr import asr_service
+from app.services.asr.asr_service import ASRResult
+from app.services.asr.fun_asr_realtime_client import FunASRClientError
+
+
+def _wav(frames: bytes, sample_rate: int = 8000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(frames)
+    return buffer.getvalue()
+
+
+def _patch_providers(monkeypatch) -> None:
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(asr_service, "_resolve_asr_provider_priority", lambda: ["fun_asr_realtime", "sensevoice_http"])
+    monkeypatch.setattr(asr_service, "should_skip_provider", lambda _provider: (False, 0.0))
+    monkeypatch.setattr(asr_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(asr_service, "mark_provider_success", lambda _provider: None)
+    monkeypatch.setattr(asr_service, "mark_provider_failure", lambda *_args: None)
+
+
+def test_stream_transcription_overlaps_upload(monkeypatch) -> None:
+    _patch_providers(monkeypatch)
+    audio = _wav(b"\x01\x00" * 4000)
+    seen: dict[str, object] = {}
+
+    async def fake_stream(chunks, *, audio_format, sample_rate):
+        seen.update(audio_format=audio_format, sample_rate=sample_rate)
+        received = bytearray()
+        async for chunk in chunks:
+            received.extend(chunk)
+            seen["started"].set()
+        seen["audio"] = bytes(received)
+        return "你好"
+
+    async def upload():
+        # 剩余音频要等识别端已收到首批数据才继续发送，整段缓冲的实现会在这里卡住。
+        yield audio[:5000]
+        await asyncio.wait_for(seen["started"].wait(), timeout=2)
+        yield audio[5000:]
+
+    async def run() -> ASRResult:
+        seen["started"] = asyncio.Event()
+        return await asr_service.atranscribe_stream_with_fallback(upload(), filename="voice.wav")
+
+    monkeypatch.setattr(asr_service, "atranscribe_audio_stream_realtime", fake_stream)
+    result = asyncio.run(run())
+
+    assert result == ASRResult(text="你好", provider="fun_asr_realtime")
+    assert (seen["audio_format"], seen["sample_rate"], seen["audio"]) == ("wav", 8000, audio)
+
+
+def test_stream_transcription_buffers_and_falls_back_when_session_fails_to_start(monkeypatch) -> None:
+    _patch_providers(monkeypatch)
+    fallback_calls: list[tuple[bytes, str]] = []
+
+    async def failing_stream(_chunks, *, audio_format, sample_rate):
+        raise FunASRClientError("启动 Fun-ASR 失败: boom")
+
+    async def fake_fallback(audio_bytes, filename, lang=None):
+        fallback_calls.append((audio_bytes, filename))
+        return ASRResult(text="整段识别", provider="sensevoice_http")
+
+    async def upload():
+        yield b"\x00\x01" * 3000
+        yield b"\x02\x03" * 3000
+
+    monkeypatch.setattr(asr_service, "atranscribe_audio_stream_realtime", failing_stream)
+    monkeypatch.setattr(asr_service, "atranscribe_with_fallback", fake_fallback)
+    result = asyncio.run(asr_service.atranscribe_stream_with_fallback(upload(), filename="voice.pcm", sample_rate=16000))
+
+    assert result.provider == "sensevoice_http"
+    assert fallback_calls == [(b"\x00\x01" * 3000 + b"\x02\x03" * 3000, "voice.pcm")]
+
+
+def test_chat_voice_raw_endpoint_streams_body_into_asr(tmp_path, monkeypatch) -> None:
+    _patch_providers(monkeypatch)
+    audio = _wav(b"\x01\x00" * 2000, sample_rate=16000)
+
+    async def fake_stream(chunks, *, audio_format, sample_rate):
+        assert b"".join([chunk async for chunk in chunks]) == audio
+        assert (audio_format, sample_rate) == ("wav", 16000)
+        return "在吗"
+
+    async def fake_chat(*, store, session_id, persona_id, user_text):
+        assert (session_id, persona_id, user_text) == ("s-raw", "phainon", "在吗")
+        return {"assistant_text": "我在。", "emotion": "happy", "animation": "speak"}
+
+    async def fake_tts_fields(_assistant_text, **_kwargs):
+        return {"tts_media_type": "audio/wav"}
+
+    monkeypatch.setattr(asr_service, "atranscribe_audio_stream_realtime", fake_stream)
+    monkeypatch.setattr(chat_endpoint, "arun_text_chat", fake_chat)
+    monkeypatch.setattr(chat_endpoint, "_resolve_tts_fields", fake_tts_fields)
+
+    params = {"session_id": "s-raw", "persona_id": "phainon"}
+    app.dependency_overrides[get_session_store] = lambda: SessionStore(tmp_path / "session.db")
+    try:
+        with TestClient(app) as client:
+            resp = client.post("/v1/chat/voice/raw", params=params, content=audio)
+            empty = client.post("/v1/chat/voice/raw", params=params, content=b"")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["transcript_text"], body["asr_provider"], body["assistant_text"]) == (
+        "在吗",
+        "fun_asr_realtime",
+        "我在。",
+    )
+    assert empty.status_code == 400
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import math
+import wave
+from dataclasses import replace
+
+from fastapi.testclient import TestClient
+
+from app.core.settings import get_settings
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.asr import asr_service, vad
+from app.services.asr.vad import split_speech_wav
+
+_RATE = 16000
+
+
+def _tone(seconds: float, amplitude: int = 6000) -> list[int]:
+    return [int(amplitude * math.sin(2 * math.pi * 220 * i / _RATE)) for i in range(int(_RATE * seconds))]
+
+
+def _silence(seconds: float) -> list[int]:
+    # 轻微底噪，避免全零帧让阈值失去意义。
+    return [(i % 7) - 3 for i in range(int(_RATE * seconds))]
+
+
+def _wav(samples: list[int]) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(_RATE)
+        writer.writeframes(b"".join(sample.to_bytes(2, "little", signed=True) for sample in samples))
+    return buffer.getvalue()
+
+
+def _duration(wav_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(wav_bytes), "rb") as reader:
+        return reader.getnframes() / reader.getframerate()
+
+
+def test_split_speech_wav_trims_silence_and_splits_at_pauses() -> None:
+    vad.reset_vad_stats()
+    audio = _wav(_silence(1.0) + _tone(1.0) + _silence(0.3) + _tone(0.5) + _silence(2.0) + _tone(1.0) + _silence(1.5))
+
+    result = split_speech_wav(audio, min_silence_ms=600, padding_ms=100, max_segment_seconds=2.5)
+
+    assert result is not None
+    # 0.3s 的句内停顿保留，2s 的长停顿被压缩，首尾静音被裁掉；超过 2.5s 时在长停顿处切成两段。
+    assert [round(_duration(segment), 1) for segment in result.segments] == [2.0, 1.2]
+    assert result.input_seconds == 7.3 and result.output_seconds < 3.5
+    assert vad.get_vad_stats()["saved_ratio"] > 0.5
+
+
+def test_split_speech_wav_keeps_quiet_far_field_speech() -> None:
+    # 峰值 250（约 -42 dBFS）的轻声语音，前后为底噪。
+    audio = _wav(_silence(0.5) + _tone(2.0, amplitude=250) + _silence(0.5))
+
+    result = split_speech_wav(audio, min_silence_ms=600, padding_ms=0, max_segment_seconds=30)
+
+    assert result is not None and len(result.segments) == 1
+    assert abs(_duration(result.segments[0]) - 2.0) < 0.1
+    quiet_only = _wav(_tone(2.0, amplitude=250))
+    only_quiet = split_speech_wav(quiet_only, min_silence_ms=600, padding_ms=0, max_segment_seconds=30)
+    assert only_quiet is not None and len(only_quiet.segments) == 1
+    # 下限调高到轻声之上时仍按静音处理。
+    strict = split_speech_wav(audio, min_silence_ms=600, padding_ms=0, max_segment_seconds=30, min_speech_dbfs=-40)
+    assert strict is not None and strict.segments == []
+
+
+def test_split_speech_wav_handles_silence_and_unsupported_input() -> None:
+    silent = split_speech_wav(_wav(_silence(2.0)), min_silence_ms=600, padding_ms=100, max_segment_seconds=30)
+
+    assert silent is not None and silent.segments == []
+    assert split_speech_wav(b"ID3-mp3-bytes", min_silence_ms=600, padding_ms=100, max_segment_seconds=30) is None
+
+
+def test_atranscribe_uploads_vad_segments_and_joins_text(monkeypatch) -> None:
+    settings = replace(get_settings(), asr_vad_enabled=True, asr_vad_padding_ms=100, asr_vad_max_segment_seconds=1.5)
+    uploads: list[tuple[float, str]] = []
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    async def fake_transcribe(*, provider, audio_bytes, filename, lang):
+        uploads.append((round(_duration(audio_bytes), 1), filename))
+        return "你好。" if len(uploads) == 1 else "再见。"
+
+    monkeypatch.setattr(asr_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(asr_service, "_resolve_asr_provider_priority", lambda: ["sensevoice_http"])
+    monkeypatch.setattr(asr_service, "should_skip_provider", lambda _provider: (False, 0.0))
+    monkeypatch.setattr(asr_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(asr_service, "_atranscribe_with_provider", fake_transcribe)
+    monkeypatch.setattr(asr_service, "mark_provider_success", lambda _provider: None)
+
+    audio = _wav(_silence(0.5) + _tone(1.0) + _silence(1.0) + _tone(1.0) + _silence(0.5))
+    result = asyncio.run(asr_service.atranscribe_with_fallback(audio, "blob.webm"))
+    silent = asyncio.run(asr_service.atranscribe_with_fallback(_wav(_silence(1.0)), "voice.wav"))
+
+    assert result.text == "你好。再见。"
+    assert uploads == [(1.2, "voice.wav"), (1.2, "voice.wav")]
+    assert (silent.text, silent.provider) == ("", "vad")
+    with TestClient(app) as client:
+        assert client.get("/v1/system/asr-vad").json()["vad"]["requests"] >= 2
+
+
+def test_split_speech_wav_terminates_with_tiny_max_segment() -> None:
+    result = split_speech_wav(_wav(_tone(0.5)), min_silence_ms=600, padding_ms=0, max_segment_seconds=0.01)
+
+    # 上限被钳到 2 帧（60 ms）：0.5 s 的连续语音逐段切开而不是死循环。
+    assert result is not None and len(result.segments) >= 8
+    assert round(sum(_duration(segment) for segment in result.segments), 2) == 0.5
+    assert vad._split_long_region((0, 5), [1.0] * 5, 2) == [(0, 1), (1, 2), (2, 3), (3, 5)]
+
+
+def test_voice_endpoints_reject_silent_audio_without_calling_llm(tmp_path, monkeypatch) -> None:
+    settings = replace(get_settings(), asr_vad_enabled=True)
+    llm_calls: list[str] = []
+
+    async def fake_chat(**kwargs):
+        llm_calls.append(kwargs["user_text"])
+        raise AssertionError("静音音频不应调用 LLM")
+
+    monkeypatch.setattr(asr_service, "get_settings", lambda: settings)
+    monkeypatch.setattr("app.api.v1.endpoints.chat.arun_text_chat", fake_chat)
+    monkeypatch.setattr("app.api.v1.endpoints.chat.astream_text_chat_with_voice", fake_chat)
+    app.dependency_overrides[get_session_store] = lambda: SessionStore(tmp_path / "session.db")
+    form = {"session_id": "s-silent", "persona_id": "phainon"}
+    try:
+        with TestClient(app) as client:
+            responses = [
+                client.post(path, data=form, files={"audio": ("voice.wav", _wav(_silence(1.0)), "audio/wav")})
+                for path in ("/v1/chat/voice", "/v1/chat/voice/stream")
+            ]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [resp.status_code for resp in responses] == [422, 422]
+    assert "asr_provider=vad" in responses[0].json()["detail"]
+    assert llm_calls == []
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.upstream_limits import UPSTREAM_ASR, UPSTREAM_LLM, run_on_upstream_executor, upstream_slot
+
+
+def test_chat_text_endpoint_uses_async_llm_path(tmp_path, monkeypatch) -> None:
+    store = SessionStore(tmp_path / "session.db")
+    seen_histories: list[list[dict[str, str]]] = []
+
+    async def fake_completion(*, persona_id: str, messages, relationship, include_initial_injection: bool) -> str:
+        _ = persona_id, relationship
+        seen_histories.append(list(messages))
+        assert include_initial_injection is True
+        return "[assistant]<speak>你好呀。</speak>[/assistant][emotion]happy[/emotion]"
+
+    monkeypatch.setattr("app.services.dialogue.chat_service.arequest_messages_completion", fake_completion)
+
+    app.dependency_overrides[get_session_store] = lambda: store
+    with TestClient(app) as client:
+        resp = client.post(
+            "/v1/chat/text",
+            json={"session_id": "s-async-1", "persona_id": "phainon", "user_text": "在吗"},
+        )
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.json()["assistant_text"] == "你好呀。"
+    assert seen_histories == [[{"role": "user", "content": "在吗"}]]
+    assert store.list_recent_messages("s-async-1", limit=5)[-1] == {"role": "assistant", "content": "你好呀。"}
+
+
+def test_upstream_slot_bounds_concurrency_by_configured_limit(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.upstream_limits._resolve_limit", lambda _upstream: 2)
+
+    async def scenario() -> int:
+        active = 0
+        peak = 0
+
+        async def call() -> None:
+            nonlocal active, peak
+            async with upstream_slot(UPSTREAM_LLM):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(call() for _ in range(8)))
+        return peak
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_run_on_upstream_executor_uses_upstream_pool_without_slot(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.upstream_limits._resolve_limit", lambda _upstream: 1)
+
+    async def scenario() -> str:
+        # 会话已持有唯一的 ASR 额度，逐帧调用不能再次争用，否则会死锁。
+        async with upstream_slot(UPSTREAM_ASR):
+            return await asyncio.wait_for(
+                run_on_upstream_executor(UPSTREAM_ASR, lambda: threading.current_thread().name),
+                timeout=2,
+            )
+
+    assert asyncio.run(scenario()).startswith("upstream-asr")
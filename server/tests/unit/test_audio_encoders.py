@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import io
+import shutil
+import wave
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.tts import audio_encoders, tts_service
+from app.services.tts.audio_cache import TTSAudioCache
+from app.services.dialogue.chat_service import ChatServiceError
+from app.services.tts.audio_encoders import AudioEncoder, encode_audio, negotiate_output_format, output_media_type
+from app.services.tts.tts_service import TTSSynthesizeResult
+
+
+def _fake_mp3_encoder() -> AudioEncoder:
+    return AudioEncoder(name="mp3", media_type="audio/mpeg", encode=lambda audio: b"ID3" + audio[:8])
+
+
+def _silent_wav(seconds: float = 0.2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(24000)
+        writer.writeframes(b"\x00\x00" * int(24000 * seconds))
+    return buffer.getvalue()
+
+
+def test_negotiate_output_format_prefers_explicit_then_accept(monkeypatch) -> None:
+    monkeypatch.setattr(audio_encoders, "_ENCODERS", {"mp3": _fake_mp3_encoder()})
+
+    assert negotiate_output_format("MP3") == "mp3"
+    assert negotiate_output_format("opus") == "wav"
+    assert negotiate_output_format(None, "audio/ogg, audio/mpeg;q=0.8, audio/wav;q=0.5") == "mp3"
+    assert negotiate_output_format(None, "audio/wav, audio/mpeg") == "wav"
+    assert negotiate_output_format(None, "*/*") == "wav"
+    assert encode_audio(b"RIFF....", "audio/wav", "mp3") == (b"ID3RIFF....", "audio/mpeg")
+
+
+def test_tts_synthesize_encodes_and_caches_per_output_format(tmp_path, monkeypatch) -> None:
+    cache = TTSAudioCache(memory_max_bytes=1 << 20, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    calls: list[str] = []
+
+    async def fake_asynthesize(*, provider, text, gpt_sovits_payload):
+        assert "_output_format" not in tts_service._build_gpt_sovits_request_payload(text, gpt_sovits_payload)
+        calls.append(text)
+        return TTSSynthesizeResult(audio_bytes=b"RIFF-wav-audio", media_type="audio/wav", provider=provider)
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(audio_encoders, "_ENCODERS", {"mp3": _fake_mp3_encoder()})
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(tts_service, "_asynthesize_with_provider", fake_asynthesize)
+
+    with TestClient(app) as client:
+        body = {"text": "我在。", "provider": "gpt_sovits"}
+        negotiated = client.post("/v1/tts/synthesize", json=body, headers={"Accept": "audio/mpeg"})
+        explicit = client.post("/v1/tts/synthesize", json={**body, "output_format": "mp3"})
+        wav = client.post("/v1/tts/synthesize", json=body)
+        unsupported = client.post("/v1/tts/synthesize", json={**body, "output_format": "flac"})
+        formats = client.get("/v1/tts/formats").json()
+
+    assert negotiated.headers["content-type"] == "audio/mpeg"
+    assert negotiated.content == b"ID3RIFF-wav"
+    assert explicit.headers["X-TTS-Cache"] == "hit" and explicit.content == negotiated.content
+    assert wav.headers["content-type"] == "audio/wav" and wav.headers["X-TTS-Cache"] == "miss"
+    assert unsupported.status_code == 422
+    assert calls == ["我在。", "我在。"]
+    assert formats == {"output_formats": ["wav", "mp3"]}
+
+
+def test_chat_reports_negotiated_media_type_without_inline_audio(tmp_path, monkeypatch) -> None:
+    async def fake_chat(**kwargs):
+        return {
+            "session_id": kwargs["session_id"],
+            "assistant_text": "早。",
+            "emotion": "happy",
+            "animation": "happy",
+            "relationship_delta": {"trust": 0, "reliance": 0, "fatigue": 0},
+            "memory_writes": [],
+        }
+
+    async def fake_synthesize(_assistant_text: str, **kwargs) -> TTSSynthesizeResult:
+        return TTSSynthesizeResult(audio_bytes=b"ID3", media_type="audio/mpeg", provider="gpt_sovits")
+
+    async def failing_synthesize_base64(_assistant_text: str, **_kwargs):
+        raise ChatServiceError("TTS 暂不可用")
+
+    monkeypatch.setattr(audio_encoders, "_ENCODERS", {"mp3": _fake_mp3_encoder()})
+    monkeypatch.setattr("app.api.v1.endpoints.chat.arun_text_chat", fake_chat)
+    monkeypatch.setattr("app.api.v1.endpoints.chat.asynthesize_assistant_audio", fake_synthesize)
+    monkeypatch.setattr("app.api.v1.endpoints.chat.asynthesize_assistant_audio_base64", failing_synthesize_base64)
+
+    body = {"session_id": "s-fmt", "persona_id": "phainon", "user_text": "早", "output_format": "mp3"}
+    app.dependency_overrides[get_session_store] = lambda: SessionStore(tmp_path / "session.db")
+    try:
+        with TestClient(app) as client:
+            streamed = client.post("/v1/chat/text-with-voice", json={**body, "audio_mode": "stream"}).json()
+            failed = client.post("/v1/chat/text-with-voice", json=body).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert streamed["tts_media_type"] == "audio/mpeg" and streamed["tts_audio_url"]
+    assert failed["tts_media_type"] == "audio/mpeg" and failed["tts_error"] == "TTS 暂不可用"
+    assert output_media_type("wav") == "audio/wav" and output_media_type("opus") == "audio/wav"
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要 ffmpeg")
+def test_ffmpeg_encoders_produce_compressed_containers() -> None:
+    wav_bytes = _silent_wav()
+    opus_bytes, opus_type = encode_audio(wav_bytes, "audio/wav", "opus")
+    mp3_bytes, mp3_type = encode_audio(wav_bytes, "audio/wav", "mp3")
+
+    assert opus_type == "audio/ogg" and opus_bytes.startswith(b"OggS")
+    assert mp3_type == "audio/mpeg" and len(mp3_bytes) < len(wav_bytes)
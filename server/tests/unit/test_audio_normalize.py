@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import io
+import math
+import shutil
+import wave
+
+import pytest
+
+from app.services.asr import audio_normalize
+from app.services.asr.audio_normalize import normalize_for_asr
+
+
+def _wav(frames: bytes, *, rate: int, channels: int, width: int = 2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(width)
+        writer.setframerate(rate)
+        writer.writeframes(frames)
+    return buffer.getvalue()
+
+
+def _stereo_tone(rate: int, seconds: float, freq: float) -> bytes:
+    frames = bytearray()
+    for i in range(int(rate * seconds)):
+        value = int(12000 * math.sin(2 * math.pi * freq * i / rate))
+        # 左声道为正弦，右声道静音：下混后幅度减半。
+        frames += value.to_bytes(2, "little", signed=True) + b"\x00\x00"
+    return bytes(frames)
+
+
+def test_normalize_skips_target_format_and_missing_numpy(monkeypatch) -> None:
+    mono_16k = _wav(b"\x01\x00" * 1600, rate=16000, channels=1)
+    assert normalize_for_asr(mono_16k, "voice.wav", target_rate=16000) is None
+    assert normalize_for_asr(b"\x00\x01" * 100, "voice.pcm", target_rate=16000) is None
+
+    monkeypatch.setattr(audio_normalize, "_load_numpy", lambda: None)
+    stereo_48k = _wav(_stereo_tone(48000, 0.1, 440), rate=48000, channels=2)
+    assert normalize_for_asr(stereo_48k, "voice.wav", target_rate=16000) is None
+
+
+def test_normalize_downmixes_and_resamples_wav() -> None:
+    np = pytest.importorskip("numpy")
+    stereo_48k = _wav(_stereo_tone(48000, 1.0, 440), rate=48000, channels=2)
+
+    normalized = normalize_for_asr(stereo_48k, "voice.wav", target_rate=16000)
+
+    assert normalized is not None and normalized.sample_rate == 16000
+    with wave.open(io.BytesIO(normalized.audio_bytes), "rb") as reader:
+        assert (reader.getnchannels(), reader.getsampwidth(), reader.getframerate()) == (1, 2, 16000)
+        samples = np.frombuffer(reader.readframes(reader.getnframes()), dtype="<i2").astype(np.float32)
+    assert len(samples) == 16000
+    assert len(normalized.audio_bytes) < len(stereo_48k) / 5
+    # 440 Hz 单音在重采样后频率与幅度（下混后约 6000）保持不变。
+    spectrum = np.abs(np.fft.rfft(samples))
+    assert abs(int(np.argmax(spectrum)) - 440) <= 1
+    assert 5400 < np.max(np.abs(samples[100:-100])) < 6600
+
+
+def test_normalize_filters_content_above_target_nyquist() -> None:
+    np = pytest.importorskip("numpy")
+    # 12 kHz 超出 16 kHz 采样的奈奎斯特频率，未抗混叠时会折叠成 4 kHz 的伪音。
+    tone = (8000 * np.sin(2 * np.pi * 12000 * np.arange(48000) / 48000)).astype("<i2").tobytes()
+
+    normalized = normalize_for_asr(_wav(tone, rate=48000, channels=1), "voice.wav", target_rate=16000)
+
+    assert normalized is not None
+    with wave.open(io.BytesIO(normalized.audio_bytes), "rb") as reader:
+        samples = np.frombuffer(reader.readframes(reader.getnframes()), dtype="<i2")
+    assert np.max(np.abs(samples[200:-200])) < 400
+
+
+def test_resample_keeps_length_for_input_shorter_than_filter() -> None:
+    np = pytest.importorskip("numpy")
+    samples = np.linspace(-0.5, 0.5, 30, dtype=np.float32)
+
+    resampled = audio_normalize.resample_mono(samples, 48000, 16000)
+
+    assert len(resampled) == 10
+    assert np.allclose(resampled, samples[::3])
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要 ffmpeg")
+def test_normalize_decodes_compressed_audio_with_ffmpeg() -> None:
+    import subprocess
+
+    source = _wav(_stereo_tone(44100, 0.5, 440), rate=44100, channels=2)
+    mp3 = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-f", "mp3", "pipe:1"],
+        input=source,
+        capture_output=True,
+        check=True,
+    ).stdout
+
+    normalized = normalize_for_asr(mp3, "voice.mp3", target_rate=16000)
+
+    assert normalized is not None and normalized.source == "mp3"
+    with wave.open(io.BytesIO(normalized.audio_bytes), "rb") as reader:
+        assert (reader.getnchannels(), reader.getframerate()) == (1, 16000)
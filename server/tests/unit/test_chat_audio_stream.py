@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.tts import audio_jobs
+from app.services.tts.tts_service import TTSServiceError, TTSSynthesizeResult
+
+
+async def _fake_chat(**kwargs):
+    return {
+        "session_id": kwargs["session_id"],
+        "assistant_text": "<speak>早上好！</speak>",
+        "emotion": "happy",
+        "animation": "happy",
+        "relationship_delta": {"trust": 1, "reliance": 0, "fatigue": 0},
+        "memory_writes": [],
+    }
+
+
+def test_text_with_voice_stream_mode_returns_metadata_then_binary_audio(tmp_path, monkeypatch) -> None:
+    audio = b"RIFF" + bytes(range(256)) * 600
+
+    async def fake_synthesize(assistant_text: str, **_kwargs) -> TTSSynthesizeResult:
+        assert assistant_text == "<speak>早上好！</speak>"
+        return TTSSynthesizeResult(audio_bytes=audio, media_type="audio/wav", provider="gpt_sovits")
+
+    monkeypatch.setattr("app.api.v1.endpoints.chat.arun_text_chat", _fake_chat)
+    monkeypatch.setattr("app.api.v1.endpoints.chat.asynthesize_assistant_audio", fake_synthesize)
+
+    app.dependency_overrides[get_session_store] = lambda: SessionStore(tmp_path / "session.db")
+    with TestClient(app) as client:
+        resp = client.post(
+            "/v1/chat/text-with-voice",
+            json={"session_id": "s-bin-1", "persona_id": "phainon", "user_text": "早", "audio_mode": "stream"},
+        )
+        body = resp.json()
+        audio_resp = client.get(body["tts_audio_url"])
+        missing = client.get("/v1/tts/audio/not-a-job")
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert body["tts_audio_base64"] == ""
+    assert body["tts_audio_url"].startswith("/v1/tts/audio/")
+    assert body["emotion"] == "happy"
+
+    assert audio_resp.status_code == 200
+    assert audio_resp.content == audio
+    assert audio_resp.headers["content-type"] == "audio/wav"
+    assert "content-length" not in audio_resp.headers
+    assert audio_resp.headers["X-TTS-Provider"] == "gpt_sovits"
+    assert missing.status_code == 404
+
+
+def test_stream_mode_audio_fetch_reports_synthesis_failure(tmp_path, monkeypatch) -> None:
+    async def failing_synthesize(_assistant_text: str, **_kwargs) -> TTSSynthesizeResult:
+        raise TTSServiceError("TTS 暂不可用")
+
+    monkeypatch.setattr("app.api.v1.endpoints.chat.arun_text_chat", _fake_chat)
+    monkeypatch.setattr("app.api.v1.endpoints.chat.asynthesize_assistant_audio", failing_synthesize)
+
+    app.dependency_overrides[get_session_store] = lambda: SessionStore(tmp_path / "session.db")
+    with TestClient(app) as client:
+        resp = client.post(
+            "/v1/chat/text-with-voice",
+            json={"session_id": "s-bin-2", "persona_id": "phainon", "user_text": "早", "audio_mode": "stream"},
+        )
+        audio_resp = client.get(resp.json()["tts_audio_url"])
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert audio_resp.status_code == 502
+    assert "TTS 暂不可用" in audio_resp.json()["detail"]
+
+
+def test_audio_job_evicted_while_waiting_returns_none() -> None:
+    async def scenario() -> tuple[object, object]:
+        jobs = audio_jobs.TTSAudioJobs(max_jobs=1)
+        audio_id = jobs.submit(asyncio.Event().wait())
+        waiter = asyncio.create_task(jobs.wait(audio_id))
+        await asyncio.sleep(0)
+        # 超出 max_jobs 淘汰正在等待的任务。
+        jobs.submit(asyncio.Event().wait())
+        evicted = await waiter
+
+        closing_id = jobs.submit(asyncio.Event().wait())
+        waiter = asyncio.create_task(jobs.wait(closing_id))
+        await asyncio.sleep(0)
+        await jobs.aclose()
+        return evicted, await waiter
+
+    assert asyncio.run(scenario()) == (None, None)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.asr.fun_asr_realtime_client import FunASREvent
+from app.services.dialogue import realtime_voice_chat
+
+# 每个音频帧触发一条识别结果：(文本, 是否句末)。
+_FRAME_RESULTS = {
+    b"frame-1": ("你好", True),
+    b"frame-2": ("再", False),
+    b"frame-3": ("再见", True),
+}
+
+
+class _FakeFunASRSession:
+    def __init__(self, *, audio_format: str, sample_rate: int, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._events: asyncio.Queue[FunASREvent | None] = asyncio.Queue()
+
+    def start(self) -> None:
+        return
+
+    def send_audio_frame(self, frame: bytes) -> None:
+        # 与真实 SDK 一样在线程中调用，事件经 call_soon_threadsafe 回到事件循环。
+        text, sentence_end = _FRAME_RESULTS[frame]
+        self._publish(FunASREvent(type="result", text=text, sentence_end=sentence_end))
+
+    def stop(self) -> None:
+        self._publish(FunASREvent(type="complete"))
+
+    def close(self) -> None:
+        self._publish(None)
+
+    async def anext_event(self) -> FunASREvent | None:
+        return await self._events.get()
+
+    def _publish(self, event: FunASREvent | None) -> None:
+        self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+
+
+def test_realtime_ws_runs_turns_and_barge_in_cancels_reply(tmp_path, monkeypatch) -> None:
+    cancelled: list[str] = []
+
+    async def fake_stream_chat(*, store, session_id, persona_id, user_text, **_tts_options):
+        yield {"type": "chat", "assistant_text": f"回复:{user_text}"}
+        if user_text == "你好":
+            try:
+                # 模拟仍在合成的长回复，等待被打断。
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(user_text)
+                raise
+        yield {"type": "audio", "index": 0, "audio_base64": "UklGRg=="}
+        yield {"type": "done", "session_id": session_id, "audio_segments": 1}
+
+    monkeypatch.setattr(realtime_voice_chat, "FunASRRealtimeSession", _FakeFunASRSession)
+    monkeypatch.setattr(realtime_voice_chat, "astream_text_chat_with_voice", fake_stream_chat)
+    app.dependency_overrides[get_session_store] = lambda: SessionStore(tmp_path / "session.db")
+    try:
+        with TestClient(app) as client:
+            with client.websocket_connect("/v1/chat/realtime/ws?session_id=s-rt&persona_id=phainon") as ws:
+                assert ws.receive_json()["type"] == "open"
+                ws.send_bytes(b"frame-1")
+                assert ws.receive_json() == {"type": "transcript", "text": "你好", "sentence_end": True}
+                assert ws.receive_json() == {"type": "chat", "assistant_text": "回复:你好", "turn": 1}
+
+                ws.send_bytes(b"frame-2")
+                assert ws.receive_json() == {"type": "interrupted", "turn": 1}
+                assert ws.receive_json() == {"type": "transcript", "text": "再", "sentence_end": False}
+                ws.send_bytes(b"frame-3")
+                ws.send_text("stop")
+                events = []
+                while not events or events[-1]["type"] != "close":
+                    events.append(ws.receive_json())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert cancelled == ["你好"]
+    assert [(event["type"], event.get("turn")) for event in events] == [
+        ("transcript", None),
+        ("chat", 2),
+        ("audio", 2),
+        ("done", 2),
+        ("close", None),
+    ]
+    assert events[-1]["turns"] == 2
+
+
+def test_realtime_ws_barge_in_mid_llm_keeps_interrupted_turn_in_history(tmp_path, monkeypatch) -> None:
+    store = SessionStore(tmp_path / "session.db")
+    llm_blocked = threading.Event()
+    calls: list[int] = []
+
+    async def fake_stream(**_kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            yield "[assistant]<speak>你好呀。</speak><speak>今天想"
+            # 第一轮 LLM 停在半句，等待用户插话。
+            llm_blocked.set()
+            await asyncio.Event().wait()
+        yield "[assistant]<speak>再见啦。</speak>[/assistant][emotion]calm[/emotion]"
+
+    async def fake_synthesize(speak_text: str, **_kwargs) -> tuple[str, str, str]:
+        return "audio/wav", "UklGRg==", "gpt_sovits"
+
+    monkeypatch.setattr(realtime_voice_chat, "FunASRRealtimeSession", _FakeFunASRSession)
+    monkeypatch.setattr("app.services.dialogue.chat_service.astream_messages_completion", fake_stream)
+    monkeypatch.setattr("app.services.dialogue.chat_service._asynthesize_speak_text_base64", fake_synthesize)
+    app.dependency_overrides[get_session_store] = lambda: store
+    try:
+        with TestClient(app) as client:
+            with client.websocket_connect("/v1/chat/realtime/ws?session_id=s-rt-llm&persona_id=phainon") as ws:
+                assert ws.receive_json()["type"] == "open"
+                ws.send_bytes(b"frame-1")
+                assert ws.receive_json()["type"] == "transcript"
+                assert llm_blocked.wait(timeout=5)
+
+                ws.send_bytes(b"frame-2")
+                assert ws.receive_json() == {"type": "interrupted", "turn": 1}
+                ws.send_bytes(b"frame-3")
+                ws.send_text("stop")
+                events = []
+                while not events or events[-1]["type"] != "close":
+                    events.append(ws.receive_json())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert ("done", 2) in [(event["type"], event.get("turn")) for event in events]
+    # 被打断的一轮：用户消息与已说完的台词按顺序留在历史中，未闭合的半句不记录。
+    assert [(item["role"], item["content"]) for item in store.list_recent_messages("s-rt-llm", limit=10)] == [
+        ("user", "你好"),
+        ("assistant", "你好呀。"),
+        ("user", "再见"),
+        ("assistant", "再见啦。"),
+    ]
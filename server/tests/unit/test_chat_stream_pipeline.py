@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories.session_store import SessionStore
+from app.services.dialogue.chat_service import SpeakSentenceSplitter
+
+
+def test_speak_sentence_splitter_emits_closed_sentences_across_deltas() -> None:
+    splitter = SpeakSentenceSplitter()
+    emitted: list[str] = []
+    for delta in ["[assistant]（笑）<spe", "ak>早上好！今天", "也要加油哦……", "</spe", "ak>[/assistant]"]:
+        emitted.extend(splitter.feed(delta))
+    emitted.extend(splitter.flush())
+    assert emitted == ["早上好！", "今天也要加油哦……"]
+
+
+def test_speak_sentence_splitter_flushes_unclosed_speak_block() -> None:
+    splitter = SpeakSentenceSplitter()
+    assert splitter.feed("<speak>你好呀") == []
+    assert splitter.flush() == ["你好呀"]
+
+
+def test_text_with_voice_stream_pushes_audio_per_sentence(tmp_path, monkeypatch) -> None:
+    store = SessionStore(tmp_path / "session.db")
+    deltas = [
+        "[assistant]<speak>早上好！",
+        "我们出发吧。</speak>[/assistant]",
+        "[emotion]happy[/emotion][animation]happy[/animation]",
+        '[relationship_delta]{"trust":1,"reliance":0,"fatigue":0}[/relationship_delta]',
+        "[memory_writes][][/memory_writes]",
+    ]
+    synthesized: list[str] = []
+
+    async def fake_stream(**_kwargs):
+        for delta in deltas:
+            yield delta
+
+    async def fake_synthesize(speak_text: str, **_kwargs) -> tuple[str, str, str]:
+        synthesized.append(speak_text)
+        return "audio/wav", "QUJD", "gpt_sovits"
+
+    monkeypatch.setattr("app.services.dialogue.chat_service.astream_messages_completion", fake_stream)
+    monkeypatch.setattr("app.services.dialogue.chat_service._asynthesize_speak_text_base64", fake_synthesize)
+
+    app.dependency_overrides[get_session_store] = lambda: store
+    with TestClient(app) as client:
+        resp = client.post(
+            "/v1/chat/text-with-voice/stream",
+            json={"session_id": "s-stream-1", "persona_id": "phainon", "user_text": "早"},
+        )
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in resp.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    types = [event["type"] for event in events]
+    assert types.count("audio") == 2
+    assert types.index("chat") < types.index("done")
+    assert synthesized == ["早上好！", "我们出发吧。"]
+    chat_event = next(event for event in events if event["type"] == "chat")
+    assert chat_event["emotion"] == "happy"
+    assert chat_event["relationship_delta"]["trust"] == 1
+    assert store.list_recent_messages("s-stream-1", limit=5)[-1]["role"] == "assistant"
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import sys
+import threading
+import types
+from dataclasses import replace
+
+from fastapi.testclient import TestClient
+
+from app.core.settings import get_settings
+from app.main import app
+from app.services.asr import fun_asr_realtime_client
+
+
+def _install_fake_recognition_sdk(monkeypatch) -> list[int]:
+    """模拟 dashscope Recognition：识别结果从 SDK 自己的线程回调，stop 阻塞到 on_complete。"""
+    send_threads: list[int] = []
+
+    class FakeResult:
+        def __init__(self, text: str, sentence_end: bool) -> None:
+            self._sentence = {"text": text, "sentence_end": sentence_end}
+
+        def get_sentence(self) -> dict:
+            return self._sentence
+
+        def get_usage(self, _sentence) -> None:
+            return None
+
+        def get_request_id(self) -> str:
+            return "req-1"
+
+    class FakeRecognitionResult:
+        @staticmethod
+        def is_sentence_end(sentence: dict) -> bool:
+            return bool(sentence.get("sentence_end"))
+
+    class FakeRecognition:
+        def __init__(self, *, callback, **_kwargs) -> None:
+            self._callback = callback
+            self._frames = 0
+
+        def start(self) -> None:
+            self._callback.on_open()
+
+        def send_audio_frame(self, _frame: bytes) -> None:
+            send_threads.append(threading.get_ident())
+            self._frames += 1
+            result = FakeResult("你" * self._frames, sentence_end=False)
+            worker = threading.Thread(target=self._callback.on_event, args=(result,))
+            worker.start()
+            worker.join()
+
+        def stop(self) -> None:
+            self._callback.on_event(FakeResult("你好。", sentence_end=True))
+            self._callback.on_complete()
+
+    asr_module = types.ModuleType("dashscope.audio.asr")
+    asr_module.Recognition = FakeRecognition
+    asr_module.RecognitionCallback = type("RecognitionCallback", (), {})
+    asr_module.RecognitionResult = FakeRecognitionResult
+    monkeypatch.setitem(sys.modules, "dashscope", types.ModuleType("dashscope"))
+    monkeypatch.setitem(sys.modules, "dashscope.audio", types.ModuleType("dashscope.audio"))
+    monkeypatch.setitem(sys.modules, "dashscope.audio.asr", asr_module)
+    settings = replace(get_settings(), dashscope_api_key="sk-test")
+    monkeypatch.setattr(fun_asr_realtime_client, "get_settings", lambda: settings)
+    return send_threads
+
+
+def test_fun_asr_ws_relays_sdk_thread_events_without_polling(monkeypatch) -> None:
+    send_threads = _install_fake_recognition_sdk(monkeypatch)
+    loop_threads: list[int] = []
+    original_anext_event = fun_asr_realtime_client.FunASRRealtimeSession.anext_event
+
+    async def tracking_anext_event(self):
+        loop_threads.append(threading.get_ident())
+        return await original_anext_event(self)
+
+    monkeypatch.setattr(fun_asr_realtime_client.FunASRRealtimeSession, "anext_event", tracking_anext_event)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/v1/asr/fun/realtime/ws?format=pcm&sample_rate=16000") as ws:
+            assert ws.receive_json()["sample_rate"] == 16000
+            assert ws.receive_json()["type"] == "open"
+            ws.send_bytes(b"\x00\x01" * 800)
+            assert ws.receive_json()["text"] == "你"
+            ws.send_bytes(b"\x00\x01" * 800)
+            assert ws.receive_json()["text"] == "你你"
+            ws.send_text("stop")
+            final = ws.receive_json()
+            complete = ws.receive_json()
+
+    assert (final["text"], final["sentence_end"], final["request_id"]) == ("你好。", True, "req-1")
+    assert complete["type"] == "complete"
+    # SDK 发送在线程中执行，事件等待始终在事件循环线程上完成。
+    assert len(set(loop_threads)) == 1 and loop_threads[0] not in send_threads
+
+
+def test_session_without_loop_keeps_thread_queue_polling(monkeypatch) -> None:
+    _install_fake_recognition_sdk(monkeypatch)
+
+    text = fun_asr_realtime_client.transcribe_audio_bytes_realtime(
+        b"\x00\x01" * 800,
+        audio_format="pcm",
+        sample_rate=16000,
+    )
+
+    assert text == "你好。"
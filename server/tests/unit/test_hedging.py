@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+
+from app.core.settings import get_settings
+from app.services import hedging
+from app.services.asr import asr_service
+from app.services.hedging import get_hedge_stats, reset_hedge_stats, run_hedged
+from app.services.tts import tts_service
+from app.services.tts.tts_service import TTSServiceError, TTSSynthesizeResult
+
+
+def test_run_hedged_starts_backup_after_budget_and_cancels_loser() -> None:
+    reset_hedge_stats()
+    cancelled: list[str] = []
+
+    async def slow_primary() -> str:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("primary")
+            raise
+        return "primary"
+
+    async def fast_backup() -> str:
+        await asyncio.sleep(0.01)
+        return "backup"
+
+    async def failing() -> str:
+        raise TTSServiceError("down")
+
+    hedged = asyncio.run(
+        run_hedged(
+            "demo",
+            [("primary", slow_primary), ("backup", fast_backup)],
+            hedge_after_seconds=0.05,
+            expected_errors=(TTSServiceError,),
+        )
+    )
+    assert (hedged.winner, hedged.result, hedged.hedged) == ("backup", "backup", True)
+    assert cancelled == ["primary"]
+
+    # 不对冲时失败立即降级到下一个。
+    sequential = asyncio.run(
+        run_hedged(
+            "demo",
+            [("broken", failing), ("backup", fast_backup)],
+            hedge_after_seconds=None,
+            expected_errors=(TTSServiceError,),
+        )
+    )
+    assert sequential.winner == "backup" and not sequential.hedged
+    assert [name for name, _ in sequential.errors] == ["broken"]
+
+    stats = get_hedge_stats()["demo"]
+    assert stats["requests"] == 2 and stats["hedged"] == 1 and stats["hedge_rate"] == 0.5
+    assert stats["wins"] == {"backup": 2} and stats["hedged_wins"] == {"backup": 1}
+
+
+def test_asynthesize_with_fallback_hedges_slow_primary(monkeypatch) -> None:
+    reset_hedge_stats()
+    settings = replace(get_settings(), tts_hedge_enabled=True, tts_hedge_delay_ms=50)
+    failures: list[str] = []
+
+    async def fake_synthesize(*, provider, text, gpt_sovits_payload):
+        if provider == "qwen_clone_tts":
+            await asyncio.sleep(5)
+        return TTSSynthesizeResult(audio_bytes=b"RIFF", media_type="audio/wav", provider=provider)
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(tts_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: None)
+    monkeypatch.setattr(tts_service, "should_skip_provider", lambda _provider: (False, 0.0))
+    monkeypatch.setattr(tts_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(tts_service, "_asynthesize_with_provider", fake_synthesize)
+    monkeypatch.setattr(tts_service, "mark_provider_success", lambda _provider: None)
+    monkeypatch.setattr(tts_service, "mark_provider_failure", lambda provider, *_args: failures.append(provider))
+    monkeypatch.setattr(
+        tts_service,
+        "resolve_tts_provider_priority",
+        lambda force_provider="": ["qwen_clone_tts", "gpt_sovits"],
+    )
+
+    result = asyncio.run(asyncio.wait_for(tts_service.asynthesize_with_fallback(text="你好"), timeout=2))
+    assert result.provider == "gpt_sovits"
+    # 被取消的主 provider 不计入失败冷却。
+    assert failures == []
+    assert hedging.get_hedge_stats()["tts"]["hedged_wins"] == {"gpt_sovits": 1}
+
+
+def _patch_asr(monkeypatch, fake_transcribe, *, cooling: set[str] = frozenset()) -> None:
+    settings = replace(get_settings(), asr_hedge_enabled=True, asr_hedge_delay_ms=50)
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(asr_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(asr_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(asr_service, "_atranscribe_with_provider", fake_transcribe)
+    monkeypatch.setattr(asr_service, "should_skip_provider", lambda provider: (provider in cooling, 3.0))
+    monkeypatch.setattr(asr_service, "mark_provider_success", lambda _provider: None)
+    monkeypatch.setattr(asr_service, "mark_provider_failure", lambda *_args: None)
+    monkeypatch.setattr(
+        asr_service,
+        "_resolve_asr_provider_priority",
+        lambda: ["sensevoice_http", "fun_asr_realtime"],
+    )
+
+
+def test_atranscribe_races_hung_sensevoice_and_skips_empty_transcripts(monkeypatch) -> None:
+    async def fake_transcribe(*, provider, audio_bytes, filename, lang):
+        if provider == "sensevoice_http":
+            await asyncio.sleep(5)
+        return "你好"
+
+    _patch_asr(monkeypatch, fake_transcribe)
+    result = asyncio.run(asyncio.wait_for(asr_service.atranscribe_with_fallback(b"wav", "a.wav"), timeout=2))
+    assert (result.provider, result.text) == ("fun_asr_realtime", "你好")
+
+    async def empty_then_text(*, provider, audio_bytes, filename, lang):
+        return "" if provider == "sensevoice_http" else "在吗"
+
+    _patch_asr(monkeypatch, empty_then_text)
+    result = asyncio.run(asr_service.atranscribe_with_fallback(b"wav", "a.wav"))
+    assert (result.provider, result.text) == ("fun_asr_realtime", "在吗")
+
+    async def always_empty(*, provider, audio_bytes, filename, lang):
+        return ""
+
+    _patch_asr(monkeypatch, always_empty)
+    result = asyncio.run(asr_service.atranscribe_with_fallback(b"wav", "a.wav"))
+    assert (result.provider, result.text) == ("sensevoice_http", "")
+
+
+def test_atranscribe_race_excludes_providers_in_cooldown(monkeypatch) -> None:
+    started: list[str] = []
+
+    async def fake_transcribe(*, provider, audio_bytes, filename, lang):
+        started.append(provider)
+        return "你好"
+
+    _patch_asr(monkeypatch, fake_transcribe, cooling={"sensevoice_http"})
+    result = asyncio.run(asr_service.atranscribe_with_fallback(b"wav", "a.wav"))
+    assert result.provider == "fun_asr_realtime" and started == ["fun_asr_realtime"]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import http_clients
+
+
+def test_http_client_is_shared_per_origin() -> None:
+    first = http_clients.get_http_client("http://127.0.0.1:50000/api/v1/asr")
+    second = http_clients.get_http_client("http://127.0.0.1:50000/")
+    other = http_clients.get_http_client("http://127.0.0.1:9880/tts")
+
+    assert first is second
+    assert first is not other
+    assert isinstance(first, httpx.Client)
+
+
+def test_http_pool_stats_endpoint_reports_requests_and_lifespan_closes_clients(monkeypatch) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"text": "你好"})
+
+    with TestClient(app) as client:
+        pooled = http_clients.get_http_client("http://asr.local:8000/api/v1/asr")
+        monkeypatch.setattr(pooled, "_transport", httpx.MockTransport(handler))
+        pooled.post("http://asr.local:8000/api/v1/asr", timeout=1.0)
+        pooled.post("http://asr.local:8000/api/v1/asr", timeout=1.0)
+
+        resp = client.get("/v1/system/http-pools")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["limits"]["max_connections"] >= 1
+    pool = next(item for item in body["pools"] if item["origin"] == "http://asr.local:8000")
+    assert pool["kind"] == "sync"
+    assert pool["requests"] == 2
+    assert pooled.is_closed
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import os
+
+from app.services.dialogue import persona_loader
+from app.services.dialogue.persona_loader import PersonaRegistry
+
+
+def _write_card(path, name: str) -> None:
+    path.write_text(json.dumps({"data": {"name": name, "description": f"{name} 的描述"}}), encoding="utf-8")
+
+
+def _bump_mtime(path, offset_ns: int) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset_ns))
+
+
+def test_persona_registry_resolves_aliases_and_hot_reloads_cards(tmp_path) -> None:
+    configs_root = tmp_path / "configs"
+    persona_dir = configs_root / "persona"
+    persona_dir.mkdir(parents=True)
+    card = tmp_path / "Tianyi_card.json"
+    _write_card(card, "洛天依")
+    (persona_dir / "luotianyi.persona.yaml").write_text(
+        'id: luotianyi\naliases:\n  - "洛天依"\n  - "Luo-Tianyi"\nsource_card: "Tianyi_card.json"\n',
+        encoding="utf-8",
+    )
+    registry = PersonaRegistry(configs_root, tmp_path, reload_interval_seconds=0)
+
+    context = registry.get("LUO_TIANYI")
+    assert context is not None
+    assert context.persona_id == "luotianyi"
+    assert context.display_name == "洛天依"
+    assert registry.get("洛天依") is context
+
+    _write_card(card, "天依")
+    _bump_mtime(card, 1_000_000)
+    reloaded = registry.get("luotianyi")
+    assert reloaded is not None and reloaded.display_name == "天依"
+    assert reloaded.source_mtime_ns != context.source_mtime_ns
+
+
+def test_persona_registry_negative_caches_unknown_ids_until_yaml_changes(tmp_path, monkeypatch) -> None:
+    configs_root = tmp_path / "configs"
+    persona_dir = configs_root / "persona"
+    persona_dir.mkdir(parents=True)
+    registry = PersonaRegistry(configs_root, tmp_path, reload_interval_seconds=0)
+
+    parse_calls: list[str] = []
+    real_parse = persona_loader._parse_persona_yaml
+
+    def counting_parse(path):
+        parse_calls.append(path.name)
+        return real_parse(path)
+
+    monkeypatch.setattr(persona_loader, "_parse_persona_yaml", counting_parse)
+
+    assert registry.get("newcomer") is None
+    assert registry.get("newcomer") is None
+    assert registry.stats()["negative_cache"] == 1
+
+    _write_card(tmp_path / "new_card.json", "新人")
+    (persona_dir / "newcomer.persona.yaml").write_text(
+        'id: newcomer\nsource_card: "new_card.json"\n',
+        encoding="utf-8",
+    )
+    context = registry.get("newcomer")
+    assert context is not None and context.display_name == "新人"
+    assert registry.stats()["negative_cache"] == 0
+
+    # 未变化的 yaml 不再重复解析。
+    registry.get("newcomer")
+    registry.get("still-unknown")
+    assert parse_calls == ["newcomer.persona.yaml"]
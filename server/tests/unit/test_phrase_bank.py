@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.services.dialogue import chat_service, phrase_bank
+from app.services.tts import tts_service
+from app.services.tts.audio_cache import TTSAudioCache
+from app.services.tts.tts_service import TTSSynthesizeResult
+
+
+def test_load_event_speak_lines_reads_lists_under_each_event(tmp_path) -> None:
+    events = tmp_path / "daily_events.yaml"
+    events.write_text(
+        "events:\n"
+        "  - id: morning\n"
+        "    response_style: \"温柔\"\n"
+        "    speak_lines:\n"
+        "      - \"早上好！\"\n"
+        "      - '今天也一起加油吧。'\n"
+        "  - id: night\n"
+        "    speak_lines:\n"
+        "      - 晚安。\n"
+        "      - \"早上好！\"\n"
+        "    weight: 1\n",
+        encoding="utf-8",
+    )
+    assert phrase_bank.load_event_speak_lines(events) == ["早上好！", "今天也一起加油吧。", "晚安。"]
+
+
+def test_warm_phrase_bank_fills_cache_used_by_chat_path(tmp_path, monkeypatch) -> None:
+    cache = TTSAudioCache(memory_max_bytes=1 << 20, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    synthesized: list[str] = []
+
+    def fake_synthesize(*, provider, text, gpt_sovits_payload):
+        synthesized.append(text)
+        return TTSSynthesizeResult(audio_bytes=text.encode(), media_type="audio/wav", provider=provider)
+
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(phrase_bank, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_service, "should_skip_provider", lambda _provider: (False, 0.0))
+    monkeypatch.setattr(tts_service, "_probe_provider_if_needed", lambda _provider: (True, "ok"))
+    monkeypatch.setattr(tts_service, "_synthesize_with_provider", fake_synthesize)
+    monkeypatch.setattr(
+        phrase_bank,
+        "collect_phrase_bank",
+        lambda _persona_ids=None: {"phainon": ["我在。", "你来得正好。"], "luotianyi": ["我在。"]},
+    )
+
+    report = phrase_bank.warm_phrase_bank(providers=["gpt_sovits"])
+    assert report.phrases == 2 and report.synthesized == 2 and report.failed == 0
+    assert synthesized == ["我在。", "你来得正好。"]
+
+    again = phrase_bank.warm_phrase_bank(providers=["gpt_sovits"])
+    assert again.cached == 2 and again.synthesized == 0
+
+    media_type, audio_b64, provider = asyncio.run(
+        chat_service._asynthesize_speak_text_base64(
+            "我在。",
+            force_tts_provider="gpt_sovits",
+            qwen_voice_id="",
+            qwen_target_model="",
+        )
+    )
+    assert provider == "gpt_sovits" and media_type == "audio/wav" and audio_b64
+    assert synthesized == ["我在。", "你来得正好。"]
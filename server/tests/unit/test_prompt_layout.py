@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from app.services.dialogue import prompt_cache_stats
+from app.services.dialogue.gptsapi_anthropic_client import (
+    PROMPT_SEGMENT_HISTORY,
+    PROMPT_SEGMENT_PERSONA_INITIAL,
+    PROMPT_SEGMENT_STATE,
+    PROMPT_SEGMENT_STATIC,
+    _build_chat_payload,
+    _build_system_prompt_segments,
+    _layout_segment_chars,
+)
+
+
+def test_static_prefix_is_byte_identical_across_turns_and_state_goes_last() -> None:
+    first = _build_system_prompt_segments("phainon", {"trust": 0, "reliance": 0, "fatigue": 0})
+    later = _build_system_prompt_segments(
+        "phainon",
+        {"trust": 5, "reliance": 1, "fatigue": 2},
+        include_initial_injection=False,
+    )
+
+    assert first[0].name == PROMPT_SEGMENT_STATIC
+    assert first[0].text == later[0].text
+    assert "当前关系值" not in first[0].text
+    assert [segment.name for segment in later] == [PROMPT_SEGMENT_STATIC, PROMPT_SEGMENT_STATE]
+    assert first[-1].name == PROMPT_SEGMENT_STATE
+    assert "'trust': 5" in later[-1].text
+
+
+def test_chat_payload_emits_cache_control_and_optional_tail_state() -> None:
+    segments = _build_system_prompt_segments("phainon", {"trust": 1, "reliance": 0, "fatigue": 0})
+    messages = [{"role": "user", "content": "早"}]
+
+    payload = _build_chat_payload(
+        model="claude-sonnet-4-5",
+        max_tokens=64,
+        system_segments=segments,
+        messages=messages,
+        cache_control=True,
+        state_at_tail=True,
+    )
+
+    system_parts = payload["messages"][0]["content"]
+    assert all(part["cache_control"] == {"type": "ephemeral"} for part in system_parts)
+    assert [part["text"] for part in system_parts] == [segment.text for segment in segments[:-1]]
+    assert payload["messages"][1] == messages[0]
+    assert payload["messages"][-1] == {"role": "system", "content": segments[-1].text}
+
+    plain = _build_chat_payload(model="kimi-k2", max_tokens=64, system_segments=segments, messages=messages)
+    assert plain["messages"][0]["content"] == "".join(segment.text for segment in segments)
+
+
+def test_prompt_cache_stats_mark_prefix_segments_as_hits() -> None:
+    prompt_cache_stats.reset_prompt_cache_stats()
+    segment_chars = (
+        (PROMPT_SEGMENT_STATIC, 600),
+        (PROMPT_SEGMENT_PERSONA_INITIAL, 300),
+        (PROMPT_SEGMENT_HISTORY, 80),
+        (PROMPT_SEGMENT_STATE, 20),
+    )
+    prompt_cache_stats.record_prompt_cache_usage(
+        segment_chars,
+        {"prompt_tokens": 500, "prompt_tokens_details": {"cached_tokens": 460}},
+    )
+    prompt_cache_stats.record_prompt_cache_usage(
+        segment_chars,
+        {"input_tokens": 40, "cache_read_input_tokens": 300, "cache_creation_input_tokens": 160},
+    )
+
+    stats = prompt_cache_stats.get_prompt_cache_stats()
+    assert stats["requests"] == 2
+    assert stats["cached_tokens"] == 760
+    assert stats["segments"][PROMPT_SEGMENT_STATIC]["hits"] == 2
+    assert stats["segments"][PROMPT_SEGMENT_PERSONA_INITIAL]["hits"] == 1
+    assert stats["segments"][PROMPT_SEGMENT_STATE]["hits"] == 0
+    assert _layout_segment_chars([], [{"role": "user", "content": "早"}], state_at_tail=False) == (
+        (PROMPT_SEGMENT_HISTORY, 1),
+    )
+    prompt_cache_stats.reset_prompt_cache_stats()
+
+
+def test_compiled_persona_prompt_is_memoised_and_recompiled_on_card_mtime_change(monkeypatch) -> None:
+    from app.services.dialogue import gptsapi_anthropic_client as client
+
+    base = client.load_persona_prompt_context("phainon")
+    assert base is not None and base.source_mtime_ns > 0
+    current = {"context": base}
+    compile_calls: list[int] = []
+    real_compile = client._compile_persona_prompt
+
+    def counting_compile(persona_id, persona):
+        compile_calls.append(persona.source_mtime_ns if persona else 0)
+        return real_compile(persona_id, persona)
+
+    monkeypatch.setattr(client, "load_persona_prompt_context", lambda _persona_id: current["context"])
+    monkeypatch.setattr(client, "_compile_persona_prompt", counting_compile)
+    monkeypatch.setattr(client, "_COMPILED_PROMPTS", client.OrderedDict())
+
+    relationship = {"trust": 1, "reliance": 0, "fatigue": 0}
+    first = client._build_system_prompt("phainon", relationship)
+    assert client._build_system_prompt("phainon", relationship) == first
+    assert compile_calls == [base.source_mtime_ns]
+
+    current["context"] = replace(base, display_name="新名字", source_mtime_ns=base.source_mtime_ns + 1)
+    updated = client._build_system_prompt("phainon", relationship)
+    assert "新名字" in updated
+    assert compile_calls == [base.source_mtime_ns, base.source_mtime_ns + 1]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from app.services.tts import realtime_session_pool
+from app.services.tts.realtime_session_pool import RealtimeSessionPool
+
+
+class _FakeSession:
+    def __init__(self, key) -> None:
+        self.key = key
+        self.closed = False
+
+
+def _build_pool(**kwargs) -> RealtimeSessionPool[_FakeSession]:
+    options = {"max_idle": 2, "idle_seconds": 30, "max_age_seconds": 600}
+    options.update(kwargs)
+    return RealtimeSessionPool(
+        factory=_FakeSession,
+        close=lambda session: setattr(session, "closed", True),
+        is_healthy=lambda session: not session.closed,
+        **options,
+    )
+
+
+def test_pool_reuses_by_key_and_caps_idle_sessions() -> None:
+    pool = _build_pool()
+    first = pool.acquire(("m", "a"))
+    assert not first.reused
+    pool.release(first, reusable=True)
+
+    again = pool.acquire(("m", "a"))
+    other = pool.acquire(("m", "b"))
+    assert again.reused and again.session is first.session and again.uses == 2
+    assert not other.reused
+
+    extra = pool.acquire(("m", "a"))
+    for lease in (again, other, extra):
+        pool.release(lease, reusable=True)
+    # 超出 max_idle 时关闭最早归还的会话。
+    assert again.session.closed and not other.session.closed and not extra.session.closed
+    assert pool.stats()["idle"] == 2
+
+
+def test_pool_drops_unhealthy_failed_and_expired_sessions(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(realtime_session_pool.time, "monotonic", lambda: now[0])
+    pool = _build_pool(idle_seconds=30, max_age_seconds=100)
+
+    broken = pool.acquire(("m", "a"))
+    pool.release(broken, reusable=True)
+    broken.session.closed = True  # 服务端断开：健康检查不通过
+    assert not pool.acquire(("m", "a")).reused
+
+    failed = pool.acquire(("m", "a"))
+    pool.release(failed, reusable=False)
+    assert failed.session.closed
+
+    idle = pool.acquire(("m", "a"))
+    pool.release(idle, reusable=True)
+    now[0] += 31
+    assert not pool.acquire(("m", "a")).reused
+    assert idle.session.closed
+
+    old = pool.acquire(("m", "a"))
+    now[0] += 101
+    pool.release(old, reusable=True)
+    assert old.session.closed and pool.stats()["idle"] == 0
+
+
+def test_pool_with_zero_max_idle_never_keeps_sessions() -> None:
+    pool = _build_pool(max_idle=0)
+    lease = pool.acquire(("m", "a"))
+    pool.release(lease, reusable=True)
+    assert lease.session.closed and pool.stats()["idle"] == 0
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import sqlite3
+
+from app.repositories.session_cache import SessionCache
+from app.repositories.session_store import SessionStore
+
+
+def test_session_cache_serves_turn_reads_and_stays_write_through(tmp_path) -> None:
+    db_path = tmp_path / "session.db"
+    cache = SessionCache(max_sessions=8, ttl_seconds=60, history_size=4)
+    store = SessionStore(db_path, cache=cache)
+    store.add_message("s-1", "user", "早")
+
+    assert store.list_recent_messages("s-1", limit=4) == [{"role": "user", "content": "早"}]
+    assert store.get_relationship("s-1") == {"trust": 0, "reliance": 0, "fatigue": 0}
+    assert store.count_user_turns("s-1") == 1
+    misses = cache.stats()["misses"]
+
+    store.commit_turn("s-1", "早上好", [], {"trust": 2})
+    store.add_message("s-1", "user", "出发吧")
+
+    assert store.list_recent_messages("s-1", limit=4) == [
+        {"role": "user", "content": "早"},
+        {"role": "assistant", "content": "早上好"},
+        {"role": "user", "content": "出发吧"},
+    ]
+    assert store.get_relationship("s-1")["trust"] == 2
+    assert store.count_user_turns("s-1") == 2
+    stats = cache.stats()
+    assert stats["misses"] == misses
+    assert stats["hits"] == 3
+
+    # 直接改库不会被看到，说明读取确实来自缓存；clear_session 后重新回源。
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE relationship SET trust = 99 WHERE session_id = 's-1'")
+    assert store.get_relationship("s-1")["trust"] == 2
+    store.clear_session("s-1")
+    assert store.list_recent_messages("s-1", limit=4) == []
+    assert store.count_user_turns("s-1") == 0
+    store.close()
+
+
+def test_session_cache_evicts_least_recent_and_rejects_stale_fill() -> None:
+    cache = SessionCache(max_sessions=2, ttl_seconds=60, history_size=4)
+    for session_id in ("a", "b"):
+        token = cache.begin_load(session_id)
+        cache.fill_user_turns(session_id, token, 1)
+    assert cache.get_user_turns("a") == 1
+
+    token = cache.begin_load("c")
+    cache.fill_user_turns("c", token, 3)
+    assert cache.get_user_turns("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    token = cache.begin_load("a")
+    cache.record_message("a", "user", "写入发生在回填之前")
+    cache.fill_history("a", token, [], limit=4)
+    assert cache.get_history("a", limit=4) is None
+    assert cache.get_user_turns("a") == 2
+
+
+def test_session_cache_history_limit_beyond_cached_window_misses() -> None:
+    cache = SessionCache(max_sessions=4, ttl_seconds=60, history_size=2)
+    token = cache.begin_load("s")
+    rows = [{"role": "user", "content": str(index)} for index in range(3)]
+    cache.fill_history("s", token, rows, limit=3)
+
+    assert cache.get_history("s", limit=2) == rows[-2:]
+    assert cache.get_history("s", limit=3) is None
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_session_store
+from app.main import app
+from app.repositories import session_store
+from app.repositories.session_store import SessionStore
+
+
+def test_session_store_reuses_wal_connection_per_thread(tmp_path) -> None:
+    store = SessionStore(tmp_path / "session.db", busy_timeout_ms=1234)
+
+    conn = store._connect()
+    assert store._connect() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+
+    other: list[object] = []
+    worker = threading.Thread(target=lambda: other.append(store._connect()))
+    worker.start()
+    worker.join()
+    assert other[0] is not conn
+
+    store.close()
+    reopened = store._connect()
+    assert reopened is not conn
+    store.add_message("s-1", "user", "你好")
+    assert store.list_recent_messages("s-1") == [{"role": "user", "content": "你好"}]
+
+
+def test_failed_migration_rolls_back_and_keeps_connection_usable(tmp_path, monkeypatch) -> None:
+    store = SessionStore(tmp_path / "session.db")
+    version = len(session_store._SCHEMA_MIGRATIONS)
+    broken = "CREATE TABLE half_done (x INTEGER);\nINSERT INTO no_such_table VALUES (1);"
+    monkeypatch.setattr(session_store, "_SCHEMA_MIGRATIONS", session_store._SCHEMA_MIGRATIONS + (broken,))
+
+    with pytest.raises(sqlite3.OperationalError):
+        store._apply_migrations()
+
+    conn = store._connect()
+    assert not conn.in_transaction
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    store.add_message("s-mig", "user", "你好")
+    assert store.list_recent_messages("s-mig") == [{"role": "user", "content": "你好"}]
+    store.close()
+
+
+def test_session_store_concurrent_writers_do_not_lose_rows(tmp_path) -> None:
+    store = SessionStore(tmp_path / "session.db")
+
+    def write(worker_id: int) -> None:
+        for index in range(20):
+            store.add_message(f"s-{worker_id}", "user", f"msg-{index}")
+
+    workers = [threading.Thread(target=write, args=(worker_id,)) for worker_id in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [store.count_user_turns(f"s-{worker_id}") for worker_id in range(4)] == [20, 20, 20, 20]
+    store.close()
+
+
+def test_commit_turn_writes_reply_memories_and_delta_in_one_transaction(tmp_path) -> None:
+    store = SessionStore(tmp_path / "session.db")
+    store.apply_relationship_delta("s-turn", {"trust": 1, "reliance": 2, "fatigue": 0})
+
+    applied = store.commit_turn(
+        "s-turn",
+        "我记住了。",
+        [{"key": "drink", "value": "tea", "type": "preference"}, {"key": "", "value": "skip"}],
+        {"trust": "2", "fatigue": -1},
+    )
+
+    assert applied == {"trust": 2, "reliance": 0, "fatigue": -1}
+    assert store.get_relationship("s-turn") == {"trust": 3, "reliance": 2, "fatigue": -1}
+    assert store.list_recent_messages("s-turn") == [{"role": "assistant", "content": "我记住了。"}]
+    memory_count = store._connect().execute(
+        "SELECT COUNT(*) FROM memories WHERE session_id = ?", ("s-turn",)
+    ).fetchone()[0]
+    assert memory_count == 1
+    store.close()
+
+
+def test_relationship_delta_is_atomic_under_concurrent_turns(tmp_path) -> None:
+    store = SessionStore(tmp_path / "session.db")
+
+    def commit(worker_id: int) -> None:
+        for _ in range(10):
+            store.commit_turn("s-shared", f"reply-{worker_id}", [], {"trust": 1, "reliance": 0, "fatigue": 0})
+
+    workers = [threading.Thread(target=commit, args=(worker_id,)) for worker_id in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert store.get_relationship("s-shared")["trust"] == 40
+    store.close()
+
+
+def test_schema_migration_adds_session_indexes_used_by_turn_queries(tmp_path) -> None:
+    store = SessionStore(tmp_path / "session.db")
+    conn = store._connect()
+
+    assert conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+    recent_plan = " ".join(
+        str(row["detail"])
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT role, content FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            ("s-1", 12),
+        )
+    )
+    count_plan = " ".join(
+        str(row["detail"])
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM messages WHERE session_id = ? AND role = 'user'",
+            ("s-1",),
+        )
+    )
+    assert "idx_messages_session_id" in recent_plan
+    assert "TEMP B-TREE" not in recent_plan
+    assert "idx_messages_session_role" in count_plan
+    store.close()
+
+
+def test_session_stats_track_turns_and_back_active_session_listing(tmp_path) -> None:
+    db_path = tmp_path / "session.db"
+    store = SessionStore(db_path)
+    store.add_message("s-a", "user", "早")
+    store.commit_turn("s-a", "早上好", [], {})
+    store.add_message("s-a", "user", "走吧")
+    store.add_message("s-b", "user", "在吗")
+
+    assert store.count_user_turns("s-a") == 2
+    assert store.count_user_turns("s-missing") == 0
+
+    app.dependency_overrides[get_session_store] = lambda: store
+    with TestClient(app) as client:
+        resp = client.get("/v1/system/sessions", params={"limit": 10})
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    sessions = {item["session_id"]: item for item in resp.json()["sessions"]}
+    assert sessions["s-a"]["user_turns"] == 2
+    assert sessions["s-a"]["assistant_turns"] == 1
+    assert sessions["s-b"]["user_turns"] == 1
+
+    store.clear_session("s-a")
+    assert store.count_user_turns("s-a") == 0
+    store.close()
+
+
+def test_session_stats_migration_backfills_existing_messages(tmp_path) -> None:
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE messages (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              session_id TEXT NOT NULL,
+              role TEXT NOT NULL,
+              content TEXT NOT NULL,
+              ts DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO messages(session_id, role, content) VALUES
+              ('s-old', 'user', 'a'), ('s-old', 'assistant', 'b'), ('s-old', 'user', 'c');
+            """
+        )
+
+    store = SessionStore(db_path)
+    assert store.count_user_turns("s-old") == 2
+    store.add_message("s-old", "user", "d")
+    assert store.count_user_turns("s-old") == 3
+    store.close()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from app.services.asr.asr_service import ASRServiceError, transcribe_with_fallback
-from app.services.tts.tts_service import TTSServiceError, synthesize_with_fallback
+import asyncio
+
+from app.services.asr.asr_service import ASRServiceError, atranscribe_with_fallback
+from app.services.tts.tts_service import TTSServiceError, TTSSynthesizeResult, asynthesize_with_fallback
 
 
 def test_asr_fallback_to_fun_asr_when_sensevoice_failed(monkeypatch) -> None:
@@ -13,51 +15,52 @@ def test_asr_fallback_to_fun_asr_when_sensevoice_failed(monkeypatch) -> None:
         "app.services.asr.asr_service.should_skip_provider",
         lambda _provider: (False, 0.0),
     )
-    monkeypatch.setattr(
-        "app.services.asr.asr_service._probe_provider_if_needed",
-        lambda _provider: (True, "ok"),
-    )
+
+    async def fake_probe(_provider: str) -> tuple[bool, str]:
+        return True, "ok"
+
+    monkeypatch.setattr("app.services.asr.asr_service._aprobe_provider_if_needed", fake_probe)
     monkeypatch.setattr("app.services.asr.asr_service.mark_provider_failure", lambda *_args, **_kwargs: None)
     monkeypatch.setattr("app.services.asr.asr_service.mark_provider_success", lambda *_args, **_kwargs: None)
 
-    def fake_transcribe(*, provider: str, audio_bytes: bytes, filename: str, lang: str | None) -> str:
+    async def fake_transcribe(*, provider: str, audio_bytes: bytes, filename: str, lang: str | None) -> str:
         _ = audio_bytes, filename, lang
         if provider == "sensevoice_http":
             raise ASRServiceError("sensevoice down")
         return "你好，世界"
 
     monkeypatch.setattr(
-        "app.services.asr.asr_service._transcribe_with_provider",
+        "app.services.asr.asr_service._atranscribe_with_provider",
         fake_transcribe,
     )
 
-    result = transcribe_with_fallback(b"\x00\x01", "voice.wav", "zh")
+    result = asyncio.run(atranscribe_with_fallback(b"\x00\x01", "voice.wav", "zh"))
     assert result.provider == "fun_asr_realtime"
     assert result.text == "你好，世界"
 
 
 def test_tts_fallback_to_qwen_clone_when_gpt_sovits_failed(monkeypatch) -> None:
     monkeypatch.setattr(
-        "app.services.tts.tts_service._resolve_tts_provider_priority",
+        "app.services.tts.tts_service.resolve_tts_provider_priority",
         lambda force_provider="": ["gpt_sovits", "qwen_clone_tts"] if not force_provider else [force_provider],
     )
     monkeypatch.setattr(
         "app.services.tts.tts_service.should_skip_provider",
         lambda _provider: (False, 0.0),
     )
-    monkeypatch.setattr(
-        "app.services.tts.tts_service._probe_provider_if_needed",
-        lambda _provider: (True, "ok"),
-    )
+
+    async def fake_probe(_provider: str) -> tuple[bool, str]:
+        return True, "ok"
+
+    monkeypatch.setattr("app.services.tts.tts_service._aprobe_provider_if_needed", fake_probe)
     monkeypatch.setattr("app.services.tts.tts_service.mark_provider_failure", lambda *_args, **_kwargs: None)
     monkeypatch.setattr("app.services.tts.tts_service.mark_provider_success", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr("app.services.tts.tts_service.get_tts_audio_cache", lambda: None)
 
-    def fake_synthesize(*, provider: str, text: str, gpt_sovits_payload: dict | None):
+    async def fake_synthesize(*, provider: str, text: str, gpt_sovits_payload: dict | None):
         _ = text, gpt_sovits_payload
         if provider == "gpt_sovits":
             raise TTSServiceError("gpt sovits unavailable")
-        from app.services.tts.tts_service import TTSSynthesizeResult
-
         return TTSSynthesizeResult(
             audio_bytes=b"audio",
             media_type="audio/mpeg",
@@ -66,11 +69,11 @@ def test_tts_fallback_to_qwen_clone_when_gpt_sovits_failed(monkeypatch) -> None:
         )
 
     monkeypatch.setattr(
-        "app.services.tts.tts_service._synthesize_with_provider",
+        "app.services.tts.tts_service._asynthesize_with_provider",
         fake_synthesize,
     )
 
-    result = synthesize_with_fallback(text="你好")
+    result = asyncio.run(asynthesize_with_fallback(text="你好"))
     assert result.provider == "qwen_clone_tts"
     assert result.voice_id == "voice-x"
     assert result.audio_bytes == b"audio"
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.tts import tts_service
+from app.services.tts.audio_cache import CachedAudio, TTSAudioCache, build_tts_cache_key
+from app.services.tts.tts_service import TTSSynthesizeResult
+
+
+def _entry(size: int, marker: bytes = b"a") -> CachedAudio:
+    return CachedAudio(audio_bytes=marker * size, media_type="audio/wav", provider="gpt_sovits")
+
+
+def test_tts_cache_key_changes_with_voice_and_params() -> None:
+    base = build_tts_cache_key(text="我在。", provider="qwen_clone_tts", voice_id="v1", params={"target_model": "m"})
+    assert base == build_tts_cache_key(
+        text="我在。", provider="qwen_clone_tts", voice_id="v1", params={"target_model": "m"}
+    )
+    assert base != build_tts_cache_key(text="我在。", provider="qwen_clone_tts", voice_id="v2", params={"target_model": "m"})
+    assert base != build_tts_cache_key(text="我在。", provider="qwen_clone_tts", voice_id="v1", params={"target_model": "n"})
+
+
+def test_tts_audio_cache_evicts_by_bytes_and_survives_restart(tmp_path) -> None:
+    cache = TTSAudioCache(memory_max_bytes=250, disk_dir=tmp_path, disk_max_bytes=250)
+    cache.put("k1", _entry(100, b"1"))
+    cache.put("k2", _entry(100, b"2"))
+    assert cache.get("k1") is not None  # k1 变为最近使用
+    cache.put("k3", _entry(100, b"3"))
+
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2 and stats["memory_bytes"] == 200
+    assert stats["disk_entries"] == 2
+    assert not (tmp_path / "k2.audio").exists()
+
+    restarted = TTSAudioCache(memory_max_bytes=250, disk_dir=tmp_path, disk_max_bytes=250)
+    hit = restarted.get("k1")
+    assert hit is not None and hit.audio_bytes == b"1" * 100
+    assert restarted.get("k2") is None
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["misses"] == 1
+
+
+def test_asynthesize_with_fallback_serves_repeated_lines_from_cache(tmp_path, monkeypatch) -> None:
+    cache = TTSAudioCache(memory_max_bytes=1 << 20, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    calls: list[str] = []
+
+    async def fake_asynthesize(*, provider, text, gpt_sovits_payload):
+        calls.append(text)
+        return TTSSynthesizeResult(audio_bytes=b"RIFF" + text.encode(), media_type="audio/wav", provider=provider)
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(tts_service, "_asynthesize_with_provider", fake_asynthesize)
+
+    payload = {"text": "我在。", "media_type": "wav", "speed_factor": 1.0, "__force_provider": "gpt_sovits"}
+
+    async def run():
+        first = await tts_service.asynthesize_with_fallback(text="我在。", gpt_sovits_payload=payload)
+        second = await tts_service.asynthesize_with_fallback(text="我在。", gpt_sovits_payload=payload)
+        faster = await tts_service.asynthesize_with_fallback(
+            text="我在。", gpt_sovits_payload={**payload, "speed_factor": 1.2}
+        )
+        return first, second, faster
+
+    first, second, faster = asyncio.run(run())
+
+    assert calls == ["我在。", "我在。"]
+    assert not first.cache_hit
+    assert second.cache_hit and second.audio_bytes == first.audio_bytes
+    assert not faster.cache_hit
+
+
+def test_tts_synthesize_endpoint_marks_cache_hits(tmp_path, monkeypatch) -> None:
+    cache = TTSAudioCache(memory_max_bytes=1 << 20, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    calls: list[str] = []
+
+    async def fake_asynthesize(*, provider, text, gpt_sovits_payload):
+        calls.append(text)
+        return TTSSynthesizeResult(audio_bytes=b"RIFF-audio", media_type="audio/wav", provider=provider)
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(tts_service, "_asynthesize_with_provider", fake_asynthesize)
+
+    with TestClient(app) as client:
+        body = {"text": "早上好！", "provider": "gpt_sovits"}
+        first = client.post("/v1/tts/synthesize", json=body)
+        second = client.post("/v1/tts/synthesize", json=body)
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.headers["X-TTS-Cache"] == "miss"
+    assert second.headers["X-TTS-Cache"] == "hit"
+    assert second.content == b"RIFF-audio"
+    assert calls == ["早上好！"]
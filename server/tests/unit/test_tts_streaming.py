@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import sys
+import threading
+import types
+from dataclasses import replace
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.settings import get_settings
+from app.main import app
+from app.services.tts import gpt_sovits_client, qwen_voice_clone_client, tts_service
+from app.services.tts.audio_cache import TTSAudioCache
+from app.services.tts.qwen_voice_clone_client import pcm16_mono_24k_wav_header
+from app.services.tts.realtime_session_pool import RealtimeSessionPool
+
+
+def _install_fake_realtime_sdk(
+    monkeypatch,
+    pcm_chunks: list[bytes],
+    first_consumed: threading.Event | None = None,
+) -> list[object]:
+    """模拟 dashscope realtime（commit 模式）：首个 delta 发出后，等调用方收到它才继续发送剩余音频。"""
+    connections: list[object] = []
+
+    class FakeCallback:
+        pass
+
+    class FakeRealtime:
+        def __init__(self, *, model, callback, url) -> None:
+            self._callback = callback
+            self.texts: list[str] = []
+            connections.append(self)
+
+        def connect(self) -> None:
+            self._callback.on_open()
+
+        def update_session(self, **_kwargs) -> None:
+            return
+
+        def append_text(self, text: str) -> None:
+            self.texts.append(text)
+
+        def commit(self) -> None:
+            threading.Thread(target=self._emit, daemon=True).start()
+
+        def close(self) -> None:
+            return
+
+        def _emit(self) -> None:
+            for index, chunk in enumerate(pcm_chunks):
+                self._callback.on_event({"type": "response.audio.delta", "delta": base64.b64encode(chunk).decode()})
+                if index == 0 and first_consumed is not None:
+                    first_consumed.wait(timeout=5)
+            self._callback.on_event({"type": "response.done"})
+
+    realtime_module = types.ModuleType("dashscope.audio.qwen_tts_realtime")
+    realtime_module.AudioFormat = types.SimpleNamespace(PCM_24000HZ_MONO_16BIT="pcm")
+    realtime_module.QwenTtsRealtime = FakeRealtime
+    realtime_module.QwenTtsRealtimeCallback = FakeCallback
+    monkeypatch.setitem(sys.modules, "dashscope", types.ModuleType("dashscope"))
+    monkeypatch.setitem(sys.modules, "dashscope.audio", types.ModuleType("dashscope.audio"))
+    monkeypatch.setitem(sys.modules, "dashscope.audio.qwen_tts_realtime", realtime_module)
+    settings = replace(get_settings(), dashscope_api_key="sk-test")
+    monkeypatch.setattr(qwen_voice_clone_client, "get_settings", lambda: settings)
+    pool = RealtimeSessionPool(
+        factory=lambda key: qwen_voice_clone_client._RealtimeSession(model=key[0], voice_id=key[1]),
+        close=qwen_voice_clone_client._RealtimeSession.close,
+        max_idle=2,
+        idle_seconds=60,
+        max_age_seconds=600,
+        is_healthy=lambda session: not session.closed,
+    )
+    monkeypatch.setattr(qwen_voice_clone_client, "get_realtime_session_pool", lambda: pool)
+    return connections
+
+
+def test_astream_synthesize_yields_first_delta_before_session_finishes(monkeypatch) -> None:
+    first_consumed = threading.Event()
+    _install_fake_realtime_sdk(monkeypatch, [b"\x01\x00" * 4, b"\x02\x00" * 4, b"\x03\x00" * 4], first_consumed)
+
+    async def consume() -> list[bytes]:
+        received: list[bytes] = []
+        async for chunk in qwen_voice_clone_client.astream_synthesize(
+            "你好", model="qwen3-tts-vc-realtime", voice_id="voice_x"
+        ):
+            received.append(chunk)
+            # 若实现要等 session.finished 才返回，这里会卡住直到模拟 SDK 超时。
+            first_consumed.set()
+        return received
+
+    received = asyncio.run(asyncio.wait_for(consume(), timeout=3))
+    assert received == [b"\x01\x00" * 4, b"\x02\x00" * 4, b"\x03\x00" * 4]
+
+
+def test_realtime_synthesis_reuses_pooled_session(monkeypatch) -> None:
+    connections = _install_fake_realtime_sdk(monkeypatch, [b"\x01\x00" * 4])
+
+    first, _ = qwen_voice_clone_client.synthesize("你好", model="qwen3-tts-vc-realtime", voice_id="voice_x")
+    second, _ = qwen_voice_clone_client.synthesize("再见", model="qwen3-tts-vc-realtime", voice_id="voice_x")
+    other_voice, _ = qwen_voice_clone_client.synthesize("你好", model="qwen3-tts-vc-realtime", voice_id="voice_y")
+
+    assert first == second == other_voice
+    assert len(connections) == 2
+    assert connections[0].texts == ["你好", "再见"]
+    stats = qwen_voice_clone_client.get_realtime_session_pool().stats()
+    assert stats["created"] == 2 and stats["reused"] == 1 and stats["idle"] == 2
+
+
+def test_prewarm_opens_configured_voice_session_for_first_utterance(monkeypatch) -> None:
+    connections = _install_fake_realtime_sdk(monkeypatch, [b"\x01\x00" * 4])
+    settings = replace(
+        get_settings(),
+        dashscope_api_key="sk-test",
+        cosyvoice_voice_id="voice_x",
+        cosyvoice_target_model="qwen3-tts-vc-realtime",
+    )
+    monkeypatch.setattr(tts_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(tts_service, "resolve_tts_provider_priority", lambda: ["qwen_clone_tts", "gpt_sovits"])
+
+    assert asyncio.run(tts_service.aprewarm_qwen_realtime_sessions()) == 1
+    # 已有空闲会话时不重复预建。
+    assert asyncio.run(tts_service.aprewarm_qwen_realtime_sessions()) == 0
+    assert len(connections) == 1
+
+    qwen_voice_clone_client.synthesize("你好", model="qwen3-tts-vc-realtime", voice_id="voice_x")
+    stats = qwen_voice_clone_client.get_realtime_session_pool().stats()
+    assert len(connections) == 1 and connections[0].texts == ["你好"]
+    assert stats["created"] == 1 and stats["reused"] == 1
+
+    monkeypatch.setattr(tts_service, "resolve_tts_provider_priority", lambda: ["gpt_sovits"])
+    qwen_voice_clone_client.get_realtime_session_pool().close_all()
+    assert asyncio.run(tts_service.aprewarm_qwen_realtime_sessions()) == 0
+
+
+def test_tts_synthesize_stream_relays_pcm_and_caches_full_audio(tmp_path, monkeypatch) -> None:
+    cache = TTSAudioCache(memory_max_bytes=1 << 20, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    pcm_chunks = [b"\x10\x00" * 8, b"\x20\x00" * 8]
+
+    async def fake_stream(text, *, model, voice_id):
+        assert (text, model, voice_id) == ("我在。", "qwen3-tts-vc-realtime", "voice_x")
+        for chunk in pcm_chunks:
+            yield chunk
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_service, "should_skip_provider", lambda _provider: (False, 0.0))
+    monkeypatch.setattr(tts_service, "_aprobe_provider_if_needed", fake_probe)
+    monkeypatch.setattr(tts_service, "astream_qwen_clone_tts", fake_stream)
+
+    body = {
+        "text": "我在。",
+        "provider": "qwen_clone_tts",
+        "qwen_voice_id": "voice_x",
+        "qwen_target_model": "qwen3-tts-vc-realtime",
+    }
+    with TestClient(app) as client:
+        streamed = client.post("/v1/tts/synthesize?stream=1", json=body)
+        cached = client.post("/v1/tts/synthesize?stream=1", json=body)
+
+    pcm_audio = b"".join(pcm_chunks)
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "audio/wav"
+    assert streamed.headers["X-TTS-Cache"] == "miss"
+    assert streamed.content == pcm16_mono_24k_wav_header() + pcm_audio
+    assert cached.headers["X-TTS-Cache"] == "hit"
+    assert cached.content == pcm16_mono_24k_wav_header(len(pcm_audio)) + pcm_audio
+
+
+def _streaming_wav_header() -> bytes:
+    # GPT-SoVITS api_v2 流式 WAV：先发一个 data 长度为 0 的头，再逐块发送 PCM。
+    return pcm16_mono_24k_wav_header(0)
+
+
+def test_tts_synthesize_stream_relays_gpt_sovits_chunks(tmp_path, monkeypatch) -> None:
+    cache = TTSAudioCache(memory_max_bytes=1 << 20, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    pcm_chunks = [b"\x01\x00" * 8, b"\x02\x00" * 8]
+    requests: list[dict] = []
+
+    async def stream_body():
+        yield _streaming_wav_header()
+        for chunk in pcm_chunks:
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, headers={"Content-Type": "audio/wav"}, content=stream_body())
+
+    async def fake_probe(_provider):
+        return True, "ok"
+
+    mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(gpt_sovits_client, "get_async_http_client", lambda _url: mock_client)
+    monkeypatch.setattr(tts_service, "get_tts_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_service, "should_skip_provider", lambda _provider: (False, 0.0))
+    monkeypatch.setattr(tts_service, "_aprobe_provider_if_needed", fake_probe)
+
+    body = {"text": "我在。", "provider": "gpt_sovits", "streaming_mode": True}
+    with TestClient(app) as client:
+        streamed = client.post("/v1/tts/synthesize?stream=1", json=body)
+        cached = client.post("/v1/tts/synthesize?stream=1", json=body)
+
+    pcm_audio = b"".join(pcm_chunks)
+    assert requests == [{**requests[0], "streaming_mode": True}] and "_output_format" not in requests[0]
+    assert streamed.headers["content-type"] == "audio/wav"
+    assert streamed.content == pcm16_mono_24k_wav_header() + pcm_audio
+    assert cached.headers["X-TTS-Cache"] == "hit"
+    assert cached.content == pcm16_mono_24k_wav_header(len(pcm_audio)) + pcm_audio
+
+
+def test_gpt_sovits_stream_falls_back_to_tts_to_audio(monkeypatch) -> None:
+    fallback_audio = pcm16_mono_24k_wav_header(4) + b"\x00\x01\x00\x01"
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/tts":
+            return httpx.Response(400, json={"message": "ref_audio_path not exists"})
+        assert json.loads(request.content)["streaming_mode"] is False
+        return httpx.Response(200, headers={"Content-Type": "audio/wav"}, content=fallback_audio)
+
+    async def consume() -> list[bytes]:
+        mock_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(gpt_sovits_client, "get_async_http_client", lambda _url: mock_client)
+        payload = {"text": "你好", "ref_audio_path": "missing.wav", "media_type": "wav"}
+        return [chunk async for chunk in gpt_sovits_client.astream_synthesize(payload)]
+
+    assert asyncio.run(consume()) == [fallback_audio]
+    assert paths == ["/tts", "/tts_to_audio/"]